@@ -23,12 +23,16 @@ def _make_key(args, kwds):
     return (args, frozenset(kwds.items()))
 
 
-def lru_cache(maxsize=100):
+def lru_cache(maxsize=100, stats=None):
     """Least-recently-used cache decorator.
 
     If *maxsize* is set to None, the LRU features are disabled and the cache
     can grow without bound.
 
+    If *stats* is set to a `rez.utils.cache_stats.CacheStats` object, hits,
+    misses, evictions and the number of entries are counted in it. Counting is
+    optional, since it adds a small overhead to every call.
+
     Arguments to the cached function must be hashable.
 
     View the cache statistics named tuple (hits, misses, maxsize, currsize) with
@@ -61,6 +65,24 @@ def lru_cache(maxsize=100):
             def wrapper(*args, **kwds):
                 # no caching, just do a statistics update after a successful call
                 result = user_function(*args, **kwds)
+                if stats is not None:
+                    stats.misses += 1
+                return result
+
+        elif maxsize is None and stats is not None:
+
+            def wrapper(*args, **kwds):
+                # as below, with statistics
+                key = make_key(args, kwds)
+                result = cache_get(key, root)
+                if result is not root:
+                    stats.hits += 1
+                    return result
+                stats.misses += 1
+                result = user_function(*args, **kwds)
+                if key not in cache:
+                    stats.entries += 1
+                cache[key] = result
                 return result
 
         elif maxsize is None:
@@ -92,7 +114,11 @@ def lru_cache(maxsize=100):
                         last[NEXT] = root[PREV] = link
                         link[PREV] = last
                         link[NEXT] = root
+                        if stats is not None:
+                            stats.hits += 1
                         return result
+                if stats is not None:
+                    stats.misses += 1
                 result = user_function(*args, **kwds)
                 with lock:
                     root, = nonlocal_root
@@ -115,16 +141,22 @@ def lru_cache(maxsize=100):
                         # now update the cache dictionary for the new links
                         del cache[oldkey]
                         cache[key] = oldroot
+                        if stats is not None:
+                            stats.evictions += 1
                     else:
                         # put result in a new link at the front of the list
                         last = root[PREV]
                         link = [last, root, key, result]
                         last[NEXT] = root[PREV] = cache[key] = link
+                        if stats is not None:
+                            stats.entries += 1
                 return result
 
         def cache_clear():
             """Clear the cache and cache statistics"""
             with lock:
+                if stats is not None:
+                    stats.entries -= _len(cache)
                 cache.clear()
                 root = nonlocal_root[0]
                 root[:] = [root, root, None, None]
@@ -0,0 +1,482 @@
+"""
+Solver benchmarking against synthetic package repositories.
+
+A benchmark generates a reproducible package 'universe' - a large set of package
+families with deep version histories, variants and deliberately conflicting
+requirements - into an in-memory package repository. It then times
+`Solver.solve` over a set of requests drawn from that universe, and records the
+results as JSON so that runs from different rez versions can be compared.
+"""
+from __future__ import print_function
+
+from rez import __version__
+from rez.solver import Solver, SolverStatus
+from rez.package_repository import package_repository_manager
+from rez.vendor.version.requirement import Requirement
+from rez.utils.data_utils import cached_property
+from rez.utils import json
+from hashlib import sha1
+import platform
+import random
+import time
+import gc
+
+
+# this version should be changed if the format of benchmark results changes
+benchmark_format_version = 1
+
+
+class SyntheticUniverse(object):
+    """A reproducible, randomly generated set of package families.
+
+    Families are split into two groups:
+
+    - 'base' families (named 'base_NN'), which have no requirements. These
+      play the role of packages such as python or the os - every variant in
+      the universe is keyed on one of them;
+    - regular families (named 'fam_NNNNN'), which depend on families with a
+      higher index than their own. This guarantees that the universe contains
+      no dependency cycles.
+
+    Newer versions of a package tend to require newer versions of their
+    dependencies. A proportion of requirements (see `conflict_ratio`) are
+    deliberately 'stale' - a streak of recent releases in a family pins one of
+    its dependencies to an old version - which forces the solver to backtrack.
+
+    The universe is entirely determined by the constructor arguments, so the
+    same arguments always produce the same repository.
+    """
+    def __init__(self, num_families=1000, num_versions=20, num_variants=2,
+                 num_requires=3, num_base_families=4, conflict_ratio=0.3,
+                 seed=0):
+        """Create a synthetic universe.
+
+        Args:
+            num_families (int): Number of regular package families.
+            num_versions (int): Number of versions per family.
+            num_variants (int): Maximum number of variants per package.
+            num_requires (int): Maximum number of requirements per package.
+            num_base_families (int): Number of base families that variants
+                are keyed on.
+            conflict_ratio (float): Probability (0-1) that a family's recent
+                releases have a stale requirement, and so are likely to cause
+                a conflict.
+            seed (int): Random seed.
+        """
+        self.num_families = num_families
+        self.num_versions = num_versions
+        self.num_variants = num_variants
+        self.num_requires = num_requires
+        self.num_base_families = max(num_base_families, 1)
+        self.conflict_ratio = conflict_ratio
+        self.seed = seed
+
+    @property
+    def params(self):
+        """dict: The arguments that define this universe."""
+        return dict(num_families=self.num_families,
+                    num_versions=self.num_versions,
+                    num_variants=self.num_variants,
+                    num_requires=self.num_requires,
+                    num_base_families=self.num_base_families,
+                    conflict_ratio=self.conflict_ratio,
+                    seed=self.seed)
+
+    @cached_property
+    def uid(self):
+        """str: Identifier unique to the universe's parameters."""
+        s = str(sorted(self.params.items()))
+        return sha1(s.encode("utf-8")).hexdigest()[:12]
+
+    @property
+    def path(self):
+        """str: Packages path of the universe's memory repository."""
+        return "memory@benchmark_%s" % self.uid
+
+    @cached_property
+    def family_names(self):
+        return ["fam_%05d" % i for i in range(self.num_families)]
+
+    @cached_property
+    def base_family_names(self):
+        return ["base_%02d" % i for i in range(self.num_base_families)]
+
+    @cached_property
+    def versions(self):
+        """dict: Family name to list of version strings, ascending."""
+        rand = random.Random(self.seed)
+        versions = {}
+
+        for name in self.base_family_names + self.family_names:
+            major, minor, patch = rand.randint(1, 3), 0, 0
+            versions_ = []
+
+            for _ in range(self.num_versions):
+                versions_.append("%d.%d.%d" % (major, minor, patch))
+
+                r = rand.random()
+                if r < 0.1:
+                    major, minor, patch = major + 1, 0, 0
+                elif r < 0.4:
+                    minor, patch = minor + 1, 0
+                else:
+                    patch += 1
+
+            versions[name] = versions_
+
+        return versions
+
+    @cached_property
+    def data(self):
+        """dict: Repository data, in the format expected by the 'memory'
+        package repository type.
+        """
+        rand = random.Random(self.seed + 1)
+        data = {}
+
+        for name in self.base_family_names:
+            data[name] = dict(
+                (ver_str, {"name": name, "version": ver_str})
+                for ver_str in self.versions[name])
+
+        for i, name in enumerate(self.family_names):
+            dependencies = self.family_names[i + 1:]
+            family_data = {}
+
+            # a family depends on the same set of families across its history,
+            # as is typical in a real repository
+            n = min(rand.randint(0, self.num_requires), len(dependencies))
+            requires_fams = rand.sample(dependencies, n)
+            variant_fam = rand.choice(self.base_family_names)
+
+            # some families have a streak of recent releases with a stale
+            # requirement. These are the preferred (latest) packages, so the
+            # solver has to fail and backtrack to get past them
+            if requires_fams and rand.random() < self.conflict_ratio:
+                stale_fam = requires_fams[0]
+                stale_from = rand.uniform(0.5, 0.9)
+            else:
+                stale_fam = None
+
+            for j, ver_str in enumerate(self.versions[name]):
+                position = float(j) / max(self.num_versions - 1, 1)
+                requires = []
+
+                for fam in requires_fams:
+                    if fam == stale_fam and position >= stale_from:
+                        requires.append(self._stale_requirement(rand, fam))
+                    else:
+                        requires.append(self._requirement(rand, fam, position))
+
+                package_data = {"name": name, "version": ver_str}
+                if requires:
+                    package_data["requires"] = requires
+
+                num_variants = rand.randint(0, self.num_variants)
+                if num_variants:
+                    package_data["variants"] = [
+                        [self._requirement(rand, variant_fam, position, k)]
+                        for k in range(num_variants)
+                    ]
+
+                family_data[ver_str] = package_data
+
+            data[name] = family_data
+
+        return data
+
+    @property
+    def num_packages(self):
+        return sum(len(x) for x in self.data.values())
+
+    def install(self):
+        """Install the universe into its memory repository.
+
+        Returns:
+            str: Packages path of the repository, see `path`.
+        """
+        repo = package_repository_manager.get_repository(self.path)
+        if repo.data is not self.data:
+            repo.data = self.data
+            repo.clear_caches()
+        return self.path
+
+    def clear_caches(self):
+        """Drop cached package resources, so the next solve is cold."""
+        repo = package_repository_manager.get_repository(self.path)
+        repo.clear_caches()
+
+    def get_requests(self, num_requests=10, request_size=3):
+        """Generate a reproducible list of package requests.
+
+        Requests are biased toward low-index families, because they have the
+        deepest dependency trees.
+
+        Returns:
+            List of list of str.
+        """
+        rand = random.Random(self.seed + 2)
+        candidates = self.family_names[:max(self.num_families // 4, 1)]
+        request_size = min(request_size, len(candidates))
+        requests = []
+
+        for _ in range(num_requests):
+            fams = rand.sample(candidates, request_size)
+            request = []
+
+            for fam in sorted(fams):
+                if rand.random() < 0.5:
+                    request.append(fam)
+                else:
+                    position = rand.uniform(0.5, 1.0)
+                    request.append(self._requirement(rand, fam, position))
+
+            requests.append(request)
+
+        return requests
+
+    def _requirement(self, rand, fam, position, offset=0):
+        # return a requirement on `fam` with a version roughly proportional to
+        # `position` (0-1) in its version history.
+        versions = self.versions[fam]
+        i = int(position * (len(versions) - 1)) - offset
+        i = max(0, min(len(versions) - 1, i + rand.randint(-2, 2)))
+        major = versions[i].split('.')[0]
+
+        if rand.random() < 0.5:
+            return "%s-%s" % (fam, major)
+        else:
+            return "%s-%s+" % (fam, '.'.join(versions[i].split('.')[:2]))
+
+    def _stale_requirement(self, rand, fam):
+        # return a requirement on an old version of `fam`, which will likely
+        # conflict with requirements of other packages
+        versions = self.versions[fam]
+        major = versions[0].split('.')[0]
+
+        if rand.random() < 0.5:
+            return "%s-%s" % (fam, major)
+        else:
+            return "%s-<%s" % (fam, versions[len(versions) // 2])
+
+
+class SolverBenchmark(object):
+    """Times solves over a synthetic universe.
+
+    Example:
+
+        >>> universe = SyntheticUniverse(num_families=500, seed=3)
+        >>> bench = SolverBenchmark(universe, universe.get_requests(5))
+        >>> results = bench.run()
+        >>> print(results["summary"]["solve_time"])
+    """
+    def __init__(self, universe, requests, repeats=1, track_memory=False,
+                 callback=None):
+        """Create a solver benchmark.
+
+        Args:
+            universe (`SyntheticUniverse`): Universe to solve against.
+            requests (list of list of str): Requests to solve.
+            repeats (int): Number of times to solve each request. The fastest
+                run is the one recorded.
+            track_memory (bool): If True, record peak memory use of each solve.
+                This uses `tracemalloc`, which slows solves down considerably,
+                so it is done in an extra untimed run.
+            callback (callable): If provided, called after each request is
+                benchmarked, with the result dict for that request.
+        """
+        self.universe = universe
+        self.requests = requests
+        self.repeats = max(repeats, 1)
+        self.track_memory = track_memory
+        self.callback = callback
+
+    def run(self):
+        """Run the benchmark.
+
+        Returns:
+            dict: Benchmark results, suitable for writing as JSON.
+        """
+        t = time.time()
+        _ = self.universe.data  # noqa
+        generate_time = time.time() - t
+
+        t = time.time()
+        packages_path = [self.universe.install()]
+        install_time = time.time() - t
+
+        results = []
+        for request in self.requests:
+            result = self._benchmark_request(request, packages_path)
+            results.append(result)
+            if self.callback:
+                self.callback(result)
+
+        solve_times = sorted(x["wall_time"]["total"] for x in results)
+        num_failed = len([x for x in results if x["status"] != "solved"])
+
+        summary = {
+            "num_requests": len(results),
+            "num_failed": num_failed,
+            "solve_time": sum(solve_times),
+            "max_solve_time": solve_times[-1] if solve_times else 0.0,
+            "median_solve_time": (solve_times[len(solve_times) // 2]
+                                  if solve_times else 0.0)
+        }
+
+        universe = self.universe.params
+        universe["num_packages"] = self.universe.num_packages
+
+        return {
+            "format_version": benchmark_format_version,
+            "rez_version": __version__,
+            "python_version": platform.python_version(),
+            "platform": platform.platform(),
+            "universe": universe,
+            "wall_time": {
+                "generate": generate_time,
+                "install": install_time
+            },
+            "results": results,
+            "summary": summary
+        }
+
+    def _benchmark_request(self, request, packages_path):
+        best = None
+
+        for _ in range(self.repeats):
+            self.universe.clear_caches()
+            gc.collect()
+
+            t1 = time.time()
+            solver = self._create_solver(request, packages_path)
+            t2 = time.time()
+            solver.solve()
+            t3 = time.time()
+
+            wall_time = {"init": t2 - t1, "solve": t3 - t2, "total": t3 - t1}
+            if best is None or wall_time["total"] < best[1]["total"]:
+                best = (solver, wall_time)
+
+        solver, wall_time = best
+
+        if solver.status == SolverStatus.solved:
+            resolve = [str(x) for x in solver.resolved_packages]
+        else:
+            resolve = None
+
+        return {
+            "request": request,
+            "status": solver.status.name,
+            "resolve": resolve,
+            "wall_time": wall_time,
+            "peak_memory": self._peak_memory(request, packages_path),
+            "solve_stats": solver.solve_stats
+        }
+
+    def _peak_memory(self, request, packages_path):
+        if not self.track_memory:
+            return None
+
+        try:
+            import tracemalloc
+        except ImportError:  # py2
+            return None
+
+        self.universe.clear_caches()
+        gc.collect()
+
+        tracemalloc.start()
+        try:
+            solver = self._create_solver(request, packages_path)
+            solver.solve()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return peak
+
+    @classmethod
+    def _create_solver(cls, request, packages_path):
+        reqs = [Requirement(x) for x in request]
+        return Solver(reqs, packages_path)
+
+
+def load_results(filepath):
+    """Load benchmark results previously written by `save_results`."""
+    with open(filepath) as f:
+        return json.loads(f.read())
+
+
+def save_results(results, filepath):
+    """Write benchmark results to a JSON file."""
+    with open(filepath, 'w') as f:
+        f.write(json.dumps(results, indent=2, sort_keys=True))
+
+
+def compare_results(baseline, results, tolerance=0.1):
+    """Compare benchmark results against a baseline.
+
+    Requests are matched by their string representation. A request is
+    considered to have regressed if it got slower by more than `tolerance`,
+    or if it resolved to something different - the latter indicates a change
+    in solver behaviour, rather than performance.
+
+    Args:
+        baseline (dict): Results from a previous benchmark run.
+        results (dict): Results from the current benchmark run.
+        tolerance (float): Allowable fractional slowdown, eg 0.1 is 10%.
+
+    Returns:
+        List of dict, one per request in `results` that also appears in
+        `baseline`. Each dict contains keys 'request', 'baseline_time', 'time',
+        'ratio', 'resolve_changed' and 'regressed'.
+    """
+    baseline_results = dict(
+        (' '.join(x["request"]), x) for x in baseline.get("results", []))
+
+    comparisons = []
+    for result in results.get("results", []):
+        request_str = ' '.join(result["request"])
+        baseline_result = baseline_results.get(request_str)
+        if baseline_result is None:
+            continue
+
+        baseline_time = baseline_result["wall_time"]["total"]
+        time_ = result["wall_time"]["total"]
+        ratio = time_ / baseline_time if baseline_time else 1.0
+
+        # note that the order of packages that don't depend on one another is
+        # not guaranteed to be the same across processes, so only the set of
+        # resolved packages is compared
+        resolve_changed = (
+            (result["status"], sorted(result["resolve"] or []))
+            != (baseline_result["status"],
+                sorted(baseline_result["resolve"] or [])))
+
+        comparisons.append({
+            "request": request_str,
+            "baseline_time": baseline_time,
+            "time": time_,
+            "ratio": ratio,
+            "resolve_changed": resolve_changed,
+            "regressed": resolve_changed or (ratio > 1.0 + tolerance)
+        })
+
+    return comparisons
+
+
+# Copyright 2013-2016 Allan Johns.
+#
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
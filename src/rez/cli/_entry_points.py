@@ -96,6 +96,13 @@ def run_rez_fwd():
     return run("forward")
 
 
+@scriptname("rez-benchmark")
+def run_rez_benchmark():
+    check_production_install()
+    from rez.cli._main import run
+    return run("benchmark")
+
+
 @scriptname("rez-bind")
 def run_rez_bind():
     check_production_install()
@@ -180,6 +187,13 @@ def run_rez_memcache():
     return run("memcache")
 
 
+@scriptname("rez-pack-repo")
+def run_rez_pack_repo():
+    check_production_install()
+    from rez.cli._main import run
+    return run("pack-repo")
+
+
 @scriptname("rez-pip")
 def run_rez_pip():
     check_production_install()
@@ -222,6 +236,13 @@ def run_rez_selftest():
     return run("selftest")
 
 
+@scriptname("rez-serve")
+def run_rez_serve():
+    check_production_install()
+    from rez.cli._main import run
+    return run("serve")
+
+
 @scriptname("rez-status")
 def run_rez_status():
     check_production_install()
@@ -17,6 +17,7 @@ from argparse import _SubParsersAction, ArgumentParser, SUPPRESS, \
 # * missing: Native python argparse behavior.
 #
 subcommands = {
+    "benchmark": {},
     "bind": {},
     "build": {
         "arg_mode": "grouped"
@@ -40,6 +41,7 @@ subcommands = {
     "help": {},
     "interpret": {},
     "memcache": {},
+    "pack-repo": {},
     "pip": {},
     "plugins": {},
     "python": {
@@ -50,6 +52,7 @@ subcommands = {
     },
     "search": {},
     "selftest": {},
+    "serve": {},
     "status": {},
     "suite": {},
     "test": {},
@@ -0,0 +1,135 @@
+"""
+Benchmark the solver against a synthetic package repository.
+"""
+from __future__ import print_function
+
+
+def setup_parser(parser, completions=False):
+    parser.add_argument(
+        "--families", type=int, default=1000, metavar="N",
+        help="number of package families to generate (default: %(default)s)")
+    parser.add_argument(
+        "--versions", type=int, default=20, metavar="N",
+        help="number of versions per family (default: %(default)s)")
+    parser.add_argument(
+        "--variants", type=int, default=2, metavar="N",
+        help="maximum number of variants per package (default: %(default)s)")
+    parser.add_argument(
+        "--requires", type=int, default=3, metavar="N",
+        help="maximum number of requirements per package (default: %(default)s)")
+    parser.add_argument(
+        "--conflict-ratio", type=float, default=0.3, metavar="RATIO",
+        help="probability of a family's recent releases having a stale "
+        "requirement, and so likely to cause a conflict (default: %(default)s)")
+    parser.add_argument(
+        "--seed", type=int, default=0,
+        help="random seed (default: %(default)s)")
+    parser.add_argument(
+        "-n", "--num-requests", type=int, default=10, metavar="N",
+        help="number of requests to solve (default: %(default)s)")
+    parser.add_argument(
+        "--request-size", type=int, default=3, metavar="N",
+        help="number of packages per request (default: %(default)s)")
+    parser.add_argument(
+        "-r", "--repeats", type=int, default=1, metavar="N",
+        help="solve each request N times and record the fastest (default: "
+        "%(default)s)")
+    parser.add_argument(
+        "-m", "--memory", action="store_true",
+        help="record peak memory usage of each solve (python 3 only)")
+    parser.add_argument(
+        "-o", "--output", type=str, metavar="FILE",
+        help="write results to FILE as JSON")
+    parser.add_argument(
+        "-c", "--compare", type=str, metavar="FILE",
+        help="compare results against a previous benchmark result FILE, and "
+        "exit with non-zero status if there are regressions")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.1, metavar="RATIO",
+        help="allowable fractional slowdown when comparing (default: "
+        "%(default)s)")
+
+
+def command(opts, parser, extra_arg_groups=None):
+    from rez.benchmark import SyntheticUniverse, SolverBenchmark, \
+        load_results, save_results, compare_results
+    from rez.utils.formatting import columnise
+    import sys
+
+    universe = SyntheticUniverse(
+        num_families=opts.families,
+        num_versions=opts.versions,
+        num_variants=opts.variants,
+        num_requires=opts.requires,
+        conflict_ratio=opts.conflict_ratio,
+        seed=opts.seed)
+
+    requests = universe.get_requests(num_requests=opts.num_requests,
+                                     request_size=opts.request_size)
+
+    def _print_result(result):
+        stats = result["solve_stats"]["global"]
+        print("%-8s %8.3fs  solves=%-5d fails=%-5d %s"
+              % (result["status"], result["wall_time"]["total"],
+                 stats["num_solves"], stats["num_fails"],
+                 ' '.join(result["request"])))
+
+    bench = SolverBenchmark(universe, requests,
+                            repeats=opts.repeats,
+                            track_memory=opts.memory,
+                            callback=(_print_result if opts.verbose else None))
+
+    results = bench.run()
+
+    summary = results["summary"]
+    print("%d packages, %d requests, %d failed, total solve time: %.3fs"
+          % (results["universe"]["num_packages"], summary["num_requests"],
+             summary["num_failed"], summary["solve_time"]))
+
+    if opts.output:
+        save_results(results, opts.output)
+        print("results written to %s" % opts.output)
+
+    if opts.compare:
+        baseline = load_results(opts.compare)
+        comparisons = compare_results(baseline, results,
+                                      tolerance=opts.tolerance)
+
+        rows = [("REQUEST", "BASELINE", "CURRENT", "RATIO", ""),
+                ("-------", "--------", "-------", "-----", "")]
+
+        for entry in comparisons:
+            if entry["resolve_changed"]:
+                note = "RESOLVE CHANGED"
+            elif entry["regressed"]:
+                note = "SLOWER"
+            else:
+                note = ''
+
+            rows.append((entry["request"],
+                         "%.3fs" % entry["baseline_time"],
+                         "%.3fs" % entry["time"],
+                         "%.2f" % entry["ratio"],
+                         note))
+
+        print('')
+        print('\n'.join(columnise(rows)))
+
+        if any(x["regressed"] for x in comparisons):
+            sys.exit(1)
+
+
+# Copyright 2013-2016 Allan Johns.
+#
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
@@ -86,6 +86,16 @@ def setup_parser(parser, completions=False):
     parser.add_argument(
         "--patch-rank", type=int, metavar="N", default=0,
         help="patch rank. Ignored if --patch is not present")
+    parser.add_argument(
+        "--prefer-current", dest="prefer_current", action="store_true",
+        help="prefer the packages in the current context, where they still "
+        "fit the patched request, rather than the latest packages. Ignored if "
+        "--patch is not present")
+    batch_action = parser.add_argument(
+        "--batch", type=str, metavar="FILE",
+        help="resolve each request listed in FILE (one per line), sharing "
+        "loaded packages between the resolves. Each context is saved to the "
+        "directory given by --output, as <line number>.rxt")
     parser.add_argument(
         "--no-cache", dest="no_cache", action="store_true",
         help="do not fetch cached resolves")
@@ -109,6 +119,11 @@ def setup_parser(parser, completions=False):
     parser.add_argument(
         "--stats", action="store_true",
         help="print advanced solver stats")
+    parser.add_argument(
+        "--profile-solve", type=str, metavar="FILE",
+        help="profile the solve, writing the time spent on each package family "
+        "to FILE as folded stacks (which flamegraph tools can read), and "
+        "printing the most expensive families. Cached resolves are not used")
     parser.add_argument(
         "--pre-command", type=str, help=SUPPRESS)
     PKG_action = parser.add_argument(
@@ -123,6 +138,7 @@ def setup_parser(parser, completions=False):
             ExecutablesCompleter, AndCompleter, SequencedCompleter
         command_action.completer = AndCompleter(ExecutablesCompleter, FilesCompleter())
         input_action.completer = FilesCompleter(dirs=False, file_patterns=["*.rxt"])
+        batch_action.completer = FilesCompleter(dirs=False)
         PKG_action.completer = PackageCompleter
         extra_0_action.completer = SequencedCompleter(
             "extra_0", ExecutablesCompleter, FilesCompleter())
@@ -131,7 +147,6 @@ def setup_parser(parser, completions=False):
 def command(opts, parser, extra_arg_groups=None):
     from rez.resolved_context import ResolvedContext
     from rez.resolver import ResolverStatus
-    from rez.package_filter import PackageFilterList, Rule
     from rez.utils.formatting import get_epoch_time_from_str
     from rez.config import config
     import select
@@ -147,6 +162,8 @@ def command(opts, parser, extra_arg_groups=None):
 
     context = None
     request = opts.PKG
+    preferred_variants = None
+    profiler = _create_profiler(opts)
     t = get_epoch_time_from_str(opts.time) if opts.time else None
 
     if opts.paths is None:
@@ -156,6 +173,16 @@ def command(opts, parser, extra_arg_groups=None):
         pkg_paths = opts.paths.split(os.pathsep)
         pkg_paths = [os.path.expanduser(x) for x in pkg_paths if x]
 
+    if opts.batch:
+        if opts.PKG or opts.input or opts.patch or command:
+            parser.error("Cannot use --batch with PKG(s), --input, --patch or "
+                         "a command.")
+        if not opts.output or opts.output == '-':
+            parser.error("--batch requires an --output directory.")
+
+        _batch_resolve(opts, timestamp=t, package_paths=pkg_paths,
+                       profiler=profiler)
+
     if opts.input:
         if opts.PKG and not opts.patch:
             parser.error("Cannot use --input and provide PKG(s), unless patching.")
@@ -174,36 +201,29 @@ def command(opts, parser, extra_arg_groups=None):
         request = context.get_patched_request(request,
                                               strict=opts.strict,
                                               rank=opts.patch_rank)
+        if opts.prefer_current and context.success:
+            preferred_variants = context.resolved_packages
         context = None
 
     if context is None:
-        # create package filters
-        if opts.no_filters:
-            package_filter = PackageFilterList()
-        else:
-            package_filter = PackageFilterList.singleton.copy()
-
-        for rule_str in (opts.exclude or []):
-            rule = Rule.parse_rule(rule_str)
-            package_filter.add_exclusion(rule)
-
-        for rule_str in (opts.include or []):
-            rule = Rule.parse_rule(rule_str)
-            package_filter.add_inclusion(rule)
-
         # perform the resolve
         context = ResolvedContext(package_requests=request,
                                   timestamp=t,
                                   package_paths=pkg_paths,
                                   building=opts.build,
-                                  package_filter=package_filter,
+                                  package_filter=_create_package_filter(opts),
                                   add_implicit_packages=(not opts.no_implicit),
                                   verbosity=opts.verbose,
                                   max_fails=opts.max_fails,
                                   time_limit=opts.time_limit,
                                   caching=(not opts.no_cache),
                                   suppress_passive=opts.no_passive,
-                                  print_stats=opts.stats)
+                                  print_stats=opts.stats,
+                                  preferred_variants=preferred_variants,
+                                  profiler=profiler)
+
+        if profiler:
+            _write_profile(opts, profiler)
 
     success = (context.status == ResolverStatus.solved)
 
@@ -252,6 +272,100 @@ def command(opts, parser, extra_arg_groups=None):
     sys.exit(returncode)
 
 
+def _create_package_filter(opts):
+    from rez.package_filter import PackageFilterList, Rule
+
+    if opts.no_filters:
+        package_filter = PackageFilterList()
+    else:
+        package_filter = PackageFilterList.singleton.copy()
+
+    for rule_str in (opts.exclude or []):
+        rule = Rule.parse_rule(rule_str)
+        package_filter.add_exclusion(rule)
+
+    for rule_str in (opts.include or []):
+        rule = Rule.parse_rule(rule_str)
+        package_filter.add_inclusion(rule)
+
+    return package_filter
+
+
+def _create_profiler(opts):
+    from rez.solver import SolverProfiler
+
+    if opts.profile_solve:
+        return SolverProfiler()
+    return None
+
+
+def _write_profile(opts, profiler):
+    import sys
+
+    with open(opts.profile_solve, 'w') as f:
+        profiler.write_folded(f)
+
+    print("solve profile written to %s:" % opts.profile_solve, file=sys.stderr)
+    profiler.print_summary(buf=sys.stderr, limit=10)
+
+
+def _batch_resolve(opts, timestamp, package_paths, profiler=None):
+    from rez.resolved_context import ResolvedContext
+    from rez.resolver import ResolverStatus
+    import sys
+    import os
+    import os.path
+
+    # one request per line, skipping blank lines and comments
+    line_numbers = []
+    requests = []
+    with open(opts.batch) as f:
+        for i, line in enumerate(f):
+            line = line.strip()
+            if line and not line.startswith('#'):
+                line_numbers.append(i + 1)
+                requests.append(line.split())
+
+    contexts = ResolvedContext.resolve_batch(
+        requests,
+        timestamp=timestamp,
+        package_paths=package_paths,
+        building=opts.build,
+        package_filter=_create_package_filter(opts),
+        add_implicit_packages=(not opts.no_implicit),
+        verbosity=opts.verbose,
+        max_fails=opts.max_fails,
+        time_limit=opts.time_limit,
+        caching=(not opts.no_cache),
+        suppress_passive=opts.no_passive,
+        print_stats=opts.stats,
+        profiler=profiler)
+
+    if profiler:
+        _write_profile(opts, profiler)
+
+    if not os.path.exists(opts.output):
+        os.makedirs(opts.output)
+
+    all_success = True
+    for line_number, context in zip(line_numbers, contexts):
+        if isinstance(context, Exception):
+            all_success = False
+            print("line %d: %s: %s" % (line_number, context.__class__.__name__,
+                                       str(context)), file=sys.stderr)
+            continue
+
+        filepath = os.path.join(opts.output, "%d.rxt" % line_number)
+        context.save(filepath)
+
+        success = (context.status == ResolverStatus.solved)
+        all_success = (all_success and success)
+        print("%s: %s (%s)" % (context.status.name, filepath,
+                               ' '.join(map(str, context.requested_packages()))))
+
+    sys.exit(0 if all_success else 1)
+
+
 # Copyright 2013-2016 Allan Johns.
 #
 # This library is free software: you can redistribute it and/or
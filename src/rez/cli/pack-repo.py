@@ -0,0 +1,42 @@
+"""
+Write a pack file of the packages in a repository, for use as a 'packed'
+package repository.
+"""
+from __future__ import print_function
+
+
+def setup_parser(parser, completions=False):
+    parser.add_argument(
+        "SOURCE", type=str,
+        help="package repository to pack, eg '/packages/released'")
+    parser.add_argument(
+        "FILE", type=str,
+        help="pack file to write. Add 'packed@FILE' to packages_path to use it")
+
+
+def command(opts, parser, extra_arg_groups=None):
+    from rezplugins.package_repository.packed import write_pack_file
+    import os.path
+
+    filepath = os.path.abspath(opts.FILE)
+    num_families, num_packages = write_pack_file(filepath, opts.SOURCE)
+
+    if opts.verbose:
+        print("Packed %d packages from %d families into %s"
+              % (num_packages, num_families, filepath))
+
+
+# Copyright 2013-2016 Allan Johns.
+#
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
@@ -0,0 +1,57 @@
+"""
+Run a resolve server, which keeps packages in memory between resolves.
+"""
+from __future__ import print_function
+
+
+def setup_parser(parser, completions=False):
+    parser.add_argument(
+        "--socket", type=str, metavar="PATH",
+        help="unix socket to listen on (default: the resolve_server_socket "
+        "setting)")
+
+
+def command(opts, parser, extra_arg_groups=None):
+    from rez.config import config
+    from rez.resolve_server import ResolveServer
+    from rez.exceptions import ResolveServerError
+    import socket
+    import sys
+
+    socket_path = opts.socket or config.resolve_server_socket
+    if not socket_path:
+        parser.error("No socket given, and the resolve_server_socket setting "
+                     "is not set")
+
+    if not hasattr(socket, "AF_UNIX"):
+        print("Resolve servers are not supported on this platform",
+              file=sys.stderr)
+        sys.exit(1)
+
+    # -v prints a line per resolve
+    server = ResolveServer(socket_path, verbose=bool(opts.verbose))
+    print("Serving resolves on %s" % server.socket_path)
+
+    try:
+        server.serve_forever()
+    except ResolveServerError as e:
+        print(str(e), file=sys.stderr)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("Served %d resolves" % server.num_resolves)
+
+
+# Copyright 2013-2016 Allan Johns.
+#
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
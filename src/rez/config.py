@@ -10,9 +10,7 @@ from rez.exceptions import ConfigurationError
 from rez import module_root_path
 from rez.system import system
 from rez.vendor.schema.schema import Schema, SchemaError, And, Or, Use
-from rez.vendor import yaml
 from rez.vendor.six import six
-from rez.vendor.yaml.error import YAMLError
 from rez.backport.lru_cache import lru_cache
 from contextlib import contextmanager
 from inspect import ismodule
@@ -350,19 +348,34 @@ config_schema = Schema({
     "variant_shortlinks_dirname":                   OptionalStr,
     "build_thread_count":                           BuildThreadCount_,
     "resource_caching_maxsize":                     Int,
+    "resource_caching_max_memory":                  Int,
     "max_package_changelog_chars":                  Int,
     "max_package_changelog_revisions":              Int,
     "memcached_package_file_min_compress_len":      Int,
     "memcached_context_file_min_compress_len":      Int,
     "memcached_listdir_min_compress_len":           Int,
     "memcached_resolve_min_compress_len":           Int,
+    "memcached_local_cache_size":                   Int,
+    "memcached_local_cache_max_bytes":              Int,
     "allow_unversioned_packages":                   Bool,
     "rxt_as_yaml":                                  Bool,
     "color_enabled":                                ForceOrBool,
     "resolve_caching":                              Bool,
+    "resolve_cache_path":                           OptionalStr,
+    "resolve_cache_max_size":                       Int,
+    "resolve_server_socket":                        OptionalStr,
+    "resolve_server_timeout":                       Int,
     "cache_package_files":                          Bool,
+    "package_file_cache_path":                      OptionalStr,
+    "package_file_cache_max_size":                  Int,
+    "context_actions_cache_path":                   OptionalStr,
+    "context_actions_cache_max_size":               Int,
     "cache_listdir":                                Bool,
     "prune_failed_graph":                           Bool,
+    "solver_version_sort_keys":                     Bool,
+    "solver_speculative_processes":                 Int,
+    "solver_learn_nogoods":                         Bool,
+    "solver_prefetch_threads":                      Int,
     "all_parent_variables":                         Bool,
     "all_resetting_variables":                      Bool,
     "package_commands_sourced_first":               Bool,
@@ -379,6 +392,7 @@ config_schema = Schema({
     "debug_package_exclusions":                     Bool,
     "debug_memcache":                               Bool,
     "debug_resolve_memcache":                       Bool,
+    "debug_resolve_server":                         Bool,
     "debug_all":                                    Bool,
     "debug_none":                                   Bool,
     "quiet":                                        Bool,
@@ -853,6 +867,9 @@ def _load_config_py(filepath):
 
 @lru_cache()
 def _load_config_yaml(filepath):
+    from rez.vendor import yaml
+    from rez.vendor.yaml.error import YAMLError
+
     with open(filepath) as f:
         content = f.read()
     try:
@@ -174,6 +174,11 @@ class PackageRepositoryError(RezError):
     pass
 
 
+class ResolveServerError(RezError):
+    """Resolve server related errors."""
+    pass
+
+
 class InvalidPackageError(RezError):
     """A special case exception used in package 'preprocess function'."""
     pass
@@ -1,4 +1,5 @@
-from rez.utils.resources import ResourcePool, ResourceHandle
+from rez.utils.resources import ResourcePool, ResourceHandle, \
+    get_resource_memory_budget
 from rez.utils.data_utils import cached_property
 from rez.plugin_managers import plugin_manager
 from rez.config import config
@@ -160,6 +161,27 @@ class PackageRepository(object):
         """
         raise NotImplementedError
 
+    def get_package_versions(self, package_family_resource):
+        """Get a lightweight index of the package versions in a family.
+
+        This lets callers that only need some of a family's packages - such as
+        those within a version range - avoid creating (and perhaps loading) a
+        package resource for every version. The index must describe the same
+        packages that `iter_packages` returns.
+
+        This may not be applicable to your repository type, leave as-is if so.
+
+        Args:
+            package_family_resource (`PackageFamilyResource`): Parent family.
+
+        Returns:
+            List of (`Version`, callable) tuples, in no particular order, or
+            None if an index is not available. Each callable takes no arguments,
+            and returns the `PackageResource` of that version, or None if it is
+            not a valid package.
+        """
+        return None
+
     def iter_variants(self, package_resource):
         """Iterate over the variants within the given package.
 
@@ -239,6 +261,52 @@ class PackageRepository(object):
         """
         return None
 
+    def get_state_key(self, family_names):
+        """Get a value that changes whenever the given package families change.
+
+        This is used by long-running processes such as the resolve server (see
+        `rez.resolve_server`), which keep package resources in memory between
+        resolves. When the state changes, cached resources are discarded.
+        Unlike `get_variant_state_handle`, this must not return cached values.
+
+        This may not be applicable to your repository type, leave as-is if so.
+
+        Args:
+            family_names (list of str): Names of the families of interest.
+
+        Returns:
+            A hashable value, or None if changes cannot be detected.
+        """
+        return None
+
+    def get_change_journal_position(self):
+        """Get the current position in the repository's change journal.
+
+        Repositories may keep a journal of the package families changed in
+        them. This lets resolve caching find out what has changed since a
+        resolve was cached (see `get_changes_since`), instead of checking the
+        state of every package in the resolve.
+
+        This may not be applicable to your repository type, leave as-is if so.
+
+        Returns:
+            A hashable, picklable value, or None if the repository does not
+            keep a change journal.
+        """
+        return None
+
+    def get_changes_since(self, position):
+        """Get the package families changed since a change journal position.
+
+        Args:
+            position: Value returned by `get_change_journal_position`.
+
+        Returns:
+            set of str: Names of the changed package families, or None if the
+            changes since `position` are not known.
+        """
+        return None
+
     def get_last_release_time(self, package_family_resource):
         """Get the last time a package was added to the given family.
 
@@ -362,7 +430,8 @@ class PackageRepositoryManager(object):
         if cache_size < 0:
             cache_size = None
         self.cache_size = cache_size
-        self.pool = ResourcePool(cache_size=cache_size)
+        self.pool = ResourcePool(cache_size=cache_size,
+                                 budget=get_resource_memory_budget())
 
     @lru_cache(maxsize=None)
     def get_repository(self, path):
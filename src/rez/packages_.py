@@ -76,8 +76,8 @@ class PackageBaseResourceWrapper(PackageRepositoryResourceWrapper):
         super(PackageBaseResourceWrapper, self).__init__(resource)
         self.context = context
 
-        # cached results of late-bound funcs
-        self._late_binding_returnvalues = {}
+        # cached results of late-bound funcs, created on first use
+        self._late_binding_returnvalues = None
 
     def set_context(self, context):
         self.context = context
@@ -140,6 +140,8 @@ class PackageBaseResourceWrapper(PackageRepositoryResourceWrapper):
     def _wrap_forwarded(self, key, value):
         if isinstance(value, SourceCode) and value.late_binding:
             # get cached return value if present
+            if self._late_binding_returnvalues is None:
+                self._late_binding_returnvalues = {}
             value_ = self._late_binding_returnvalues.get(key, KeyError)
 
             if value_ is KeyError:
@@ -521,6 +523,43 @@ def iter_packages(name, range_=None, paths=None):
             yield Package(package_resource)
 
 
+def iter_package_versions(name, paths=None):
+    """Iterate over package versions, creating packages only on demand.
+
+    This is a lightweight alternative to `iter_packages`, for when only some of
+    a family's packages are needed. Packages of the same name and version
+    earlier in the search path take precedence, as in `iter_packages`. An
+    invalid package does not hide a valid one of the same version later in the
+    search path.
+
+    Args:
+        name (str): Name of the package, eg 'maya'.
+        paths (list of str, optional): paths to search for packages, defaults
+            to `config.packages_path`.
+
+    Returns:
+        Iterator of (`Version`, callable) tuples, in no particular order. Each
+        callable takes no arguments, and returns the `Package` of that version,
+        or None if it is not a valid package.
+    """
+    entries = _get_families(name, paths)
+
+    # {version: [package resource getter]}, in search path order
+    getters = {}
+    for repo, family_resource in entries:
+        index = repo.get_package_versions(family_resource)
+
+        if index is None:
+            index = ((x.version, _package_resource_getter(x))
+                     for x in repo.iter_packages(family_resource))
+
+        for version, get_package_resource in index:
+            getters.setdefault(version, []).append(get_package_resource)
+
+    for version, get_package_resources in getters.items():
+        yield version, _package_getter(get_package_resources)
+
+
 def get_package(name, version, paths=None):
     """Get an exact version of a package.
 
@@ -761,6 +800,22 @@ def _get_families(name, paths=None):
     return entries
 
 
+def _package_resource_getter(package_resource):
+    return lambda: package_resource
+
+
+def _package_getter(get_package_resources):
+    # the first valid package wins
+    def _get_package():
+        for get_package_resource in get_package_resources:
+            package_resource = get_package_resource()
+            if package_resource:
+                return Package(package_resource)
+        return None
+
+    return _get_package
+
+
 def _check_class(resource, cls):
     if not isinstance(resource, cls):
         raise ResourceError("Expected %s, got %s"
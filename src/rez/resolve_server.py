@@ -0,0 +1,453 @@
+"""
+A long-running resolve server, and the client used to forward resolves to it.
+
+The server listens on a unix socket (see the *resolve_server_socket* setting),
+and keeps package repositories, loaded packages and their sorted variants in
+memory between resolves. Resolves forwarded to it therefore skip most of the
+package loading that an in-process resolve performs. Before each resolve, the
+server checks whether the package repositories it has read from have changed
+(see `PackageRepository.get_state_key`), and discards everything it has cached
+if so.
+
+A resolve that the server cannot perform is simply performed in-process by the
+client instead, so a missing or broken server never causes a resolve to fail.
+"""
+from __future__ import print_function
+
+from rez.config import config
+from rez.exceptions import ResolveServerError
+from rez.package_repository import package_repository_manager
+from rez.utils import json
+from rez.utils._version import _rez_version
+from rez.vendor.six import six
+import socket
+import struct
+import time
+import os
+import os.path
+
+
+# this version should be changed if and when the protocol changes
+protocol_version = 2
+
+# seconds that the server waits on a client to send a request, or to receive a
+# response, before dropping the connection
+connection_timeout = 10.0
+
+# settings that affect the result of a solve. A server only performs resolves
+# for clients whose settings match its own.
+solve_settings = (
+    "allow_unversioned_packages",
+    "prune_failed_graph",
+    "solver_learn_nogoods",
+    "solver_version_sort_keys",
+    "variant_select_mode"
+)
+
+
+class ResolveServer(object):
+    """Performs resolves on behalf of clients, keeping packages in memory.
+
+    Resolves are performed one at a time, in the order they are received.
+    """
+    def __init__(self, socket_path, verbose=False):
+        """Create a resolve server.
+
+        Args:
+            socket_path (str): Path of the unix socket to listen on.
+            verbose (bool): If True, print a line for each resolve.
+        """
+        from rez.solver import SharedPackageVariantCache
+
+        self.socket_path = os.path.expanduser(socket_path)
+        self.verbose = verbose
+        self.variant_cache = SharedPackageVariantCache()
+        self.num_resolves = 0
+
+        # {package-path: {family-name: state key}}
+        self.repository_states = {}
+
+        self._print = config.debug_printer("resolve_server")
+
+    def serve_forever(self):
+        """Accept and perform resolves until interrupted."""
+        sock = self._listen()
+
+        try:
+            while True:
+                conn, _ = sock.accept()
+                try:
+                    # so that a stalled client cannot block other clients
+                    conn.settimeout(connection_timeout)
+                    self._handle_connection(conn)
+                except (IOError, OSError, socket.error) as e:
+                    self._print("Error communicating with client: %s", e)
+                finally:
+                    conn.close()
+        finally:
+            sock.close()
+            os.remove(self.socket_path)
+
+    def resolve(self, request):
+        """Perform a resolve.
+
+        Args:
+            request (dict): Resolve request, see `ResolveServerClient.solve`.
+
+        Returns:
+            dict: Contains 'solver_dict' (see `Resolver`) if the resolve was
+            performed, otherwise 'error', describing why it was not.
+        """
+        from rez.resolver import Resolver
+        from rez.resolved_context import ResolvedContext
+        from rez.package_filter import PackageFilterList
+        from rez.packages_ import get_variant
+        from rez.utils.formatting import PackageRequest
+        from rez import package_order
+
+        if request.get("protocol_version") != protocol_version:
+            return dict(error="protocol version mismatch")
+        if request.get("rez_version") != _rez_version:
+            return dict(error="rez version mismatch")
+        if request.get("settings") != get_solve_settings():
+            return dict(error="solve settings mismatch")
+
+        package_paths = request["package_paths"]
+
+        # taken before the solve, so that a package that changes during the
+        # solve is seen as changed by the next resolve
+        states = self._validate_caches(package_paths)
+
+        package_filter = None
+        if request.get("package_filter") is not None:
+            package_filter = PackageFilterList.from_pod(request["package_filter"])
+
+        package_orderers = None
+        if request.get("package_orderers") is not None:
+            package_orderers = [package_order.from_pod(x)
+                                for x in request["package_orderers"]]
+
+        preferred_variants = None
+        if request.get("preferred_variants") is not None:
+            preferred_variants = [get_variant(x)
+                                  for x in request["preferred_variants"]]
+
+        callback = ResolvedContext.Callback(max_fails=request["max_fails"],
+                                            time_limit=request["time_limit"],
+                                            callback=None)
+
+        package_requests = [PackageRequest(x)
+                            for x in request["package_requests"]]
+
+        resolver = Resolver(context=None,
+                            package_requests=package_requests,
+                            package_paths=package_paths,
+                            package_filter=package_filter,
+                            package_orderers=package_orderers,
+                            building=request["building"],
+                            caching=False,
+                            callback=callback,
+                            preferred_variants=preferred_variants,
+                            variant_cache=self.variant_cache)
+
+        solver = resolver._solve()
+        self.num_resolves += 1
+        self._update_repository_states(package_paths, states)
+
+        # late bound requirements may depend on the client's context
+        if solver.context_dependent:
+            return dict(error="resolve is context dependent")
+
+        return dict(solver_dict=resolver._solver_to_dict(solver))
+
+    def _listen(self):
+        if os.path.exists(self.socket_path):
+            if _connect(self.socket_path, timeout=1.0) is not None:
+                raise ResolveServerError(
+                    "A resolve server is already listening on %s"
+                    % self.socket_path)
+            os.remove(self.socket_path)  # left over by a server that died
+
+        path = os.path.dirname(self.socket_path)
+        if path and not os.path.exists(path):
+            os.makedirs(path, 0o700)
+
+        # the socket is only accessible to the current user
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o077)
+        try:
+            sock.bind(self.socket_path)
+        finally:
+            os.umask(umask)
+
+        sock.listen(16)
+        return sock
+
+    def _handle_connection(self, conn):
+        data = _recv_message(conn)
+        if data is None:
+            return
+
+        t = time.time()
+        request = json.loads(data.decode("utf-8"))
+
+        try:
+            response = self.resolve(request)
+            if "solver_dict" in response:
+                response["solver_dict"] = _solver_dict_to_pod(
+                    response["solver_dict"])
+        except Exception as e:
+            # the client performs the resolve itself, and reports the error
+            response = dict(error="%s: %s" % (e.__class__.__name__, str(e)))
+
+        secs = time.time() - t
+        if "error" in response:
+            msg = "not resolved (%s)" % response["error"]
+        else:
+            msg = "%s in %.2f secs" % (response["solver_dict"]["status"], secs)
+
+        request_str = ' '.join(request.get("package_requests", []))
+        self._print("Request %r: %s", request_str, msg)
+        if self.verbose:
+            print("%s: %s" % (request_str, msg))
+
+        _send_message(conn, json.dumps(response).encode("utf-8"))
+
+    def _validate_caches(self, package_paths):
+        # discard everything if a repository has changed since it was last
+        # used, and return the current state of each cached family
+        family_names = self._get_family_names()
+        states = {}
+
+        for path in package_paths:
+            family_states = self._get_family_states(path, family_names)
+            old_states = self.repository_states.get(path, {})
+
+            for name, old_key in old_states.items():
+                if family_states.get(name) != old_key:
+                    self._print("Package family %r in repository %r has "
+                                "changed, clearing caches", name, path)
+                    self.clear_caches()
+                    return dict((x, {}) for x in package_paths)
+
+            states[path] = family_states
+
+        return states
+
+    def _update_repository_states(self, package_paths, states):
+        # families first loaded by the solve have no earlier state, so are
+        # keyed now
+        family_names = self._get_family_names()
+
+        for path in package_paths:
+            family_states = states[path]
+            new_names = [x for x in family_names if x not in family_states]
+            family_states.update(self._get_family_states(path, new_names))
+            self.repository_states[path] = family_states
+
+    def _get_family_states(self, path, family_names):
+        repo = package_repository_manager.get_repository(path)
+        return dict((x, repo.get_state_key([x])) for x in family_names)
+
+    def _get_family_names(self):
+        names = set()
+        for variant_lists in self.variant_cache.variant_lists.values():
+            names.update(variant_lists.keys())
+        return sorted(names)
+
+    def clear_caches(self):
+        """Discard all loaded packages and repository data."""
+        package_repository_manager.clear_caches()
+        self.variant_cache.clear()
+        self.repository_states = {}
+
+
+class ResolveServerClient(object):
+    """Forwards solves to a resolve server."""
+    def __init__(self, socket_path, max_fails=-1, time_limit=-1, timeout=None):
+        """Create a client.
+
+        Args:
+            socket_path (str): Path of the unix socket the server listens on.
+            max_fails (int): See `ResolvedContext`.
+            time_limit (int): See `ResolvedContext`.
+            timeout (int): Seconds to wait for the server to reply, after which
+                the server is treated as unavailable. Defaults to the
+                *resolve_server_timeout* setting.
+        """
+        self.socket_path = os.path.expanduser(socket_path)
+        self.max_fails = max_fails
+        self.time_limit = time_limit
+        self.timeout = (config.resolve_server_timeout if timeout is None
+                        else timeout)
+        self._print = config.debug_printer("resolve_server")
+
+    def solve(self, resolver):
+        """Perform a resolver's solve on the server.
+
+        Args:
+            resolver (`Resolver`): Resolver to perform the solve for.
+
+        Returns:
+            dict: Solve result, in the same form as is stored in the resolve
+            cache, or None if the server could not perform the solve.
+        """
+        from rez import package_order
+
+        for path in resolver.package_paths:
+            repo = package_repository_manager.get_repository(path)
+            if repo.name() == "memory":
+                return None  # not visible to the server
+
+        package_filter = None
+        if resolver.package_filter:
+            package_filter = resolver.package_filter.to_pod()
+
+        package_orderers = None
+        if resolver.package_orderers:
+            package_orderers = [package_order.to_pod(x)
+                                for x in resolver.package_orderers]
+
+        preferred_variants = None
+        if resolver.preferred_variants:
+            preferred_variants = [x.handle.to_dict()
+                                  for x in resolver.preferred_variants]
+
+        request = dict(
+            protocol_version=protocol_version,
+            rez_version=_rez_version,
+            settings=get_solve_settings(),
+            package_requests=[str(x) for x in resolver.package_requests],
+            package_paths=resolver.package_paths,
+            package_filter=package_filter,
+            package_orderers=package_orderers,
+            preferred_variants=preferred_variants,
+            building=resolver.building,
+            max_fails=self.max_fails,
+            time_limit=self.time_limit)
+
+        response = self._send_request(request)
+        if response is None:
+            return None
+
+        if "error" in response:
+            self._print("Resolve server did not resolve: %s", response["error"])
+            return None
+
+        self._print("Resolved by server at %s", self.socket_path)
+        return _solver_dict_from_pod(response["solver_dict"])
+
+    def _send_request(self, request):
+        sock = _connect(self.socket_path, reply_timeout=self.timeout)
+        if sock is None:
+            self._print("No resolve server at %s", self.socket_path)
+            return None
+
+        try:
+            _send_message(sock, json.dumps(request).encode("utf-8"))
+            data = _recv_message(sock)
+            if data is None:
+                self._print("Resolve server closed connection")
+                return None
+            return json.loads(data.decode("utf-8"))
+        except socket.timeout:
+            self._print("Resolve server did not reply within %s secs",
+                        self.timeout)
+            return None
+        except Exception as e:
+            self._print("Error communicating with resolve server: %s", e)
+            return None
+        finally:
+            sock.close()
+
+
+def get_solve_settings():
+    """Get the settings that affect the result of a solve.
+
+    Returns:
+        dict: Setting values, keyed by setting name.
+    """
+    return dict((x, getattr(config, x)) for x in solve_settings)
+
+
+def _solver_dict_to_pod(solver_dict):
+    # see `Resolver._solver_to_dict`
+    from rez.utils.graph_utils import write_compacted
+
+    d = solver_dict.copy()
+    d["status"] = d["status"].name
+
+    if d["graph"] is not None:
+        d["graph"] = write_compacted(d["graph"])
+    return d
+
+
+def _solver_dict_from_pod(d):
+    from rez.resolver import ResolverStatus
+    from rez.utils.graph_utils import read_graph_from_string
+
+    solver_dict = d.copy()
+    solver_dict["status"] = ResolverStatus[d["status"]]
+
+    if d["graph"] is not None:
+        solver_dict["graph"] = read_graph_from_string(d["graph"])
+    return solver_dict
+
+
+def _connect(socket_path, timeout=5.0, reply_timeout=None):
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+    except (IOError, OSError, socket.error):
+        sock.close()
+        return None
+
+    # note that a connection succeeds as soon as the server's listen backlog
+    # accepts it, even if the server is busy
+    sock.settimeout(reply_timeout)
+    return sock
+
+
+def _send_message(sock, data):
+    sock.sendall(struct.pack("!I", len(data)) + data)
+
+
+def _recv_message(sock):
+    header = _recv_bytes(sock, 4)
+    if header is None:
+        return None
+
+    size, = struct.unpack("!I", header)
+    return _recv_bytes(sock, size)
+
+
+def _recv_bytes(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 65536))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+
+    return six.b('').join(chunks)
+
+
+# Copyright 2013-2016 Allan Johns.
+#
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
@@ -2,8 +2,8 @@ from __future__ import print_function
 
 from rez import __version__, module_root_path
 from rez.package_repository import package_repository_manager
-from rez.solver import SolverCallbackReturn
 from rez.resolver import Resolver, ResolverStatus
+from rez.resolve_server import ResolveServerClient
 from rez.system import system
 from rez.config import config
 from rez.util import shlex_join, dedup, is_non_string_iterable
@@ -13,6 +13,7 @@ from rez.utils.formatting import columnise, PackageRequest, ENV_VAR_REGEX
 from rez.utils.data_utils import deep_del
 from rez.utils.filesystem import TempDirs
 from rez.utils.memcached import pool_memcached_connections
+from rez.utils.disk_cache import DiskCache
 from rez.backport.shutilwhich import which
 from rez.rex import RexExecutor, Python, OutputStyle
 from rez.rex_bindings import VersionBinding, VariantBinding, \
@@ -25,6 +26,7 @@ from rez.exceptions import ResolvedContextError, PackageCommandError, RezError
 from rez.utils.graph_utils import write_dot, write_compacted, read_graph_from_string
 from rez.vendor.six import six
 from rez.vendor.version.version import VersionRange
+from rez.vendor.version.util import VersionError
 from rez.vendor.enum import Enum
 from rez.vendor import yaml
 from rez.utils import json
@@ -33,6 +35,7 @@ from rez.utils.yaml import dump_yaml
 from tempfile import mkdtemp
 from functools import wraps
 import getpass
+import hashlib
 import socket
 import threading
 import traceback
@@ -108,6 +111,32 @@ def get_lock_request(name, version, patch_lock, weak=True):
     return PackageRequest(s)
 
 
+_context_actions_caches = threading.local()
+
+
+def _get_context_actions_cache():
+    """Get this thread's client of the local context actions cache.
+
+    Returns:
+        `DiskCache`: Cache client, or None if the cache is not enabled.
+    """
+    path = config.context_actions_cache_path
+    if not path:
+        return None
+
+    cache = getattr(_context_actions_caches, "cache", None)
+
+    if cache is None or cache.path != path:
+        if cache is not None:
+            cache.close()
+
+        max_size = config.context_actions_cache_max_size * 1024 * 1024
+        cache = DiskCache(path, max_size=max_size, atime_resolution=60)
+        _context_actions_caches.cache = cache
+
+    return cache
+
+
 class ResolvedContext(object):
     """A class that resolves, stores and spawns Rez environments.
 
@@ -134,6 +163,8 @@ class ResolvedContext(object):
             self.buf = buf or sys.stdout
 
         def __call__(self, state):
+            from rez.solver import SolverCallbackReturn
+
             if self.max_fails != -1 and state.num_fails >= self.max_fails:
                 reason = ("fail limit reached: aborted after %d failures"
                           % state.num_fails)
@@ -151,7 +182,8 @@ class ResolvedContext(object):
                  package_filter=None, package_orderers=None, max_fails=-1,
                  add_implicit_packages=True, time_limit=-1, callback=None,
                  package_load_callback=None, buf=None, suppress_passive=False,
-                 print_stats=False):
+                 print_stats=False, preferred_variants=None, variant_cache=None,
+                 profiler=None):
         """Perform a package resolve, and store the result.
 
         Args:
@@ -186,6 +218,18 @@ class ResolvedContext(object):
                 has had no effect on the solve. This argument only has an
                 effect if `verbosity` > 2.
             print_stats (bool): If true, print advanced solver stats at the end.
+            preferred_variants (list of `Variant`): Variants to try before any
+                others in their package family, where possible - typically the
+                resolve of an existing context that is being re-resolved with a
+                small change to the request. This only changes the order in
+                which the solver tries variants, so the result can differ from
+                a resolve without preferences. See `Solver`.
+            variant_cache (`SharedPackageVariantCache`): Cache of loaded package
+                variants, which can be shared between resolves. See
+                `resolve_batch`.
+            profiler (`SolverProfiler`): If not None, the solve is profiled
+                with this profiler. Profiled resolves are never read from the
+                resolve cache.
         """
         self.load_path = None
 
@@ -264,6 +308,15 @@ class ResolvedContext(object):
 
         request = self.requested_packages(include_implicit=True)
 
+        # resolves that report their progress are performed in-process
+        resolve_server = None
+        if config.resolve_server_socket and not (
+                callback or package_load_callback or variant_cache
+                or verbosity or print_stats or profiler):
+            resolve_server = ResolveServerClient(config.resolve_server_socket,
+                                                 max_fails=max_fails,
+                                                 time_limit=time_limit)
+
         resolver = Resolver(context=self,
                             package_requests=request,
                             package_paths=self.package_paths,
@@ -277,7 +330,11 @@ class ResolvedContext(object):
                             verbosity=verbosity,
                             buf=buf,
                             suppress_passive=suppress_passive,
-                            print_stats=print_stats)
+                            print_stats=print_stats,
+                            preferred_variants=preferred_variants,
+                            variant_cache=variant_cache,
+                            resolve_server=resolve_server,
+                            profiler=profiler)
 
         resolver.solve()
 
@@ -547,6 +604,44 @@ class ResolvedContext(object):
 
         buf.write(content)
 
+    @classmethod
+    @pool_memcached_connections
+    def resolve_batch(cls, package_requests_list, **kwargs):
+        """Resolve many requests, sharing loaded packages between resolves.
+
+        This is much faster than creating each context separately, since
+        packages common to the resolves are only loaded, and their variants
+        sorted, once.
+
+        Args:
+            package_requests_list (list of list): Requests to resolve, see
+                `package_requests` in `ResolvedContext.__init__`.
+            kwargs: Any other arguments to `ResolvedContext.__init__`, which
+                are used for every resolve.
+
+        Returns:
+            List containing, for each request, a `ResolvedContext` (which may
+            be a successful or failed resolve), or the exception raised if the
+            request could not be resolved at all - for example, if it is
+            malformed, or refers to a package family that does not exist.
+        """
+        from rez.solver import SharedPackageVariantCache
+
+        variant_cache = kwargs.pop("variant_cache", None) \
+            or SharedPackageVariantCache()
+
+        # one bad request does not stop the others from being resolved
+        contexts = []
+        for package_requests in package_requests_list:
+            try:
+                context = cls(package_requests, variant_cache=variant_cache,
+                              **kwargs)
+            except (RezError, VersionError) as e:
+                context = e
+            contexts.append(context)
+
+        return contexts
+
     @classmethod
     def get_current(cls):
         """Get the context for the current env, if there is one.
@@ -1570,8 +1665,105 @@ class ResolvedContext(object):
 
         return self.pre_resolve_bindings
 
+    def _get_actions_cache_key(self, executor):
+        """Get the key of the actions that `_execute` records in `executor`.
+
+        Returns:
+            str: Cache key, or None if the actions cannot be cached.
+        """
+        from rez.suite import Suite
+
+        manager = executor.manager
+        parent_variables = manager.parent_variables
+        if parent_variables is not True:
+            parent_variables = sorted(parent_variables)
+
+        variant_states = []
+        for variant in (self.resolved_packages or []):
+            try:
+                repo = variant.resource._repository
+                state = repo.get_variant_state_handle(variant.resource)
+            except (IOError, OSError):
+                return None
+            variant_states.append((variant.uri, state))
+
+        suite_paths = None
+        if SuiteVisibility[config.suite_visibility] != SuiteVisibility.never:
+            suite_paths = Suite.visible_suite_paths()
+
+        # the context file is typically a new temp file on every launch, and
+        # package commands have no need of it
+        environ = dict(manager.environ)
+        for name in ("REZ_RXT_FILE", "REZ_CONTEXT_FILE"):
+            if name in environ:
+                environ[name] = None
+
+        interpreter_cls = executor.interpreter.__class__
+
+        key = (
+            interpreter_cls.__module__, interpreter_cls.__name__,
+            sorted(environ.items()),
+            sorted(manager.parent_environ.items()),
+            parent_variables,
+            variant_states,
+            [str(x) for x in self._package_requests],
+            [str(x) for x in self.implicit_packages],
+            self.package_paths,
+            self.rez_path,
+            self.rez_version,
+            self.timestamp,
+            self.requested_timestamp,
+            self.building,
+            self.parent_suite_path,
+            suite_paths,
+            config.rez_1_environment_variables,
+            config.disable_rez_1_compatibility,
+            config.rez_tools_visibility,
+            config.suite_visibility,
+            config.catch_rex_errors,
+            sorted(config.env_var_separators.items()),
+            system.platform, system.arch, system.os, system.rez_bin_path
+        )
+
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return "context_actions:" + digest
+
     @pool_memcached_connections
     def _execute(self, executor):
+        """Run the commands of the resolved packages in `executor`.
+
+        If the context actions cache is enabled, and this context has been
+        executed before in the same circumstances, the actions recorded then
+        are replayed instead. Actions are not cached if any rex error was
+        caught while running the package commands.
+        """
+        cache = _get_context_actions_cache()
+        key = self._get_actions_cache_key(executor) if cache else None
+
+        if key is None:
+            self._execute_commands(executor)
+            return
+
+        actions = cache.get(key)
+
+        if actions is cache.miss:
+            num_actions = len(executor.actions)
+            if self._execute_commands(executor):
+                cache.set(key, executor.actions[num_actions:])
+        else:
+            self._bind_context(executor)
+            executor.manager.replay(actions)
+
+    def _bind_context(self, executor):
+        # binds objects such as 'request', which are accessible before a resolve
+        bindings = self._get_pre_resolve_bindings()
+        for k, v in bindings.items():
+            executor.bind(k, v)
+
+        executor.bind('resolve', VariantsBinding(self.resolved_packages or []))
+
+    def _execute_commands(self, executor):
+        """Returns False if a rex error was caught, True otherwise."""
         br = '#' * 80
         br_minor = '-' * 80
 
@@ -1619,12 +1811,7 @@ class ResolvedContext(object):
             executor.setenv("REZ_RAW_REQUEST", request_str_)
             executor.setenv("REZ_RESOLVE_MODE", "latest")
 
-        # binds objects such as 'request', which are accessible before a resolve
-        bindings = self._get_pre_resolve_bindings()
-        for k, v in bindings.items():
-            executor.bind(k, v)
-
-        executor.bind('resolve', VariantsBinding(resolved_pkgs))
+        self._bind_context(executor)
 
         #
         # -- apply each resolved package to the execution context
@@ -1632,6 +1819,7 @@ class ResolvedContext(object):
 
         _heading("package variables")
         error_class = SourceCodeError if config.catch_rex_errors else None
+        caught_error = False
 
         # set basic package variables and create per-package bindings
         bindings = {}
@@ -1678,6 +1866,7 @@ class ResolvedContext(object):
                     executor.execute_code(commands, isolate=True)
                 except error_class as e:
                     exc = e
+                    caught_error = True
 
                 if exc:
                     header = "Error in %s in package %r:\n" % (attr, pkg.uri)
@@ -1704,6 +1893,8 @@ class ResolvedContext(object):
         elif mode == RezToolsVisibility.prepend:
             executor.prepend_rez_path()
 
+        return not caught_error
+
     def _append_suite_paths(self, executor):
         from rez.suite import Suite
 
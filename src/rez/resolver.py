@@ -1,8 +1,9 @@
-from rez.solver import Solver, SolverStatus, PackageVariantCache
 from rez.package_repository import package_repository_manager
 from rez.packages_ import get_variant, get_last_release_time
 from rez.package_filter import PackageFilterList, TimestampRule
 from rez.utils.memcached import memcached_client, pool_memcached_connections
+from rez.utils.disk_cache import disk_cache_client
+from rez.utils.cache_stats import get_cache_stats_counter
 from rez.utils.logging_ import log_duration
 from rez.config import config
 from rez.vendor.enum import Enum
@@ -25,6 +26,10 @@ class ResolverStatus(Enum):
         self.description = description
 
 
+# lookups of cached resolves, in memcached or the local resolve cache
+_resolve_cache_stats = get_cache_stats_counter("resolves")
+
+
 class Resolver(object):
     """The package resolver.
 
@@ -34,7 +39,8 @@ class Resolver(object):
     def __init__(self, context, package_requests, package_paths, package_filter=None,
                  package_orderers=None, timestamp=0, callback=None, building=False,
                  verbosity=False, buf=None, package_load_callback=None, caching=True,
-                 suppress_passive=False, print_stats=False):
+                 suppress_passive=False, print_stats=False, preferred_variants=None,
+                 variant_cache=None, resolve_server=None, profiler=None):
         """Create a Resolver.
 
         Args:
@@ -51,6 +57,14 @@ class Resolver(object):
             caching: If True, cache(s) may be used to speed the resolve. If
                 False, caches will not be used.
             print_stats (bool): If true, print advanced solver stats at the end.
+            preferred_variants (list of `Variant`): See `Solver`.
+            variant_cache (`SharedPackageVariantCache`): See `Solver`.
+            resolve_server (`ResolveServerClient`): If not None, the solve is
+                forwarded to this resolve server, and only performed in-process
+                if the server could not perform it.
+            profiler (`SolverProfiler`): See `Solver`. Cached resolves are
+                not used when profiling, since there would be nothing to
+                profile.
         """
         self.context = context
         self.package_requests = package_requests
@@ -65,6 +79,10 @@ class Resolver(object):
         self.buf = buf
         self.suppress_passive = suppress_passive
         self.print_stats = print_stats
+        self.preferred_variants = preferred_variants
+        self.variant_cache = variant_cache
+        self.resolve_server = resolve_server
+        self.profiler = profiler
 
         # store hash of package orderers. This is used in the memcached key
         if package_orderers:
@@ -96,7 +114,9 @@ class Resolver(object):
         self.failure_description = None
         self.graph_ = None
         self.from_cache = False
+        self.journal_positions = None
         self.memcached_servers = config.memcached_uri if config.resolve_caching else None
+        self.cache_path = config.resolve_cache_path if config.resolve_caching else None
 
         self.solve_time = 0.0  # time spent solving
         self.load_time = 0.0   # time spent loading package resources
@@ -107,16 +127,30 @@ class Resolver(object):
     def solve(self):
         """Perform the solve.
         """
-        with log_duration(self._print, "memcache get (resolve) took %s"):
-            solver_dict = self._get_cached_solve()
+        solver_dict = None
+        if self.profiler is None:
+            with log_duration(self._print, "memcache get (resolve) took %s"):
+                solver_dict = self._get_cached_solve()
 
         if solver_dict:
             self.from_cache = True
             self._set_result(solver_dict)
         else:
             self.from_cache = False
-            solver = self._solve()
-            solver_dict = self._solver_to_dict(solver)
+            solver_dict = None
+
+            # before solving, so that changes made during the solve are seen
+            # when the cached solve is next checked
+            self.journal_positions = self._get_journal_positions()
+
+            if self.resolve_server:
+                with log_duration(self._print, "resolve server solve took %s"):
+                    solver_dict = self.resolve_server.solve(self)
+
+            if solver_dict is None:
+                solver = self._solve()
+                solver_dict = self._solver_to_dict(solver)
+
             self._set_result(solver_dict)
 
             with log_duration(self._print, "memcache set (resolve) took %s"):
@@ -156,7 +190,11 @@ class Resolver(object):
         return get_variant(variant_handle, context=self.context)
 
     def _get_cached_solve(self):
-        """Find a memcached resolve.
+        """Find a cached resolve.
+
+        Resolves are cached to memcached if it is configured, otherwise to the
+        local disk cache, if `resolve_cache_path` is set. In either case, the
+        same logic applies:
 
         If there is NOT a resolve timestamp:
             - fetch a non-timestamped memcache entry;
@@ -196,7 +234,7 @@ class Resolver(object):
         consider a workflow where a work area is tied down to a particular
         timestamp in order to 'lock' it from any further software releases).
         """
-        if not (self.caching and self.memcached_servers):
+        if not self._caching_enabled():
             return None
 
         # these caches avoids some potentially repeated file stats
@@ -204,27 +242,48 @@ class Resolver(object):
         last_release_times = {}
 
         def _hit(data):
-            solver_dict, _, _ = data
+            solver_dict = data[0]
+            _resolve_cache_stats.hits += 1
             return solver_dict
 
         def _miss():
             self._print("No cache key retrieved")
+            _resolve_cache_stats.misses += 1
             return None
 
         def _delete_cache_entry(key):
-            with self._memcached_client() as client:
+            with self._cache_client() as client:
                 client.delete(key)
             self._print("Discarded entry: %r", key)
 
         def _retrieve(timestamped):
             key = self._memcache_key(timestamped=timestamped)
             self._print("Retrieving memcache key: %r", key)
-            with self._memcached_client() as client:
+            with self._cache_client() as client:
                 data = client.get(key)
             return key, data
 
+        def _unchanged_since_solve(data):
+            # if every repository keeps a change journal, only the families
+            # changed since the solve need to be checked
+            positions = data[3] if len(data) > 3 else None
+            if not positions:
+                return False
+
+            package_names = set(data[1].keys())
+
+            for path, position in zip(self.package_paths, positions):
+                repo = package_repository_manager.get_repository(path)
+                changes = repo.get_changes_since(position)
+                if changes is None or (changes & package_names):
+                    return False
+
+            self._print("No packages in the solve have changed, according to "
+                        "repository change journals")
+            return True
+
         def _packages_changed(key, data):
-            solver_dict, _, variant_states_dict = data
+            solver_dict, variant_states_dict = data[0], data[2]
             for variant_handle in solver_dict.get("variant_handles", []):
                 variant = self._get_variant(variant_handle)
                 old_state = variant_states_dict.get(variant.name)
@@ -250,7 +309,7 @@ class Resolver(object):
             return False
 
         def _releases_since_solve(key, data):
-            _, release_times_dict, _ = data
+            release_times_dict = data[1]
             for package_name, release_time in release_times_dict.items():
                 time_ = last_release_times.get(package_name)
                 if time_ is None:
@@ -266,7 +325,7 @@ class Resolver(object):
             return False
 
         def _timestamp_is_earlier(key, data):
-            _, release_times_dict, _ = data
+            release_times_dict = data[1]
             for package_name, release_time in release_times_dict.items():
                 if self.timestamp < release_time:
                     self._print("Resolve timestamp (%d) is earlier than %r in "
@@ -277,9 +336,15 @@ class Resolver(object):
 
         key, data = _retrieve(False)
 
+        def _changed(key, data, check_releases=True):
+            if _unchanged_since_solve(data):
+                return False
+            return _packages_changed(key, data) or \
+                (check_releases and _releases_since_solve(key, data))
+
         if self.timestamp:
             if data:
-                if _packages_changed(key, data) or _releases_since_solve(key, data):
+                if _changed(key, data):
                     _delete_cache_entry(key)
                 elif not _timestamp_is_earlier(key, data):
                     return _hit(data)
@@ -287,7 +352,7 @@ class Resolver(object):
             key, data = _retrieve(True)
             if not data:
                 return _miss()
-            if _packages_changed(key, data):
+            if _changed(key, data, check_releases=False):
                 _delete_cache_entry(key)
                 return _miss()
             else:
@@ -295,20 +360,28 @@ class Resolver(object):
         else:
             if not data:
                 return _miss()
-            if _packages_changed(key, data) or _releases_since_solve(key, data):
+            if _changed(key, data):
                 _delete_cache_entry(key)
                 return _miss()
             else:
                 return _hit(data)
 
+    def _caching_enabled(self):
+        return bool(self.caching and (self.memcached_servers or self.cache_path))
+
     @contextmanager
-    def _memcached_client(self):
-        with memcached_client(self.memcached_servers,
-                              debug=config.debug_memcache) as client:
-            yield client
+    def _cache_client(self):
+        if self.memcached_servers:
+            with memcached_client(self.memcached_servers,
+                                  debug=config.debug_memcache) as client:
+                yield client
+        else:
+            max_size = config.resolve_cache_max_size * 1024 * 1024
+            with disk_cache_client(self.cache_path, max_size=max_size) as client:
+                yield client
 
     def _set_cached_solve(self, solver_dict):
-        """Store a solve to memcached.
+        """Store a solve to memcached, or the local disk cache.
 
         If there is NOT a resolve timestamp:
             - store the solve to a non-timestamped entry.
@@ -322,7 +395,7 @@ class Resolver(object):
         if self.status_ != ResolverStatus.solved:
             return  # don't cache failed solves
 
-        if not (self.caching and self.memcached_servers):
+        if not self._caching_enabled():
             return
 
         # most recent release times get stored with solve result in the cache
@@ -350,11 +423,28 @@ class Resolver(object):
 
         timestamped = (self.timestamp and releases_since_solve)
         key = self._memcache_key(timestamped=timestamped)
-        data = (solver_dict, release_times_dict, variant_states_dict)
-        with self._memcached_client() as client:
+        data = (solver_dict, release_times_dict, variant_states_dict,
+                self.journal_positions)
+        with self._cache_client() as client:
             client.set(key, data)
         self._print("Sent memcache key: %r", key)
 
+    def _get_journal_positions(self):
+        """Get the change journal position of each repository, or None if
+        any repository does not keep a change journal."""
+        if not self._caching_enabled():
+            return None
+
+        positions = []
+        for path in self.package_paths:
+            repo = package_repository_manager.get_repository(path)
+            position = repo.get_change_journal_position()
+            if position is None:
+                return None
+            positions.append(position)
+
+        return tuple(positions)
+
     def _memcache_key(self, timestamped=False):
         """Makes a key suitable as a memcache entry."""
         request = tuple(map(str, self.package_requests))
@@ -374,9 +464,14 @@ class Resolver(object):
         if timestamped and self.timestamp:
             t.append(self.timestamp)
 
+        if self.preferred_variants:
+            t.append(tuple(x.qualified_name for x in self.preferred_variants))
+
         return str(tuple(t))
 
     def _solve(self):
+        from rez.solver import Solver
+
         solver = Solver(package_requests=self.package_requests,
                         package_paths=self.package_paths,
                         context=self.context,
@@ -389,7 +484,10 @@ class Resolver(object):
                         prune_unfailed=config.prune_failed_graph,
                         buf=self.buf,
                         suppress_passive=self.suppress_passive,
-                        print_stats=self.print_stats)
+                        print_stats=self.print_stats,
+                        preferred_variants=self.preferred_variants,
+                        variant_cache=self.variant_cache,
+                        profiler=self.profiler)
         solver.solve()
 
         return solver
@@ -411,6 +509,8 @@ class Resolver(object):
 
     @classmethod
     def _solver_to_dict(cls, solver):
+        from rez.solver import SolverStatus
+
         graph_ = solver.get_graph()
         solve_time = solver.solve_time
         load_time = solver.load_time
@@ -14,7 +14,7 @@ from rez.exceptions import RexError, RexUndefinedVariableError, RezSystemError
 from rez.util import shlex_join, is_non_string_iterable
 from rez.utils import reraise
 from rez.utils.execution import Popen
-from rez.utils.sourcecode import SourceCode, SourceCodeError
+from rez.utils.sourcecode import SourceCode, SourceCodeError, compile_source
 from rez.utils.data_utils import AttrDictWrapper
 from rez.utils.formatting import expandvars
 from rez.utils.platform_ import platform_
@@ -426,6 +426,25 @@ class ActionManager(object):
         self.actions.append(Shebang())
         self.interpreter.shebang()
 
+    def replay(self, actions):
+        """Apply actions recorded by another manager.
+
+        Action values are already formatted (as they are in `self.actions`),
+        so they are not formatted again. They are still expanded, against the
+        environment of this manager.
+
+        Args:
+            actions (list of `Action`): Actions to apply.
+        """
+        formatter = self.formatter
+        self.formatter = str
+
+        try:
+            for action in actions:
+                getattr(self, action.name)(*action.args)
+        finally:
+            self.formatter = formatter
+
     def _keytoken(self, key):
         return self.interpreter.get_key_token(key)
 
@@ -1239,7 +1258,9 @@ class RexExecutor(object):
             if isinstance(code, SourceCode):
                 pyc = code.compiled
             else:
-                pyc = compile(code, filename, 'exec')
+                # code strings get the future statements in effect in this module
+                pyc = compile_source(code, filename,
+                                     flags=print_function.compiler_flag)
         except SourceCodeError as e:
             reraise(e, RexError)
         except Exception as e:
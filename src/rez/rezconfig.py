@@ -136,11 +136,67 @@ bind_module_path = []
 # would change the result of an existing resolve.
 resolve_caching = True
 
+# Directory of a local, on-disk resolve cache. This is used in place of
+# memcached when no memcached servers are configured (see *memcached_uri*), and
+# is invalidated in the same way. It is safe to share between processes on the
+# same host. If null, resolves are only cached to memcached.
+resolve_cache_path = None
+
+# The maximum size of the local resolve cache, in megabytes. When the cache
+# grows larger than this, the least recently used entries are discarded. Zero
+# means unbounded.
+resolve_cache_max_size = 100
+
+# Path of the unix socket that a resolve server listens on (see *rez-serve*). A
+# resolve server keeps package repositories and loaded packages in memory, so
+# resolves forwarded to it avoid the cost of loading packages from scratch. If
+# set, tools such as rez-env forward their resolves to the server, and resolve
+# in-process as usual if no server is running. Resolves that use package
+# load callbacks, verbose output, or packages with late bound requirements are
+# always performed in-process. If null, no resolve server is used.
+resolve_server_socket = None
+
+# Seconds to wait for a resolve server to reply to a resolve. The server
+# performs resolves one at a time, so a busy or hung server may not reply for
+# some time. If it does not reply in time, the resolve is performed in-process
+# instead.
+resolve_server_timeout = 30
+
 # Cache package file reads to memcached, if enabled. Updated package files will
 # still be read correctly (ie, the cache invalidates when the filesystem
 # changes).
 cache_package_files = True
 
+# Directory of a local, on-disk cache of package file reads. Entries hold
+# package data as it is after the package file has been evaluated, so cached
+# package.py files are not executed again, even by new processes. The compiled
+# code of package commands and late bound functions is also kept here. This cache
+# is used in addition to memcached, and invalidates in the same way. It is safe
+# to share between processes on the same host. If null, package file reads are
+# only cached to memcached.
+package_file_cache_path = None
+
+# The maximum size of the local package file cache, in megabytes. When the cache
+# grows larger than this, the least recently used entries are discarded. Zero
+# means unbounded.
+package_file_cache_max_size = 100
+
+# Directory of a local, on-disk cache of the actions that configure the
+# environment of a resolved context (ie, the result of running the commands of
+# its packages). A context that is used again - for example, by launching the
+# same suite tool twice - then skips executing package commands altogether. The
+# actions are keyed on the resolve, the state of the resolved packages, the
+# target shell and the parent environment, and the cache is safe to share
+# between processes on the same host. Do not enable this if package commands
+# depend on anything else (such as the current time, or files other than the
+# package definition). If null, actions are not cached.
+context_actions_cache_path = None
+
+# The maximum size of the local context actions cache, in megabytes. When the
+# cache grows larger than this, the least recently used entries are discarded.
+# Zero means unbounded.
+context_actions_cache_max_size = 50
+
 # Cache directory traversals to memcached, if enabled. Updated directory entries
 # will still be read correctly (ie, the cache invalidates when the filesystem
 # changes).
@@ -149,8 +205,19 @@ cache_listdir = True
 # The size of the local (in-process) resource cache. Resources include package
 # families, packages and variants. A value of 0 disables caching; -1 sets a cache
 # of unlimited size. The size refers to the number of entries, not byte count.
+# The hit rates of this and other caches are printed by 'rez-env --stats' (see
+# also rez.utils.cache_stats).
 resource_caching_maxsize = -1
 
+# The maximum memory, in megabytes, used by the in-process resource cache and by
+# the package repository caches (such as the package and variant lists of each
+# filesystem repository). These share the one budget, and the least recently
+# used entries of any of them are discarded when it is exceeded. Sizes are
+# estimates. A value of 0 disables this limit. When set, it replaces the
+# entry count limit of 'resource_caching_maxsize'. Long running processes,
+# such as rez-gui, may want to set this.
+resource_caching_max_memory = 0
+
 # Uris of running memcached server(s) to use as a file and resolve cache. For
 # example, the uri "127.0.0.1:11211" points to memcached running on localhost on
 # its default port. Must be either null, or a list of strings.
@@ -172,6 +239,18 @@ memcached_listdir_min_compress_len = 16384
 # means never compress.
 memcached_resolve_min_compress_len = 1
 
+# The maximum number of entries in the in-process cache that is kept in front of
+# memcached. This cache holds memcached entries that cannot go out of date, such
+# as package file contents and directory listings (which are keyed on file
+# modification times), so that a process that looks up the same entries many
+# times - such as when resolving the contexts of a suite - does not have to
+# request them from memcached every time. Zero disables the in-process cache.
+memcached_local_cache_size = 0
+
+# The maximum total size of the entries in the in-process memcached cache, in
+# bytes. Zero means unbounded.
+memcached_local_cache_max_bytes = 0
+
 
 ###############################################################################
 # Package Resolution
@@ -210,6 +289,40 @@ platform_map = {}
 # failure.
 prune_failed_graph = True
 
+# If true, the solver compares package versions using precomputed sort keys
+# (tuples of ints and strings, cached per version) rather than comparing version
+# objects token by token. This makes sorting and range containment tests
+# considerably faster on families with many versions, and lets the solver find
+# the versions in a range with a binary search. It only works with the default
+# version token type.
+solver_version_sort_keys = False
+
+# The number of worker processes used to speculatively solve alternative
+# branches of a resolve in parallel. This can greatly speed up resolves that do
+# a lot of backtracking, and gives the same result as a serial solve. Values
+# less than 2 disable this. It is only supported on platforms where processes
+# can be forked. Note that failures in branches solved by worker processes do
+# not count towards the solve's fail count (see *rez-env --max-fails*).
+solver_speculative_processes = 0
+
+# If true, the solver learns from failed branches of a resolve. When every
+# phase below a split has failed, the combination of package scopes responsible
+# is recorded, and any later phase that contains (a narrower version of) the
+# same combination is failed immediately rather than solved. This gives the
+# same result as a normal solve, but can greatly reduce the number of solve
+# steps - and fails - in resolves that do a lot of backtracking. Note that a
+# resolve error (such as a missing package) that would have been hit in a
+# pruned phase is not raised.
+solver_learn_nogoods = False
+
+# The number of threads used to load package families in the background during
+# a resolve. When the solver finds new requirements, their families are listed,
+# and the packages in the required range are loaded, in parallel. This overlaps
+# the latency of package repositories on network filesystems, and gives the
+# same result as loading them as needed. Zero disables this. Prefetching is not
+# done while profiling a solve, or when a package load callback is used.
+solver_prefetch_threads = 0
+
 # Variant select mode. This determines which variants in a package are preferred
 # during a solve. Valid options are:
 # - version_priority: Prefer variants that contain higher versions of packages
@@ -533,6 +646,10 @@ debug_package_exclusions = False
 # Print debugging info related to use of memcached during a resolve
 debug_resolve_memcache = False
 
+# Print debugging info related to forwarding resolves to a resolve server, and
+# to the server's handling of them
+debug_resolve_server = False
+
 # Debug memcache usage. As well as printing debugging info to stdout, it also
 # sends human-readable strings as memcached keys (that you can read by running
 # "memcached -vv" as the server)
@@ -15,7 +15,8 @@ from rez.utils.sourcecode import SourceCode, early, late, include
 from rez.utils.filesystem import TempDirs
 from rez.utils.data_utils import ModifyList
 from rez.exceptions import ResourceError, InvalidPackageError
-from rez.utils.memcached import memcached
+from rez.utils.memcached import memcached, get_scoped_memcached_client
+from rez.utils.disk_cache import DiskCache
 from rez.utils.execution import add_sys_paths
 from rez.utils import py23
 from rez.config import config
@@ -128,6 +129,39 @@ def load_from_file(filepath, format_=FileFormat.py, update_data_callback=None,
                                update_data_callback=update_data_callback)
 
 
+def prefetch_files(files, update_data_callback=None):
+    """Fetch the cached contents of several files from memcached at once.
+
+    Loading each file with `load_from_file` otherwise makes a request to
+    memcached per file. This only has an effect within a memcached client
+    scope (see `rez.utils.memcached.memcached_client`), such as a resolve.
+
+    Args:
+        files (list of 2-tuple): Filepath and `FileFormat` of each file.
+        update_data_callback (callable): As passed to `load_from_file`.
+    """
+    if not (config.memcached_uri and config.cache_package_files):
+        return
+
+    client = get_scoped_memcached_client()
+    if client is None:
+        return
+
+    keys = []
+    for filepath, format_ in files:
+        filepath = os.path.realpath(filepath)
+        if filepath in file_cache:
+            continue
+
+        try:
+            key = _load_from_file__key(filepath, format_, update_data_callback)
+        except OSError:
+            continue
+        keys.append(key)
+
+    client.prefetch(keys)
+
+
 def _load_from_file__key(filepath, format_, update_data_callback):
     st = os.stat(filepath)
     if update_data_callback is None:
@@ -142,9 +176,47 @@ def _load_from_file__key(filepath, format_, update_data_callback):
 @memcached(servers=config.memcached_uri if config.cache_package_files else None,
            min_compress_len=config.memcached_package_file_min_compress_len,
            key=_load_from_file__key,
-           debug=config.debug_memcache)
+           debug=config.debug_memcache,
+           immutable=True)
 def _load_from_file(filepath, format_, update_data_callback):
-    return _load_file(filepath, format_, update_data_callback)
+    cache = _get_package_file_cache()
+    if not cache:
+        return _load_file(filepath, format_, update_data_callback)
+
+    key = _load_from_file__key(filepath, format_, update_data_callback)
+    result = cache.get(key)
+
+    if result is cache.miss:
+        result = _load_file(filepath, format_, update_data_callback)
+        cache.set(key, result)
+
+    return result
+
+
+_package_file_caches = threading.local()
+
+
+def _get_package_file_cache():
+    """Get this thread's client of the local package file cache.
+
+    Returns:
+        `DiskCache`: Cache client, or None if the cache is not enabled.
+    """
+    path = config.package_file_cache_path
+    if not path:
+        return None
+
+    cache = getattr(_package_file_caches, "cache", None)
+
+    if cache is None or cache.path != path:
+        if cache is not None:
+            cache.close()
+
+        max_size = config.package_file_cache_max_size * 1024 * 1024
+        cache = DiskCache(path, max_size=max_size, atime_resolution=60)
+        _package_file_caches.cache = cache
+
+    return cache
 
 
 def _load_file(filepath, format_, update_data_callback, original_filepath=None):
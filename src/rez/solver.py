@@ -10,10 +10,12 @@ See SOLVER.md for an in-depth description of how this module works.
 from __future__ import print_function
 
 from rez.config import config
-from rez.packages_ import iter_packages
+from rez.packages_ import iter_package_versions
 from rez.package_repository import package_repo_stats
 from rez.utils.logging_ import print_debug
 from rez.utils.data_utils import cached_property
+from rez.utils.cache_stats import format_cache_stats
+from rez.utils.sourcecode import SourceCode
 from rez.vendor.pygraph.classes.digraph import digraph
 from rez.vendor.pygraph.algorithms.cycles import find_cycle
 from rez.vendor.pygraph.algorithms.accessibility import accessibility
@@ -29,12 +31,16 @@ import copy
 import time
 import sys
 import os
+import multiprocessing
 
 
 # a hidden control for forcing to non-optimized solving mode. This is here as
 # first port of call for narrowing down the cause of a solver bug if we see one
 _force_unoptimised_solver = (os.getenv("_FORCE_REZ_UNOPTIMISED_SOLVER") == "1")
 
+# the solver that speculative solve worker processes were forked from
+_speculative_solver = None
+
 
 class VariantSelectMode(Enum):
     """Variant selection mode."""
@@ -134,6 +140,161 @@ class SolverState(object):
                 % (self.num_solves, self.num_fails, str(self.phase)))
 
 
+class SolverProfiler(object):
+    """Attributes solve time and operation counts to package families, and to
+    solve steps.
+
+    Pass an instance to a `Solver` (see its `profiler` argument). The solver
+    records each of the following operations, against the package family it
+    was performed on:
+
+    - load: creating a family's variants for a version range;
+    - extract: extracting common dependencies from a family's variants;
+    - intersect: narrowing a family to an extracted requirement;
+    - reduce: removing a family's variants that conflict with another request;
+    - split: splitting a family's variants, when a phase is exhausted.
+
+    Operations can be nested (a load may happen within an intersection, for
+    example); the time recorded against an operation excludes that of any
+    operations nested within it.
+
+    Operations are also recorded against the solve step they were performed
+    in, where step 0 is the creation of the initial phase, before the first
+    solve step.
+    """
+    operations = ("load", "extract", "intersect", "reduce", "split")
+
+    def __init__(self):
+        # the current solve step
+        self.step = 0
+
+        # {(step, stack): [count, secs]}, where stack is a tuple of
+        # (operation, package_name) frames, innermost last
+        self.entries = {}
+
+        self._stack = []
+        self._child_secs = []
+
+    @contextmanager
+    def profiled(self, operation, package_name):
+        """Record an operation on a package family."""
+        self._stack.append((operation, package_name))
+        self._child_secs.append(0.0)
+        t = time.time()
+
+        try:
+            yield
+        finally:
+            secs = time.time() - t
+            stack = tuple(self._stack)
+            self._stack.pop()
+            child_secs = self._child_secs.pop()
+            if self._child_secs:
+                self._child_secs[-1] += secs
+
+            key = (self.step, stack)
+            entry = self.entries.get(key)
+            if entry is None:
+                self.entries[key] = [1, secs - child_secs]
+            else:
+                entry[0] += 1
+                entry[1] += secs - child_secs
+
+    def get_family_stats(self):
+        """Get operation counts and times per package family.
+
+        Returns:
+            dict: {package_name: {operation: {"count": int, "time": float}}}.
+        """
+        return self._get_stats(lambda step, stack: stack[-1][1])
+
+    def get_step_stats(self):
+        """Get operation counts and times per solve step.
+
+        Returns:
+            dict: {step: {operation: {"count": int, "time": float}}}.
+        """
+        return self._get_stats(lambda step, stack: step)
+
+    def write_folded(self, buf, by_step=False):
+        """Write the profile as folded stacks.
+
+        This is the format read by flamegraph tools (such as flamegraph.pl or
+        speedscope) - one line per stack, with frames separated by ';',
+        followed by the time spent in the stack in microseconds. Each frame is
+        of the form 'package_name:operation'.
+
+        Args:
+            buf (file-like object): Buffer to write to.
+            by_step (bool): If True, stacks are rooted at their solve step.
+        """
+        stacks = {}
+        for (step, stack), (_, secs) in self.entries.items():
+            frames = ["solve"]
+            if by_step:
+                frames.append("step %d" % step)
+            frames.extend("%s:%s" % (name, op) for op, name in stack)
+
+            key = ';'.join(frames)
+            stacks[key] = stacks.get(key, 0.0) + secs
+
+        for key, secs in sorted(stacks.items()):
+            usecs = int(secs * 1000000)
+            if usecs:
+                buf.write("%s %d\n" % (key, usecs))
+
+    def print_summary(self, buf=None, limit=None):
+        """Print the most expensive package families.
+
+        Args:
+            buf (file-like object): Buffer to print to, defaults to stdout.
+            limit (int): Maximum number of families to print.
+        """
+        from rez.utils.formatting import columnise
+
+        stats = self.get_family_stats()
+        totals = dict((name, sum(x["time"] for x in d.values()))
+                      for name, d in stats.items())
+        names = sorted(totals, key=lambda x: (-totals[x], x))
+
+        rows = [["family", "time"] + list(self.operations),
+                ["------", "----"] + ['-' * len(x) for x in self.operations]]
+
+        for name in names[:limit]:
+            row = [name, "%.3f" % totals[name]]
+            for op in self.operations:
+                d = stats[name].get(op)
+                if d:
+                    row.append("%d (%.3f)" % (d["count"], d["time"]))
+                else:
+                    row.append('-')
+            rows.append(row)
+
+        print('\n'.join(columnise(rows)), file=(buf or sys.stdout))
+
+    def _get_stats(self, key_func):
+        stats = {}
+        for (step, stack), (count, secs) in self.entries.items():
+            key = key_func(step, stack)
+            op = stack[-1][0]
+            d = stats.setdefault(key, {}).setdefault(
+                op, {"count": 0, "time": 0.0})
+            d["count"] += count
+            d["time"] += secs
+        return stats
+
+
+class _NullContext(object):
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *args):
+        pass
+
+
+_null_context = _NullContext()
+
+
 class _Common(object):
     def __repr__(self):
         return "%s(%s)" % (self.__class__.__name__, str(self))
@@ -270,6 +431,35 @@ class Cycle(FailureReason):
         return " --> ".join(map(str, stmts))
 
 
+class LearnedConflict(FailureReason):
+    """The phase contained a combination of package scopes that an earlier
+    part of the solve had already found to have no solution."""
+    def __init__(self, requirements, failure_reason):
+        """
+        Args:
+            requirements (list of `Requirement`): The phase's requests for the
+                packages in the learned conflict.
+            failure_reason (`FailureReason`): The first failure seen when the
+                conflict was learned.
+        """
+        self.requirements = requirements
+        self.failure_reason = failure_reason
+
+    def involved_requirements(self):
+        return self.requirements
+
+    def description(self):
+        return "A combination of packages already known to conflict was " \
+            "found: %s (originally: %s)" % (str(self), str(self.failure_reason))
+
+    def __eq__(self, other):
+        return (self.requirements == other.requirements) \
+            and (self.failure_reason == other.failure_reason)
+
+    def __str__(self):
+        return ' '.join(map(str, self.requirements))
+
+
 class PackageVariant(_Common):
     """A variant of a package.
     """
@@ -396,6 +586,11 @@ class _PackageEntry(object):
         if self.sorted:
             return
 
+        if self.solver.version_sort_keys:
+            range_key = lambda x: x.sort_key
+        else:
+            range_key = lambda x: x
+
         def key(variant):
             requested_key = []
             names = set()
@@ -404,13 +599,14 @@ class _PackageEntry(object):
                 if not request.conflict:
                     req = variant.requires_list.get(request.name)
                     if req is not None:
-                        requested_key.append((-i, req.range))
+                        requested_key.append((-i, range_key(req.range)))
                         names.add(req.name)
 
             additional_key = []
             for request in variant.requires_list:
                 if not request.conflict and request.name not in names:
-                    additional_key.append((request.range, request.name))
+                    additional_key.append((range_key(request.range),
+                                           request.name))
 
             if (VariantSelectMode[config.variant_select_mode] ==
                     VariantSelectMode.version_priority):
@@ -430,6 +626,14 @@ class _PackageEntry(object):
         self.variants.sort(key=key, reverse=True)
         self.sorted = True
 
+        # a preferred variant (see `Solver`) comes first
+        preferred = self.solver.preferred_variants.get(self.package.name)
+        if preferred is not None and preferred[0] == self.version:
+            for i, variant in enumerate(self.variants):
+                if variant.index == preferred[1]:
+                    self.variants.insert(0, self.variants.pop(i))
+                    break
+
 
 class _PackageVariantList(_Common):
     """A list of package variants, loaded lazily.
@@ -441,13 +645,34 @@ class _PackageVariantList(_Common):
         # note: we do not apply package filters here, because doing so might
         # cause package loads (eg, timestamp rules). We only apply filters
         # during an intersection, which minimises the amount of filtering.
+        # Similarly, packages are only created once their version is found to
+        # be within an intersecting range.
+        #
+        # Each entry is a [version, package, value] list. Value is False if
+        # the package has not been loaded yet (package is then a callable
+        # that returns it); None if it was blocked by package filters, or
+        # is not a valid package; or the package's list of variants.
         #
         self.entries = []
 
-        for package in iter_packages(self.package_name,
-                                     paths=self.solver.package_paths):
-            package.set_context(solver.context)
-            self.entries.append([package, False])
+        # version sort keys of entries, ascending, and their entry indices
+        self.sort_keys = None
+        self.sort_indices = None
+
+        # True if any loaded package has late bound requirements, which may
+        # depend on the context being resolved
+        self.context_dependent = False
+
+        entries = None
+        if self.solver.prefetcher is not None:
+            entries = self.solver.prefetcher.get(package_name)
+
+        if entries is None:
+            entries = iter_package_versions(self.package_name,
+                                            paths=self.solver.package_paths)
+
+        for version, get_package in entries:
+            self.entries.append([version, get_package, False])
 
         if not self.entries:
             raise PackageFamilyNotFoundError(
@@ -465,21 +690,31 @@ class _PackageVariantList(_Common):
         """
         result = []
 
-        for entry in self.entries:
-            package, value = entry
+        if self.solver.version_sort_keys:
+            entries = self._get_intersecting_entries(range_)
+        else:
+            entries = (x for x in self.entries if x[0] in range_)
+
+        for entry in entries:
+            _, package, value = entry
 
             if value is None:
                 continue  # package was blocked by package filters
 
-            if package.version not in range_:
-                continue
-
             if isinstance(value, list):
                 variants = value
                 entry_ = _PackageEntry(package, variants, self.solver)
                 result.append(entry_)
                 continue
 
+            # create the package
+            package = entry[1] = package()
+            if package is None:
+                entry[2] = None
+                continue
+
+            package.set_context(self.solver.context)
+
             # apply package filter
             if self.solver.package_filter:
                 rule = self.solver.package_filter.excludes(package)
@@ -487,29 +722,50 @@ class _PackageVariantList(_Common):
                     if config.debug_package_exclusions:
                         print_debug("Package '%s' was excluded by rule '%s'"
                                     % (package.qualified_name, str(rule)))
-                    entry[1] = None
+                    entry[2] = None
                     continue
 
             # expand package entry into list of variants
             if self.solver.package_load_callback:
                 self.solver.package_load_callback(package)
 
+            requires = package.resource.requires
+            if isinstance(requires, SourceCode) and requires.late_binding:
+                self.context_dependent = True
+
             variants_ = []
             for var in package.iter_variants():
                 variant = PackageVariant(var, self.solver.building)
                 variants_.append(variant)
 
-            entry[1] = variants_
+            entry[2] = variants_
             entry_ = _PackageEntry(package, variants_, self.solver)
             result.append(entry_)
 
         return result or None
 
+    def _get_intersecting_entries(self, range_):
+        # binary search the sorted version keys, rather than test each entry.
+        # Matches are returned in their original order, so that the result is
+        # the same as a brute-force containment test.
+        if self.sort_keys is None:
+            keys = sorted((x[0].sort_key, i)
+                          for i, x in enumerate(self.entries))
+            self.sort_keys = [x[0] for x in keys]
+            self.sort_indices = [x[1] for x in keys]
+
+        indices = []
+        for start, end in range_.sort_key_slices(self.sort_keys):
+            indices.extend(self.sort_indices[start:end])
+
+        indices.sort()
+        return [self.entries[i] for i in indices]
+
     def dump(self):
         print(self.package_name)
 
-        for package, value in self.entries:
-            print(str(package.version))
+        for version, package, value in self.entries:
+            print(str(version))
             if value is None:
                 print("    [FILTERED]")
             elif isinstance(value, list):
@@ -517,25 +773,105 @@ class _PackageVariantList(_Common):
                 for variant in variants:
                     print("    %s" % str(variant))
             else:
-                print("    %s" % str(package))
+                print("    %s" % str(VersionedObject.construct(
+                    self.package_name, version)))
 
     def __str__(self):
         strs = []
 
-        for package, value in self.entries:
+        for version, package, value in self.entries:
             if value is None:
                 continue
             elif isinstance(value, list):
                 variants = value
                 val_str = ','.join(str(x) for x in variants)
             else:
-                val_str = str(package)
+                val_str = str(VersionedObject.construct(self.package_name,
+                                                        version))
 
             strs.append(val_str)
 
         return "%s[%s]" % (self.package_name, ' '.join(strs))
 
 
+class _RequirementSummary(object):
+    """The requirements on a package family, across the variants of a slice.
+
+    The intersection of the variants' normal requirement ranges, and the union
+    of their conflict requirement ranges, is often enough to tell that a
+    reduction removes no variants, without testing each requirement.
+
+    A summary is also valid, although less precise, for any subset of the
+    variants it was created from.
+    """
+    def __init__(self, package_name, variants):
+        # distinct requirements, keyed by string
+        self.requirements = {}
+
+        # True if every variant requires the family
+        self.complete = True
+
+        for variant in variants:
+            req = variant.get(package_name)
+            if req is None or req.range is None:
+                self.complete = False
+            else:
+                self.requirements[str(req)] = req
+
+        self.normal_ranges = []
+        self.conflict_ranges = []
+
+        for req in self.requirements.values():
+            if req.conflict:
+                self.conflict_ranges.append(req.range)
+            else:
+                self.normal_ranges.append(req.range)
+
+    @cached_property
+    def normal_intersection(self):
+        return self._intersection(self.normal_ranges)
+
+    @cached_property
+    def conflict_union(self):
+        return self.conflict_ranges[0].union(self.conflict_ranges[1:])
+
+    def get_reduction(self, package_request):
+        """Determine if a reduction would remove any variants.
+
+        Returns:
+            bool: False if the request conflicts with none of the variants, or
+            None if this cannot be determined.
+        """
+        range_ = package_request.range
+
+        if package_request.conflict:
+            # conflict requirements never conflict with each other, and a
+            # normal requirement conflicts if the request covers its range
+            if self.normal_ranges and (
+                    self.normal_intersection is None
+                    or range_.issuperset(self.normal_intersection)):
+                return None
+            return False
+
+        # a normal requirement conflicts if it doesn't intersect the request,
+        # and a conflict requirement conflicts if it covers the request
+        if self.normal_ranges and (
+                self.normal_intersection is None
+                or not self.normal_intersection.intersects(range_)):
+            return None
+
+        if self.conflict_ranges and self.conflict_union.issuperset(range_):
+            return None
+        return False
+
+    @classmethod
+    def _intersection(cls, ranges):
+        # None if the ranges don't intersect
+        if len(ranges) == 1:
+            return ranges[0]
+        return ranges[0].intersection(ranges[1:])
+
+
 class _PackageVariantSlice(_Common):
     """A subset of a variant list, but with more dependency-related info."""
     def __init__(self, package_name, entries, solver):
@@ -557,6 +893,12 @@ class _PackageVariantSlice(_Common):
         self._range = None
         self._fam_requires = None
         self._common_fams = None
+        self._variant_keys = None
+
+        # {package_name: _RequirementSummary} - summaries created from this
+        # slice, and those inherited from the slices it was copied from
+        self._requirement_summaries = {}
+        self._inherited_summaries = {}
 
     @property
     def pr(self):
@@ -590,6 +932,14 @@ class _PackageVariantSlice(_Common):
         entry.sort()
         return entry.variants[0]
 
+    @property
+    def variant_keys(self):
+        """Frozenset of (version, index) tuples of the variants in the slice."""
+        if self._variant_keys is None:
+            self._variant_keys = frozenset(
+                (x.version, x.index) for x in self.iter_variants())
+        return self._variant_keys
+
     def iter_variants(self):
         for entry in self.entries:
             for variant in entry.variants:
@@ -613,7 +963,11 @@ class _PackageVariantSlice(_Common):
 
         with self.solver.timed(self.solver.intersection_time):
             # this is faster than iter_intersecting :(
-            entries = [x for x in self.entries if x.version in range_]
+            if self.solver.version_sort_keys:
+                entries = [x for x in self.entries
+                           if range_.contains_sort_key(x.version.sort_key)]
+            else:
+                entries = [x for x in self.entries if x.version in range_]
 
         if not entries:
             return None
@@ -651,13 +1005,31 @@ class _PackageVariantSlice(_Common):
     def _reduce_by(self, package_request):
         self.solver.reduction_tests_count += 1
 
+        # Most reductions remove no variants, or all of them. This can often
+        # be seen from a summary of the family's requirements; otherwise each
+        # distinct requirement is tested, and the variants are only visited
+        # if some, but not all, of them are removed.
+        if self.solver.optimised:
+            conflicting = self._get_conflicting_requirements(package_request)
+            if conflicting is False:
+                self.been_reduced_by.add(package_request)
+                return (self, [])
+        else:
+            conflicting = None
+
         entries = []
         reductions = []
         conflict_tests = {}
 
         def _conflicts(req_):
+            if conflicting is True:
+                return True
+
+            req_s = str(req_)
+            if conflicting is not None:
+                return (req_s in conflicting)
+
             # cache conflict tests, since variants often share similar requirements
-            req_s = str(req)
             result = conflict_tests.get(req_s)
             if result is None:
                 result = req_.conflicts_with(package_request)
@@ -700,6 +1072,39 @@ class _PackageVariantSlice(_Common):
             self.been_reduced_by.add(package_request)
             return (self, [])
 
+    def _get_conflicting_requirements(self, package_request):
+        # Returns False if no variant conflicts with the request, True if all
+        # of them do, or otherwise the set of (string) requirements that do.
+        name = package_request.name
+        summary = self._requirement_summaries.get(name)
+
+        if summary is None:
+            inherited = self._inherited_summaries.get(name)
+            if inherited is not None:
+                result = inherited.get_reduction(package_request)
+                if result is not None:
+                    self.solver.reduction_summary_tests_count += 1
+                    return result
+
+            summary = _RequirementSummary(name, self.iter_variants())
+            self._requirement_summaries[name] = summary
+
+        result = summary.get_reduction(package_request)
+        if result is not None:
+            self.solver.reduction_summary_tests_count += 1
+            return result
+
+        conflicting = set(
+            req_s for req_s, req in summary.requirements.items()
+            if self.solver.conflicts(req, req_s, package_request))
+
+        if not conflicting:
+            return False
+        elif summary.complete and len(conflicting) == len(summary.requirements):
+            return True
+        else:
+            return conflicting
+
     def extract(self):
         """Extract a common dependency.
 
@@ -821,14 +1226,33 @@ class _PackageVariantSlice(_Common):
 
                 if self.pr:
                     self.pr("sorted: %s packages: %s", self.package_name, repr(orderer))
-                return
+                break
 
-        # default ordering is version descending
-        self.entries = sorted(self.entries, key=lambda x: x.version, reverse=True)
-        self.sorted = True
+        if not self.sorted:
+            # default ordering is version descending
+            if self.solver.version_sort_keys:
+                key = lambda x: x.version.sort_key
+            else:
+                key = lambda x: x.version
 
-        if self.pr:
-            self.pr("sorted: %s packages: version descending", self.package_name)
+            self.entries = sorted(self.entries, key=key, reverse=True)
+            self.sorted = True
+
+            if self.pr:
+                self.pr("sorted: %s packages: version descending", self.package_name)
+
+        # a preferred version (see `Solver`) comes first
+        preferred = self.solver.preferred_variants.get(self.package_name)
+        if preferred is not None:
+            for i, entry in enumerate(self.entries):
+                if entry.version == preferred[0]:
+                    if i:
+                        self.entries = [entry] + self.entries[:i] \
+                            + self.entries[i + 1:]
+                        if self.pr:
+                            self.pr("sorted: %s packages: preferred version "
+                                    "%s first", self.package_name, entry.version)
+                    break
 
     def dump(self):
         print(self.package_name)
@@ -842,6 +1266,10 @@ class _PackageVariantSlice(_Common):
         slice_.sorted = self.sorted
         slice_.been_reduced_by = self.been_reduced_by.copy()
         slice_.been_intersected_with = self.been_intersected_with.copy()
+
+        # the copy's variants are a subset of ours, so our summaries still hold
+        slice_._inherited_summaries = self._inherited_summaries.copy()
+        slice_._inherited_summaries.update(self._requirement_summaries)
         return slice_
 
     def _update_fam_info(self):
@@ -899,9 +1327,26 @@ class _PackageVariantSlice(_Common):
 
 
 class PackageVariantCache(object):
-    def __init__(self, solver):
+    def __init__(self, solver, variant_lists=None):
+        """
+        Args:
+            solver (`Solver`): Solver the cache is used by.
+            variant_lists (dict): Variant lists to use, which may be shared with
+                other solvers, see `SharedPackageVariantCache`.
+        """
         self.solver = solver
-        self.variant_lists = {}  # {package-name: _PackageVariantList}
+
+        # {package-name: _PackageVariantList}
+        if variant_lists is None:
+            self.variant_lists = {}
+        else:
+            self.variant_lists = variant_lists
+
+    @property
+    def context_dependent(self):
+        """True if any variant list used by the solver is context dependent."""
+        return any(x.context_dependent for x in self.variant_lists.values()
+                   if x.solver is self.solver)
 
     def get_variant_slice(self, package_name, range_):
         """Get a list of variants from the cache.
@@ -915,6 +1360,13 @@ class PackageVariantCache(object):
         """
         variant_list = self.variant_lists.get(package_name)
 
+        if variant_list is not None and variant_list.solver is not self.solver:
+            # a variant list loaded by another solver
+            if variant_list.context_dependent:
+                variant_list = None
+            else:
+                variant_list.solver = self.solver
+
         if variant_list is None:
             variant_list = _PackageVariantList(package_name, self.solver)
             self.variant_lists[package_name] = variant_list
@@ -929,6 +1381,126 @@ class PackageVariantCache(object):
         return slice_
 
 
+class _FamilyPrefetcher(object):
+    """Loads package families on a pool of threads, ahead of the solver.
+
+    A family's versions are listed, and its packages within the requested range
+    are loaded, just as `_PackageVariantList` would do. The solver then uses
+    these results rather than loading the family itself. Package filters are
+    still applied by the solver, and any error is left for the solver to raise,
+    so the result is the same as loading families as they are needed.
+    """
+    def __init__(self, solver, num_threads):
+        self.solver = solver
+        self.num_threads = num_threads
+        self.pool = None
+
+        # {package-name: AsyncResult}
+        self.results = {}
+
+    def prefetch(self, package_requests):
+        """Start loading the families of the given requests.
+
+        Families that are already loaded, or being loaded, are skipped.
+        """
+        variant_lists = self.solver.package_cache.variant_lists
+
+        for request in package_requests:
+            name = request.name
+            if request.conflict or name in self.results or name in variant_lists:
+                continue
+
+            if self.pool is None:
+                from multiprocessing.pool import ThreadPool
+                self.pool = ThreadPool(self.num_threads)
+
+            self.results[name] = self.pool.apply_async(
+                self._load, (name, request.range))
+
+    def get(self, package_name):
+        """Get a prefetched family.
+
+        Returns:
+            List of (`Version`, callable) tuples, as per `iter_package_versions`,
+            or None if the family was not prefetched.
+        """
+        result = self.results.pop(package_name, None)
+        if result is None:
+            return None
+        return result.get()
+
+    def wait(self):
+        """Wait for all pending loads to complete."""
+        for result in self.results.values():
+            result.wait()
+
+    def close(self):
+        """Stop the threads. Pending loads are discarded."""
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+        self.results = {}
+
+    def _load(self, package_name, range_):
+        try:
+            entries = list(iter_package_versions(
+                package_name, paths=self.solver.package_paths))
+        except Exception:
+            return None  # let the solver load the family, and raise the error
+
+        def _loaded(package):
+            return lambda: package
+
+        result = []
+        for version, get_package in entries:
+            if version in range_:
+                try:
+                    package = get_package()
+                    if package is not None:
+                        list(package.iter_variants())
+                    get_package = _loaded(package)
+                except Exception:
+                    pass  # the solver raises the error when it loads the package
+
+            result.append((version, get_package))
+
+        return result
+
+
+class SharedPackageVariantCache(object):
+    """Package variant lists that are shared between solves.
+
+    Solves that use the same shared cache reuse each other's loaded packages,
+    variants and version orderings, rather than loading them again. This is
+    useful when resolving many requests in one process, see
+    `ResolvedContext.resolve_batch`.
+
+    Variant lists are only shared between solves that use the same package
+    paths, package filter and build mode. Families containing packages with
+    late bound requirements are not shared, because these can depend on the
+    context being resolved. Solves sharing a cache must not run concurrently.
+    """
+    def __init__(self):
+        # {(package paths, filter hash, building): {package-name: _PackageVariantList}}
+        self.variant_lists = {}
+
+    def get_variant_lists(self, solver):
+        """Get the variant lists that a solver can share.
+
+        Returns:
+            dict: Variant lists, keyed by package name.
+        """
+        filter_hash = solver.package_filter.sha1 if solver.package_filter else ''
+        key = (tuple(solver.package_paths), filter_hash, solver.building)
+        return self.variant_lists.setdefault(key, {})
+
+    def clear(self):
+        """Drop all variant lists, so that packages are loaded again."""
+        self.variant_lists = {}
+
+
 class _PackageScope(_Common):
     """Contains possible solutions for a package, such as a list of variants,
     or a conflict range. As the resolve progresses, package scopes are narrowed
@@ -1111,6 +1683,94 @@ class _PackageScope(_Common):
             return str(self.variant_slice)
 
 
+class _Nogood(_Common):
+    """A learned combination of package scopes that has no solution.
+
+    Any phase containing all of these packages, with each scope being at least
+    as narrow as that recorded here, has no solution either.
+    """
+    def __init__(self, scopes, failure_reason):
+        """
+        Args:
+            scopes (list of `_PackageScope`): Scopes in conflict.
+            failure_reason (`FailureReason`): The first failure seen when the
+                conflict was learned.
+        """
+        self.failure_reason = failure_reason
+
+        # {package_name: Requirement} for conflict scopes, otherwise
+        # {package_name: frozenset of (version, index)}
+        self.states = {}
+
+        for scope in scopes:
+            if scope.is_conflict:
+                state = scope.package_request
+            else:
+                state = scope.variant_slice.variant_keys
+            self.states[scope.package_name] = state
+
+    def matches(self, scopes):
+        """Test if a phase's scopes imply this conflict.
+
+        Args:
+            scopes (dict): Phase's scopes, keyed by package name.
+
+        Returns:
+            bool.
+        """
+        for package_name, state in self.states.items():
+            scope = scopes.get(package_name)
+            if scope is None:
+                return False
+
+            if scope.is_conflict:
+                if not (scope.package_request == state):
+                    return False
+            elif isinstance(state, Requirement) \
+                    or not (scope.variant_slice.variant_keys <= state):
+                return False
+
+        return True
+
+    def get_failure_reason(self, scopes):
+        requirements = [scopes[x].package_request for x in sorted(self.states)]
+        return LearnedConflict(requirements, self.failure_reason)
+
+    def __str__(self):
+        return ' '.join(sorted(self.states))
+
+
+class _SplitFrame(object):
+    """Tracks the phases below a split, so that a nogood can be learned for
+    the split phase once they have all failed."""
+    def __init__(self, phase, package_name):
+        """
+        Args:
+            phase (`_ResolvePhase`): The exhausted phase that was split.
+            package_name (str): Name of the package scope that was split.
+        """
+        self.phase = phase
+        self.package_names = set([package_name])
+        self.failure_reason = None
+        self.num_pending = 2
+
+
+def _get_influencing_names(package_names, influences):
+    """Get the package names that the given packages' scopes were derived from
+    during a phase solve, including the packages themselves.
+    """
+    result = set()
+    names = list(package_names)
+
+    while names:
+        name = names.pop()
+        if name not in result:
+            result.add(name)
+            names.extend(influences.get(name, ()))
+
+    return result
+
+
 def _get_dependency_order(g, node_list):
     """Return list of nodes as close as possible to the ordering in node_list,
     but with child nodes earlier in the list than parents."""
@@ -1156,6 +1816,10 @@ class _ResolvePhase(_Common):
         self.extractions = {}
         self.status = SolverStatus.pending
 
+        # {package_name: set of package names} - the scopes that each scope
+        # was narrowed (or created) by, during the solve of this phase
+        self.influences = {}
+
         self.scopes = []
         for package_request in self.solver.request_list:
             scope = _PackageScope(package_request, solver=solver)
@@ -1164,6 +1828,16 @@ class _ResolvePhase(_Common):
         # only so an initial reduction across all scopes happens in a new phase
         self.changed_scopes_i = set(range(len(self.scopes)))
 
+        # the split choices (0 for the first phase of a split, 1 for the
+        # second) that lead from the initial phase to this one
+        self.split_path = ()
+
+        # used by the solver for learning nogoods. The split frame is that of
+        # the split that created this phase, and the start scopes are the
+        # scopes this phase had before it was solved.
+        self.split_frame = None
+        self.start_scopes = None
+
     @property
     def pr(self):
         return self.solver.pr
@@ -1176,6 +1850,7 @@ class _ResolvePhase(_Common):
         scopes = self.scopes[:]
         failure_reason = None
         extractions = {}
+        influences = {}
 
         changed_scopes_i = self.changed_scopes_i.copy()
 
@@ -1184,6 +1859,7 @@ class _ResolvePhase(_Common):
             phase.scopes = scopes
             phase.failure_reason = failure_reason
             phase.extractions = extractions
+            phase.influences = influences
             phase.changed_scopes_i = set()
 
             if status is None:
@@ -1207,12 +1883,17 @@ class _ResolvePhase(_Common):
                 with self.solver.timed(self.solver.extraction_time):
                     for i in range(len(scopes)):
                         while True:
-                            scope_, extracted_request = scopes[i].extract()
+                            with self.solver.profiled("extract",
+                                                      scopes[i].package_name):
+                                scope_, extracted_request = scopes[i].extract()
 
                             if extracted_request:
                                 extracted_requests.append(extracted_request)
                                 k = (scopes[i].package_name, extracted_request.name)
                                 extractions[k] = extracted_request
+                                influences.setdefault(
+                                    extracted_request.name,
+                                    set()).add(scopes[i].package_name)
                                 self.solver.extractions_count += 1
                                 scopes[i] = scope_
                             else:
@@ -1233,6 +1914,10 @@ class _ResolvePhase(_Common):
                 elif self.pr:
                     self.pr("merged extractions: %s", extracted_requests)
 
+                if self.solver.prefetcher is not None:
+                    self.solver.prefetcher.prefetch(
+                        extracted_requests.requirements)
+
                 # intersect extracted requests with current scopes
                 self.pr.subheader("INTERSECTING:")
                 req_fams = []
@@ -1245,7 +1930,9 @@ class _ResolvePhase(_Common):
                             continue
 
                         # perform the intersection
-                        scope_ = scope.intersect(extracted_req.range)
+                        with self.solver.profiled("intersect",
+                                                  scope.package_name):
+                            scope_ = scope.intersect(extracted_req.range)
 
                         req_fams.append(extracted_req.name)
 
@@ -1350,8 +2037,10 @@ class _ResolvePhase(_Common):
                 while pending_reducts:
                     x, y = pending_reducts.pop()
 
-                    new_scope, reductions = scopes[x].reduce_by(
-                        scopes[y].package_request)
+                    with self.solver.profiled("reduce",
+                                              scopes[x].package_name):
+                        new_scope, reductions = scopes[x].reduce_by(
+                            scopes[y].package_request)
 
                     if new_scope is None:
                         failure_reason = TotalReduction(reductions)
@@ -1359,6 +2048,9 @@ class _ResolvePhase(_Common):
 
                     elif new_scope is not scopes[x]:
                         scopes[x] = new_scope
+                        influences.setdefault(
+                            new_scope.package_name,
+                            set()).add(scopes[y].package_name)
 
                         # other scopes need to reduce against x again
                         for j in all_scopes_i:
@@ -1441,7 +2133,8 @@ class _ResolvePhase(_Common):
 
         for i, scope in enumerate(self.scopes):
             if split_i is None:
-                r = scope.split()
+                with self.solver.profiled("split", scope.package_name):
+                    r = scope.split()
                 if r is not None:
                     scope_, next_scope = r
                     scopes.append(scope_)
@@ -1467,8 +2160,31 @@ class _ResolvePhase(_Common):
 
         next_phase = copy.copy(phase)
         next_phase.scopes = next_scopes
+
+        phase.split_path = self.split_path + (0,)
+        next_phase.split_path = self.split_path + (1,)
         return (phase, next_phase)
 
+    def prune(self, nogood):
+        """Fail the phase because it implies a learned conflict.
+
+        Args:
+            nogood (`_Nogood`): Nogood that the phase matches.
+
+        Returns:
+            A new copy of the phase, marked as failed.
+        """
+        scopes = dict((x.package_name, x) for x in self.scopes)
+
+        phase = copy.copy(self)
+        if self.status == SolverStatus.pending:
+            phase.extractions = {}
+            phase.influences = {}
+
+        phase.failure_reason = nogood.get_failure_reason(scopes)
+        phase.status = SolverStatus.failed
+        return phase
+
     def get_graph(self):
         """Get the resolve graph.
 
@@ -1674,6 +2390,9 @@ class _ResolvePhase(_Common):
                         failure_nodes.add(id1)
                         failure_nodes.add(id2)
                         failure_nodes.add(id3)
+            elif isinstance(fr, LearnedConflict):
+                for request in fr.requirements:
+                    failure_nodes.add(scope_nodes[request.name])
             elif isinstance(fr, Cycle):
                 for i, pkg in enumerate(fr.packages):
                     id1 = scope_nodes[pkg.name]
@@ -1765,7 +2484,8 @@ class Solver(_Common):
                  package_filter=None, package_orderers=None, callback=None,
                  building=False, optimised=True, verbosity=0, buf=None,
                  package_load_callback=None, prune_unfailed=True,
-                 suppress_passive=False, print_stats=False):
+                 suppress_passive=False, print_stats=False,
+                 preferred_variants=None, variant_cache=None, profiler=None):
         """Create a Solver.
 
         Args:
@@ -1798,6 +2518,19 @@ class Solver(_Common):
                 has had no effect on the solve. This argument only has an
                 effect if `verbosity` > 2.
             print_stats (bool): If true, print advanced solver stats at the end.
+            preferred_variants (list of `Variant`): Variants to try before any
+                others in their package family, where they are in the solve -
+                typically the resolve of a previous context that is being
+                re-resolved with a modified request. This is an ordering hint
+                only - the whole request is still solved, and families whose
+                preferred variant no longer fits are solved as normal. Note
+                that the result can differ from a resolve without preferences.
+            variant_cache (`SharedPackageVariantCache`): If not None, package
+                variants are loaded from, and stored to, this cache, which can
+                be shared with other solvers.
+            profiler (`SolverProfiler`): If not None, solve operations are
+                recorded to this profiler. Speculative solving is disabled
+                while profiling.
         """
         self.package_paths = package_paths
         self.package_filter = package_filter
@@ -1809,20 +2542,38 @@ class Solver(_Common):
         self.request_list = None
         self.context = context
 
+        self.preferred_variants = dict(
+            (x.name, (x.version, x.index)) for x in (preferred_variants or []))
+
         self.pr = _Printer(verbosity, buf=buf, suppress_passive=suppress_passive)
         self.print_stats = print_stats
+        self.profiler = profiler
         self.buf = buf
 
+        # {(requirement str, request str): bool}, see `conflicts`
+        self.conflict_table = {}
+
         if _force_unoptimised_solver:
             self.optimised = False
         else:
             self.optimised = optimised
 
+        self.version_sort_keys = config.solver_version_sort_keys
+        self.speculative_processes = config.solver_speculative_processes
+        self.learn_nogoods = config.solver_learn_nogoods
+
+        # loads would not be profiled, or reported to the callback, in order
+        self.prefetcher = None
+        if config.solver_prefetch_threads > 0 and profiler is None \
+                and package_load_callback is None:
+            self.prefetcher = _FamilyPrefetcher(self, config.solver_prefetch_threads)
+
         self.non_conflict_package_requests = [x for x in package_requests
                                               if not x.conflict]
 
         self.phase_stack = None
         self.failed_phase_list = None
+        self.nogoods = None
         self.abort_reason = None
         self.callback_return = None
         self.depth_counts = None
@@ -1839,6 +2590,8 @@ class Solver(_Common):
         self.reductions_count = 0
         self.reduction_tests_count = 0
         self.reduction_broad_tests_count = 0
+        self.reduction_summary_tests_count = 0
+        self.nogood_prunes_count = 0
 
         self.extraction_time = [0.0]
         self.intersection_time = [0.0]
@@ -1848,7 +2601,11 @@ class Solver(_Common):
 
         self._init()
 
-        self.package_cache = PackageVariantCache(self)
+        if variant_cache is None:
+            self.package_cache = PackageVariantCache(self)
+        else:
+            variant_lists = variant_cache.get_variant_lists(self)
+            self.package_cache = PackageVariantCache(self, variant_lists)
 
         # merge the request
         if self.pr:
@@ -1870,8 +2627,17 @@ class Solver(_Common):
             s = ' '.join(map(str, self.request_list.requirements))
             self.pr("merged request: %s", s)
 
+        if self.prefetcher is not None:
+            self.prefetcher.prefetch(self.request_list.requirements)
+
         # create the initial phase
-        phase = _ResolvePhase(solver=self)
+        try:
+            phase = _ResolvePhase(solver=self)
+        except:
+            if self.prefetcher is not None:
+                self.prefetcher.close()
+            raise
+
         self._push_phase(phase)
 
     @contextmanager
@@ -1881,6 +2647,25 @@ class Solver(_Common):
         secs = time.time() - t
         target[0] += secs
 
+    def profiled(self, operation, package_name):
+        """Record an operation with the profiler, if there is one."""
+        if self.profiler is None:
+            return _null_context
+        return self.profiler.profiled(operation, package_name)
+
+    def conflicts(self, req, req_str, package_request):
+        """Test if a requirement conflicts with a request.
+
+        Results are remembered for the lifetime of the solver, since the same
+        tests are repeated across many reductions.
+        """
+        key = (req_str, str(package_request))
+        result = self.conflict_table.get(key)
+        if result is None:
+            result = req.conflicts_with(package_request)
+            self.conflict_table[key] = result
+        return result
+
     @property
     def status(self):
         """Return the current status of the solve.
@@ -1923,6 +2708,15 @@ class Solver(_Common):
             n += 1
         return n
 
+    @property
+    def context_dependent(self):
+        """Return True if packages with late bound requirements were loaded.
+
+        The result of such a solve may depend on the context it was performed
+        in (see the `context` argument to `Solver`).
+        """
+        return self.package_cache.context_dependent
+
     @property
     def cyclic_fail(self):
         """Return True if the solve failed due to a cycle, False otherwise."""
@@ -1958,10 +2752,17 @@ class Solver(_Common):
         pt1 = package_repo_stats.package_load_time
 
         # iteratively solve phases
-        while self.status == SolverStatus.unsolved:
-            self.solve_step()
-            if self.status == SolverStatus.unsolved and not self._do_callback():
-                break
+        try:
+            if self._can_solve_speculatively():
+                self._solve_speculatively()
+            else:
+                while self.status == SolverStatus.unsolved:
+                    self.solve_step()
+                    if self.status == SolverStatus.unsolved and not self._do_callback():
+                        break
+        finally:
+            if self.prefetcher is not None:
+                self.prefetcher.close()
 
         self.load_time = package_repo_stats.package_load_time - pt1
         self.solve_time = time.time() - t1
@@ -1971,11 +2772,15 @@ class Solver(_Common):
             from pprint import pformat
             self.pr.subheader("SOLVE STATS:")
             self.pr(pformat(self.solve_stats))
+            self.pr.subheader("CACHE STATS:")
+            self.pr('\n'.join(format_cache_stats()))
 
         elif self.print_stats:
             from pprint import pformat
             data = {"solve_stats": self.solve_stats}
-            print(pformat(data), file=(self.buf or sys.stdout))
+            buf = self.buf or sys.stdout
+            print(pformat(data), file=buf)
+            print('\n'.join(format_cache_stats()), file=buf)
 
     @property
     def solve_stats(self):
@@ -1996,10 +2801,16 @@ class Solver(_Common):
             "num_reductions": self.reductions_count,
             "num_reduction_tests": self.reduction_tests_count,
             "num_reduction_broad_tests": self.reduction_broad_tests_count,
+            "num_reduction_summary_tests": self.reduction_summary_tests_count,
             "reduction_time": self.reduction_time[0],
             "reduction_test_time": self.reduction_test_time[0]
         }
 
+        nogood_stats = {
+            "num_nogoods": len(self.nogoods or []),
+            "num_nogood_prunes": self.nogood_prunes_count
+        }
+
         global_stats = {
             "num_solves": self.num_solves,
             "num_fails": self.num_fails,
@@ -2011,7 +2822,8 @@ class Solver(_Common):
             "global": global_stats,
             "extractions": extraction_stats,
             "intersections": intersection_stats,
-            "reductions": reduction_stats
+            "reductions": reduction_stats,
+            "nogoods": nogood_stats
         }
 
     def solve_step(self):
@@ -2025,6 +2837,9 @@ class Solver(_Common):
             self.pr.header("SOLVE #%d (%d fails so far)...",
                            self.solve_count + 1, self.num_fails)
 
+        if self.profiler is not None:
+            self.profiler.step = self.solve_count + 1
+
         phase = self._pop_phase()
 
         if phase.status == SolverStatus.failed:  # a previously failed phase
@@ -2034,12 +2849,24 @@ class Solver(_Common):
 
         if phase.status == SolverStatus.exhausted:
             self.pr.subheader("SPLITTING:")
+            exhausted_phase = phase
             phase, next_phase = phase.split()
+
+            if self.nogoods is not None:
+                split_i = next(iter(phase.changed_scopes_i))
+                frame = _SplitFrame(exhausted_phase,
+                                    phase.scopes[split_i].package_name)
+                phase.split_frame = frame
+                next_phase.split_frame = frame
+
             self._push_phase(next_phase)
             if self.pr:
                 self.pr("new phase: %s", phase)
 
-        new_phase = phase.solve()
+        if self.nogoods is None:
+            new_phase = phase.solve()
+        else:
+            new_phase = self._solve_phase_with_nogoods(phase)
         self.solve_count += 1
 
         if new_phase.status == SolverStatus.failed:
@@ -2177,6 +3004,8 @@ class Solver(_Common):
         self.reductions_count = 0
         self.reduction_tests_count = 0
         self.reduction_broad_tests_count = 0
+        self.reduction_summary_tests_count = 0
+        self.nogood_prunes_count = 0
 
         self.extraction_time = [0.0]
         self.intersection_time = [0.0]
@@ -2184,6 +3013,235 @@ class Solver(_Common):
         self.reduction_time = [0.0]
         self.reduction_test_time = [0.0]
 
+        self.nogoods = [] if self.learn_nogoods else None
+
+    def _solve_phase_with_nogoods(self, phase):
+        """Solve a phase, unless it implies a learned conflict.
+
+        The solved phase is also pruned if it is exhausted, but implies a
+        learned conflict. If the result is failed, nogoods are learned from it.
+        """
+        nogood = self._find_nogood(phase)
+
+        if nogood is None:
+            new_phase = phase.solve()
+            if new_phase.status == SolverStatus.exhausted:
+                nogood = self._find_nogood(new_phase)
+                if nogood is not None:
+                    new_phase = new_phase.prune(nogood)
+            learn_phase = True
+        else:
+            # nothing new is learned from a phase pruned before being solved
+            new_phase = phase.prune(nogood)
+            learn_phase = False
+
+        if nogood is not None:
+            self.nogood_prunes_count += 1
+            if self.pr:
+                self.pr("pruned %s, matched learned conflict: %s",
+                        new_phase, nogood)
+
+        new_phase.start_scopes = phase.scopes
+        if new_phase.status == SolverStatus.failed:
+            self._learn_nogoods(new_phase, learn_phase=learn_phase)
+        return new_phase
+
+    def _find_nogood(self, phase):
+        scopes = dict((x.package_name, x) for x in phase.scopes)
+
+        # the most recently learned are most likely to match
+        for nogood in reversed(self.nogoods):
+            if nogood.matches(scopes):
+                return nogood
+        return None
+
+    def _learn_nogoods(self, phase, learn_phase=True):
+        """Learn nogoods from a failed phase.
+
+        The packages involved in the failure are traced back, via the scopes
+        that narrowed them, to the phase's scopes prior to being solved. Any
+        phase with scopes at least as narrow as these must fail in the same
+        way.
+
+        If the phase was the last unfailed phase below a split, then the phase
+        that was split has no solution either. A nogood is then learned for
+        that phase, from the packages involved in all the failures below it,
+        and so on up the tree of splits.
+        """
+        package_names = set(
+            x.name for x in phase.failure_reason.involved_requirements())
+
+        failure_reason = phase.failure_reason
+        if isinstance(failure_reason, LearnedConflict):
+            failure_reason = failure_reason.failure_reason
+
+        while True:
+            package_names = _get_influencing_names(package_names,
+                                                   phase.influences)
+            scopes = [x for x in phase.start_scopes
+                      if x.package_name in package_names]
+
+            nogood = _Nogood(scopes, failure_reason)
+            if learn_phase:
+                self.nogoods.append(nogood)
+                if self.pr:
+                    self.pr("learned conflict: %s", nogood)
+
+            frame = phase.split_frame
+            if frame is None:
+                break
+
+            frame.package_names.update(nogood.states.keys())
+            if frame.failure_reason is None:
+                frame.failure_reason = failure_reason
+
+            frame.num_pending -= 1
+            if frame.num_pending:
+                break
+
+            # every phase below the split has failed
+            phase = frame.phase
+            package_names = frame.package_names
+            failure_reason = frame.failure_reason
+            learn_phase = True
+
+    def _can_solve_speculatively(self):
+        if self.speculative_processes < 2:
+            return False
+
+        # operations in worker processes would not be profiled
+        if self.profiler is not None:
+            return False
+
+        # workers rely on inheriting the solver's state, so need fork
+        if hasattr(multiprocessing, "get_all_start_methods"):
+            return ("fork" in multiprocessing.get_all_start_methods())
+        else:
+            return (os.name == "posix")
+
+    def _solve_speculatively(self):
+        """Solve, while speculatively solving pending phases in parallel.
+
+        Every pending phase on the phase stack is the root of a subtree of
+        phases that the serial solver would visit, in stack order, if
+        everything above it failed. These subtrees are solved in a pool of
+        worker processes while this process solves the top of the stack as
+        normal. When the serial solve would pop a pending phase, the worker
+        result for that phase is used instead - either the whole subtree is
+        discarded as failed, or the split path to its first solved (or
+        cyclic) phase is replayed. The result is therefore the same as that of
+        the serial solver.
+
+        Note that failures within discarded subtrees are not recorded, so
+        `num_fails` (as also seen by the callback) can be lower than it would
+        be in a serial solve.
+        """
+        global _speculative_solver
+
+        pool = None
+        results = {}  # split path -> AsyncResult
+
+        try:
+            while self.status == SolverStatus.unsolved:
+                # only speculate once the solve has had to backtrack
+                if self.num_fails and len(self.phase_stack) > 1:
+                    if pool is None:
+                        # don't fork while prefetch threads may hold locks
+                        if self.prefetcher is not None:
+                            self.prefetcher.wait()
+
+                        _speculative_solver = self
+                        if hasattr(multiprocessing, "get_context"):
+                            context = multiprocessing.get_context("fork")
+                        else:
+                            context = multiprocessing
+                        pool = context.Pool(self.speculative_processes)
+
+                    self._dispatch_speculative_solves(pool, results)
+
+                    phase = self.phase_stack[-1]
+                    next_phase = self.phase_stack[-2]
+                    result = results.get(next_phase.split_path)
+
+                    if phase.status == SolverStatus.failed and result is not None:
+                        self._apply_speculative_solve(result.get())
+                    else:
+                        self.solve_step()
+                else:
+                    self.solve_step()
+
+                if self.status == SolverStatus.unsolved and not self._do_callback():
+                    break
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+                _speculative_solver = None
+
+    def _dispatch_speculative_solves(self, pool, results):
+        # phases nearest the top of the stack are needed soonest
+        num_busy = sum(1 for x in results.values() if not x.ready())
+
+        for phase in reversed(self.phase_stack[:-1]):
+            if num_busy >= self.speculative_processes:
+                break
+
+            if phase.split_path not in results:
+                results[phase.split_path] = pool.apply_async(
+                    _solve_split_path, (phase.split_path,))
+                num_busy += 1
+
+    def _apply_speculative_solve(self, split_path):
+        failed_phase = self._pop_phase()
+        phase = self._pop_phase()
+
+        if split_path is None:
+            self.pr("speculative solve of %s failed, discarding", phase)
+            self._push_phase(failed_phase)
+            return
+
+        self.pr("replaying speculative solve of %s", phase)
+        self.failed_phase_list.append(failed_phase)
+
+        while True:
+            phase = phase.solve()
+            self.solve_count += 1
+            if phase.status != SolverStatus.exhausted:
+                break
+
+            i = split_path[len(phase.split_path)]
+            phase = phase.split()[i]
+
+        assert(phase.status == SolverStatus.solved)
+        self._push_phase(phase.finalise())
+
+    def _solve_split_path(self, split_path):
+        # Solve the subtree of phases under the given split path. Returns the
+        # split path of the first solved or cyclic phase, or None if all phases
+        # failed.
+        #
+        # This is run in a worker process, on the solver's forked copy of
+        # itself, so that its package cache can be reused.
+        self.pr = _Printer(0)
+        self.callback = None
+        self.package_load_callback = None
+        self.speculative_processes = 0
+        self.prefetcher = None  # its threads do not exist in this process
+        self._init()
+
+        phase = _ResolvePhase(solver=self)
+        for i in split_path:
+            phase = phase.solve().split()[i]
+
+        self._push_phase(phase)
+        self.solve()
+
+        phase = self.phase_stack[-1]
+        if phase.status in (SolverStatus.solved, SolverStatus.cyclic):
+            return phase.split_path
+        else:
+            return None
+
     def _latest_nonfailed_phase(self):
         if self.status == SolverStatus.failed:
             return None
@@ -2214,8 +3272,9 @@ class Solver(_Common):
         return keep_going
 
     def _get_variant_slice(self, package_name, range_):
-        slice_ = self.package_cache.get_variant_slice(
-            package_name=package_name, range_=range_)
+        with self.profiled("load", package_name):
+            slice_ = self.package_cache.get_variant_slice(
+                package_name=package_name, range_=range_)
 
         return slice_
 
@@ -2276,6 +3335,11 @@ class Solver(_Common):
                              str(self.phase_stack[-1]))
 
 
+def _solve_split_path(split_path):
+    # entry point of speculative solve worker processes
+    return _speculative_solver._solve_split_path(split_path)
+
+
 def _short_req_str(package_request):
     """print shortened version of '==X|==Y|==Z' ranged requests."""
     if not package_request.conflict:
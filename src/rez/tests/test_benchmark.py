@@ -0,0 +1,74 @@
+"""
+test solver benchmarking
+"""
+from rez.benchmark import SyntheticUniverse, SolverBenchmark, compare_results
+from rez.packages_ import iter_packages
+from rez.tests.util import TestBase
+import unittest
+
+
+class TestBenchmark(TestBase):
+    def _universe(self, **kwargs):
+        kwargs.setdefault("num_families", 50)
+        kwargs.setdefault("num_versions", 5)
+        return SyntheticUniverse(**kwargs)
+
+    def test_1(self):
+        """Test that universes are reproducible."""
+        u1 = self._universe(seed=5)
+        u2 = self._universe(seed=5)
+        u3 = self._universe(seed=6)
+
+        self.assertEqual(u1.data, u2.data)
+        self.assertEqual(u1.path, u2.path)
+        self.assertEqual(u1.get_requests(5), u2.get_requests(5))
+        self.assertNotEqual(u1.data, u3.data)
+        self.assertNotEqual(u1.path, u3.path)
+
+    def test_2(self):
+        """Test that a universe is visible as a package repository."""
+        universe = self._universe()
+        path = universe.install()
+
+        packages = list(iter_packages("fam_00000", paths=[path]))
+        self.assertEqual(len(packages), 5)
+
+    def test_3(self):
+        """Test running a benchmark."""
+        universe = self._universe()
+        requests = universe.get_requests(3)
+        results = SolverBenchmark(universe, requests).run()
+
+        self.assertEqual(results["summary"]["num_requests"], 3)
+        self.assertEqual(results["universe"]["num_packages"],
+                         universe.num_packages)
+
+        for result in results["results"]:
+            self.assertEqual(result["status"], "solved")
+            self.assertTrue(result["resolve"])
+            self.assertTrue("global" in result["solve_stats"])
+
+        # comparing a run with itself shows no resolve changes
+        comparisons = compare_results(results, results)
+        self.assertEqual(len(comparisons), 3)
+        self.assertFalse(any(x["resolve_changed"] for x in comparisons))
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# Copyright 2013-2016 Allan Johns.
+#
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
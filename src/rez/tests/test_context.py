@@ -6,6 +6,7 @@ from rez.tests.util import restore_os_environ, restore_sys_path, TempdirMixin, \
 from rez.resolved_context import ResolvedContext
 from rez.bind import hello_world
 from rez.utils.platform_ import platform_
+from rez.utils.cache_stats import get_cache_stats
 import unittest
 import subprocess
 import os.path
@@ -92,6 +93,126 @@ class TestContext(TestBase, TempdirMixin):
         r2 = ResolvedContext.load(file)
         self.assertEqual(r.resolved_packages, r2.resolved_packages)
 
+    def test_actions_cache(self):
+        """Test caching of context actions."""
+        r = ResolvedContext(["hello_world"])
+        parent_environ = {"PATH": "/usr/bin"}
+        actions = r.get_actions(parent_environ=parent_environ)
+        code = r.get_shell_code(shell="bash", parent_environ=parent_environ)
+
+        cache_path = os.path.join(self.root, "context_actions_cache")
+        self.update_settings(dict(context_actions_cache_path=cache_path))
+
+        def _hits():
+            return get_cache_stats()["disk_cache"]["hits"]
+
+        # the first execution of each shell type is cached
+        hits = _hits()
+        self.assertEqual(r.get_actions(parent_environ=parent_environ), actions)
+        self.assertEqual(r.get_shell_code(shell="bash",
+                                          parent_environ=parent_environ), code)
+        self.assertEqual(_hits(), hits)
+
+        # and is then replayed, without running package commands
+        r2 = ResolvedContext.from_dict(r.to_dict())
+        r2._execute_commands = None
+
+        self.assertEqual(r2.get_actions(parent_environ=parent_environ), actions)
+        self.assertEqual(r2.get_shell_code(shell="bash",
+                                           parent_environ=parent_environ), code)
+        self.assertEqual(_hits(), hits + 2)
+
+        # a different parent environment is not a hit
+        del r2._execute_commands
+        environ = r2.get_environ(parent_environ={"PATH": "/bin"})
+        self.assertEqual(_hits(), hits + 2)
+        self.assertEqual(environ["OH_HAI_WORLD"], "hello")
+
+    def test_actions_cache_rex_errors(self):
+        """Test that actions of failed package commands are not cached."""
+        from rez.exceptions import RezError
+        from rez.rex import RexExecutor
+
+        packages_path = os.path.join(self.root, "bad_packages")
+        package_path = os.path.join(packages_path, "bad_commands", "1.0")
+        os.makedirs(package_path)
+        with open(os.path.join(package_path, "package.py"), 'w') as f:
+            f.write("name = 'bad_commands'\n"
+                    "version = '1.0'\n"
+                    "def commands():\n"
+                    "    env.BAD_COMMANDS = 'set'\n"
+                    "    raise ValueError('bad commands')\n")
+
+        cache_path = os.path.join(self.root, "context_actions_cache_errors")
+        settings = dict(packages_path=[packages_path],
+                        context_actions_cache_path=cache_path)
+
+        # catching rex errors gives a different key
+        self.update_settings(dict(settings, catch_rex_errors=False))
+        r = ResolvedContext(["bad_commands"])
+        executor = RexExecutor()
+        key = r._get_actions_cache_key(executor)
+        self.update_settings(dict(settings, catch_rex_errors=True))
+        self.assertNotEqual(r._get_actions_cache_key(executor), key)
+
+        def _stats():
+            stats = get_cache_stats()["disk_cache"]
+            return stats["hits"], stats["misses"]
+
+        # every execution runs the package commands again
+        stats = _stats()
+        for _ in range(2):
+            r2 = ResolvedContext.from_dict(r.to_dict())
+            self.assertRaises(RezError, r2.get_environ)
+        self.assertEqual(_stats(), (stats[0], stats[1] + 2))
+
+    def test_resolve_batch(self):
+        """Test batch resolves that contain bad requests."""
+        import rez
+        import sys
+
+        requests = [["hello_world"], ["missing_family"], ["hello_world==1..2"],
+                    ["hello_world"]]
+
+        contexts = ResolvedContext.resolve_batch(requests)
+        self.assertEqual([x.__class__.__name__ for x in contexts],
+                         ["ResolvedContext", "PackageFamilyNotFoundError",
+                          "VersionError", "ResolvedContext"])
+        self.assertTrue(contexts[0].success and contexts[3].success)
+
+        # the other lines of a batch file are still resolved, and saved
+        batch_file = os.path.join(self.root, "batch.txt")
+        with open(batch_file, 'w') as f:
+            f.write("hello_world\n\nmissing_family\nhello_world\n")
+
+        config_file = os.path.join(self.root, "batch_rezconfig.py")
+        with open(config_file, 'w') as f:
+            f.write("packages_path = %r\n" % self.settings["packages_path"])
+            f.write("implicit_packages = []\n")
+
+        environ = dict((k, v) for k, v in os.environ.items()
+                       if not k.startswith("REZ_"))
+        environ.update(
+            REZ_CONFIG_FILE=config_file,
+            PYTHONPATH=os.path.dirname(os.path.dirname(rez.__file__)))
+
+        output_path = os.path.join(self.root, "batch")
+        pycode = "from rez.cli._main import run; run('env')"
+        args = [sys.executable, "-c", pycode, "--batch", batch_file,
+                "-o", output_path]
+
+        p = subprocess.Popen(args, env=environ, stdout=subprocess.PIPE,
+                             stderr=subprocess.PIPE)
+        _, stderr = p.communicate()
+
+        self.assertEqual(p.returncode, 1)
+        self.assertIn("line 3: PackageFamilyNotFoundError",
+                      stderr.decode("utf-8"))
+        self.assertEqual(sorted(os.listdir(output_path)), ["1.rxt", "4.rxt"])
+
+        context = ResolvedContext.load(os.path.join(output_path, "4.rxt"))
+        self.assertTrue(context.success)
+
 
 if __name__ == '__main__':
     unittest.main()
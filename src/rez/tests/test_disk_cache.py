@@ -0,0 +1,201 @@
+"""
+test the local disk cache, and resolve caching to it
+"""
+from rez.tests.util import TestBase, TempdirMixin
+from rez.utils.disk_cache import DiskCache
+from rez.resolved_context import ResolvedContext
+from rez.serialise import load_from_file, FileFormat
+from rez.bind import hello_world
+import unittest
+import os.path
+import os
+
+
+class TestDiskCache(TestBase, TempdirMixin):
+    @classmethod
+    def setUpClass(cls):
+        TempdirMixin.setUpClass()
+
+        cls.packages_path = os.path.join(cls.root, "packages")
+        os.makedirs(cls.packages_path)
+        hello_world.bind(cls.packages_path)
+
+        cls.cache_path = os.path.join(cls.root, "cache")
+
+        cls.settings = dict(
+            packages_path=[cls.packages_path],
+            package_filter=None,
+            implicit_packages=[],
+            warn_untimestamped=False,
+            memcached_uri=[],
+            resolve_caching=True,
+            resolve_cache_path=cls.cache_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        TempdirMixin.tearDownClass()
+
+    def _cache(self, name, max_size=0):
+        return DiskCache(os.path.join(self.root, name), max_size=max_size)
+
+    def test_1(self):
+        """Test basic cache operations."""
+        cache = self._cache("test_1")
+        self.assertFalse(cache.get("foo"))
+
+        cache.set("foo", {"a": [1, 2]})
+        cache.set("bah", None)
+        self.assertEqual(cache.get("foo"), {"a": [1, 2]})
+        self.assertEqual(cache.get("bah"), None)
+        self.assertTrue(cache.get("eek") is cache.miss)
+
+        cache.delete("foo")
+        self.assertTrue(cache.get("foo") is cache.miss)
+        self.assertEqual(cache.get_stats()["entries"], 1)
+
+        # entries persist across instances
+        cache.close()
+        cache = self._cache("test_1")
+        self.assertEqual(cache.get("bah"), None)
+
+        cache.flush()
+        self.assertEqual(cache.get_stats()["entries"], 0)
+
+    def test_2(self):
+        """Test least recently used eviction."""
+        value = 'x' * 1000
+        cache = self._cache("test_2", max_size=3500)
+
+        cache.set("a", value)
+        cache.set("b", value)
+        cache.set("c", value)
+        cache.get("a")
+        cache.set("d", value)
+
+        self.assertTrue(cache.get("b") is cache.miss)
+        for key in ("a", "c", "d"):
+            self.assertEqual(cache.get(key), value)
+        self.assertTrue(cache.get_stats()["size"] <= 3500)
+
+    def test_3(self):
+        """Test that an unusable cache path behaves as a cache miss."""
+        filepath = os.path.join(self.root, "not_a_dir")
+        with open(filepath, 'w'):
+            pass
+
+        cache = DiskCache(filepath)
+        cache.set("foo", 1)
+        self.assertTrue(cache.get("foo") is cache.miss)
+
+    def test_4(self):
+        """Test resolve caching to disk."""
+        r = ResolvedContext(["hello_world"])
+        self.assertFalse(r.from_cache)
+
+        r2 = ResolvedContext(["hello_world"])
+        self.assertTrue(r2.from_cache)
+        self.assertEqual(r2.resolved_packages, r.resolved_packages)
+
+        # a new release invalidates the cached resolve
+        family_path = os.path.join(self.packages_path, "hello_world")
+        st = os.stat(family_path)
+        os.utime(family_path, (st.st_atime, st.st_mtime + 10))
+
+        r3 = ResolvedContext(["hello_world"])
+        self.assertFalse(r3.from_cache)
+
+        r4 = ResolvedContext(["hello_world"])
+        self.assertTrue(r4.from_cache)
+
+        # caching disabled
+        self.update_settings(dict(resolve_cache_path=None))
+        r5 = ResolvedContext(["hello_world"])
+        self.assertFalse(r5.from_cache)
+
+    def test_5(self):
+        """Test package file caching to disk."""
+        cache_path = os.path.join(self.root, "package_files")
+        self.update_settings(dict(package_file_cache_path=cache_path))
+
+        filepath = os.path.join(self.root, "package.py")
+        with open(filepath, 'w') as f:
+            f.write("name = 'foo'\nversion = '1'\n")
+        os.utime(filepath, (1500000000, 1500000000))
+
+        data = load_from_file(filepath, FileFormat.py)
+        self.assertEqual(data, {"name": "foo", "version": "1"})
+        self.assertEqual(DiskCache(cache_path).get_stats()["entries"], 1)
+
+        # the cached data is used while the file's stats are unchanged
+        with open(filepath, 'w') as f:
+            f.write("name = 'foo'\nversion = '2'\n")
+        os.utime(filepath, (1500000000, 1500000000))
+
+        data = load_from_file(filepath, FileFormat.py)
+        self.assertEqual(data["version"], "1")
+
+        # an updated file invalidates the cached data
+        os.utime(filepath, (1500000010, 1500000010))
+        data = load_from_file(filepath, FileFormat.py)
+        self.assertEqual(data["version"], "2")
+
+    def test_6(self):
+        """Test resolve cache validation with a change journal."""
+        from rez.package_repository import package_repository_manager
+
+        self.update_settings(dict(plugins=dict(package_repository=dict(
+            filesystem=dict(change_journal=".journal")))))
+
+        packages_path = os.path.join(self.root, "journaled_packages")
+        os.makedirs(packages_path)
+        hello_world.bind(packages_path)
+
+        repo = package_repository_manager.get_repository(packages_path)
+        position = repo.get_change_journal_position()
+        self.assertNotEqual(position, None)
+        self.assertEqual(repo.get_changes_since(position), set())
+
+        def _resolve():
+            return ResolvedContext(["hello_world"], package_paths=[packages_path])
+
+        self.assertFalse(_resolve().from_cache)
+        self.assertTrue(_resolve().from_cache)
+
+        # packages in the resolve are not checked if the journal shows no
+        # changes to them - so this unjournaled release is not noticed
+        repo.journal_change("foo")
+        family_path = os.path.join(packages_path, "hello_world")
+        st = os.stat(family_path)
+        os.utime(family_path, (st.st_atime, st.st_mtime + 10))
+        self.assertTrue(_resolve().from_cache)
+
+        repo.journal_change("hello_world")
+        self.assertEqual(repo.get_changes_since(position),
+                         set(["foo", "hello_world"]))
+        self.assertFalse(_resolve().from_cache)
+        self.assertTrue(_resolve().from_cache)
+
+        # a rewritten journal is not trusted
+        with open(os.path.join(packages_path, ".journal"), 'w'):
+            pass
+        self.assertEqual(repo.get_changes_since(position), None)
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# Copyright 2013-2016 Allan Johns.
+#
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
@@ -1,8 +1,13 @@
 """
 test importing of all source
 """
-from rez.tests.util import TestBase
+from rez.tests.util import TestBase, TempdirMixin
 import unittest
+import subprocess
+import json
+import sys
+import os.path
+import os
 
 
 class TestImports(TestBase):
@@ -51,6 +56,143 @@ class TestImports(TestBase):
         import rez.utils.yaml
 
 
+# runs a rez command, then writes the names of the modules it imported
+_script = """
+import sys
+import json
+
+output_filepath, command = sys.argv[1:3]
+sys.argv = sys.argv[2:]
+
+try:
+    from rez.cli._main import run
+    run(command)
+except SystemExit:
+    pass
+
+modules = [k for k, v in sys.modules.items() if v is not None]
+with open(output_filepath, "w") as f:
+    json.dump(modules, f)
+"""
+
+
+class TestImportBudget(TestBase, TempdirMixin):
+    """Test that command line tools stay quick to start.
+
+    Each tool has an import budget - the number of rez modules it may import -
+    and heavy modules that it must not import. If a change legitimately needs
+    more modules, raise the budget; otherwise, import the new dependency where
+    it is used, rather than at module level.
+    """
+
+    # modules that are slow to import, and are not needed to start rez
+    heavy_modules = [
+        "rez.solver",
+        "rez.vendor.amqp",
+        "rez.vendor.memcache",
+        "rez.vendor.pydot",
+        "rez.vendor.pyparsing",
+        "rez.vendor.sortedcontainers"
+    ]
+
+    # 'rez-env --help'
+    help_budget = 70
+    help_heavy_modules = heavy_modules + [
+        "rez.resolved_context",
+        "rez.vendor.yaml"
+    ]
+
+    # a tool in a suite, as run by its forwarding script
+    forward_budget = 135
+    forward_heavy_modules = heavy_modules
+
+    @classmethod
+    def setUpClass(cls):
+        from rez.bind import hello_world
+
+        super(TestImportBudget, cls).setUpClass()
+        TempdirMixin.setUpClass()
+
+        packages_path = os.path.join(cls.root, "packages")
+        os.makedirs(packages_path)
+        hello_world.bind(packages_path)
+
+        # for the suite that test_forward creates in-process
+        cls.settings = dict(
+            packages_path=[packages_path],
+            package_filter=None,
+            implicit_packages=[],
+            warn_untimestamped=False,
+            resolve_caching=False)
+
+        # shield the tools from user config, and from memcached in particular
+        cls.config_file = os.path.join(cls.root, "rezconfig.py")
+        with open(cls.config_file, "w") as f:
+            f.write("packages_path = %r\n" % [packages_path])
+            f.write("memcached_uri = []\n")
+
+    @classmethod
+    def tearDownClass(cls):
+        TempdirMixin.tearDownClass()
+
+    def _imported_modules(self, *args):
+        """Run a rez command, and get the rez modules that it imported."""
+        import rez
+
+        output_filepath = os.path.join(self.root, "modules.json")
+        source_path = os.path.dirname(os.path.dirname(rez.__file__))
+
+        # so that the result does not depend on the caller's rez config
+        environ = dict((k, v) for k, v in os.environ.items()
+                       if not k.startswith("REZ_"))
+        environ.update(HOME=self.root,
+                       REZ_CONFIG_FILE=self.config_file,
+                       PYTHONPATH=source_path)
+
+        with open(os.devnull, 'w') as devnull:
+            subprocess.call([sys.executable, "-c", _script, output_filepath]
+                            + list(args), env=environ, stdout=devnull,
+                            stderr=devnull)
+
+        with open(output_filepath) as f:
+            modules = json.load(f)
+
+        return set(x for x in modules
+                   if x.split('.')[0] in ("rez", "rezplugins"))
+
+    def _test_budget(self, modules, budget, heavy_modules):
+        for name in heavy_modules:
+            imported = [x for x in modules
+                        if x == name or x.startswith(name + '.')]
+            self.assertEqual(imported, [], "%s was imported" % name)
+
+        self.assertLessEqual(len(modules), budget,
+                             "%d modules were imported, the budget is %d"
+                             % (len(modules), budget))
+
+    def test_help(self):
+        """Test the imports of 'rez-env --help'."""
+        modules = self._imported_modules("env", "--help")
+        self.assertIn("rez.cli.env", modules)
+        self._test_budget(modules, self.help_budget, self.help_heavy_modules)
+
+    def test_forward(self):
+        """Test the imports of a suite tool."""
+        from rez.resolved_context import ResolvedContext
+        from rez.suite import Suite
+
+        suite = Suite()
+        suite.add_context("hello", ResolvedContext(["hello_world"]))
+        suite_path = os.path.join(self.root, "suite")
+        suite.save(suite_path)
+
+        tool_path = os.path.join(suite_path, "bin", "hello_world")
+        modules = self._imported_modules("forward", tool_path)
+        self.assertIn("rez.wrapper", modules)
+        self._test_budget(modules, self.forward_budget,
+                          self.forward_heavy_modules)
+
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -0,0 +1,185 @@
+"""
+test the memcached client wrapper
+"""
+from rez.tests.util import TestBase
+from rez.utils.memcached import Client, memcached, memcached_client, \
+    local_cache
+from rez.utils.cache_stats import get_cache_stats
+import unittest
+
+
+class _Backend(object):
+    """Stands in for a `memcache.Client` connected to a server, recording the
+    requests made to it."""
+    def __init__(self):
+        self.store = {}
+        self.requests = []
+
+    def get(self, key):
+        self.requests.append("get")
+        return self.store.get(key)
+
+    def get_multi(self, keys):
+        self.requests.append("get_multi")
+        return dict((x, self.store[x]) for x in keys if x in self.store)
+
+    def set(self, key, val, time=0, min_compress_len=0):
+        self.requests.append("set")
+        self.store[key] = val
+
+    def set_multi(self, mapping, time=0, min_compress_len=0):
+        self.requests.append("set_multi")
+        self.store.update(mapping)
+
+    def delete(self, key):
+        self.requests.append("delete")
+        self.store.pop(key, None)
+
+    def disconnect_all(self):
+        pass
+
+
+class TestMemcached(TestBase):
+    def _client(self):
+        client = Client("127.0.0.1:11211")
+        client._client = _Backend()
+        return client, client._client.requests
+
+    def test_1(self):
+        """Test that writes are coalesced."""
+        client, requests = self._client()
+
+        client.set("a", 1)
+        client.set("b", None)
+        client.set("c", [3], time=10)
+        self.assertEqual(requests, [])
+
+        # pending writes are visible to this client
+        self.assertEqual(client.get("a"), 1)
+        self.assertEqual(client.get("b"), None)
+        self.assertEqual(requests, [])
+
+        client.flush_sets()
+        self.assertEqual(requests, ["set_multi", "set_multi"])
+        self.assertEqual(client.get("c"), [3])
+
+        # writes are sent once enough are pending
+        del requests[:]
+        for i in range(client.max_pending_sets):
+            client.set(str(i), i)
+        self.assertEqual(requests, ["set_multi"])
+
+        # and on disconnect
+        del requests[:]
+        client.set("d", 4)
+        client.disconnect()
+        self.assertEqual(requests, ["set_multi"])
+
+    def test_2(self):
+        """Test prefetching."""
+        client, requests = self._client()
+        client.set_multi({"a": 1, "b": None})
+
+        del requests[:]
+        client.prefetch(["a", "b", "c"])
+        self.assertEqual(requests, ["get_multi"])
+
+        # hits and misses are answered without further requests
+        self.assertEqual(client.get("a"), 1)
+        self.assertEqual(client.get("b"), None)
+        self.assertTrue(client.get("c") is client.miss)
+        self.assertEqual(requests, ["get_multi"])
+
+        # prefetched entries are only used once
+        self.assertEqual(client.get("a"), 1)
+        self.assertEqual(requests, ["get_multi", "get"])
+
+        self.assertEqual(client.get_multi(["a", "c"]), {"a": 1})
+
+    def test_3(self):
+        """Test the in-process cache in front of memcached."""
+        servers = ["127.0.0.1:11211"]
+        self.update_settings(dict(memcached_local_cache_size=2))
+        local_cache.clear()
+        calls = []
+
+        @memcached(servers=servers, immutable=True)
+        def _get(x):
+            calls.append(x)
+            return {"x": x}
+
+        with memcached_client(servers) as client:
+            client._client = _Backend()
+            requests = client._client.requests
+            stats = get_cache_stats()
+
+            self.assertEqual(_get(1), {"x": 1})
+            self.assertEqual(calls, [1])
+            self.assertEqual(requests, ["get"])
+
+            # a local hit is a copy, and makes no request
+            _get(1)["x"] = 2
+            self.assertEqual(_get(1), {"x": 1})
+            self.assertEqual(calls, [1])
+            self.assertEqual(requests, ["get"])
+
+            stats_ = get_cache_stats()
+            self.assertEqual(stats_["memcached_local"]["hits"]
+                             - stats["memcached_local"]["hits"], 2)
+            self.assertEqual(stats_["memcached"]["misses"]
+                             - stats["memcached"]["misses"], 1)
+
+            # least recently used entries are discarded
+            _get(2)
+            _get(3)
+            self.assertEqual(get_cache_stats()["memcached_local"]["entries"], 2)
+            client.flush_sets()
+            del requests[:]
+            self.assertEqual(_get(1), {"x": 1})
+            self.assertEqual(requests, ["get"])
+            self.assertEqual(calls, [1, 2, 3])
+
+            # forgetting clears the local cache
+            _get.forget()
+            self.assertEqual(get_cache_stats()["memcached_local"]["entries"], 0)
+
+    def test_4(self):
+        """Test that deletes discard pending writes, and prefetched entries."""
+        client, requests = self._client()
+
+        client.set("a", 1)
+        client.set("a", 2, time=10)
+        client.delete("a")
+        self.assertTrue(client.get("a") is client.miss)
+        self.assertEqual(client._num_pending_sets, 0)
+
+        client.set_multi({"b": 2})
+        client.prefetch(["b"])
+        client.delete("b")
+        self.assertTrue(client.get("b") is client.miss)
+
+        # the deleted entry is not written back
+        del requests[:]
+        client.disconnect()
+        self.assertEqual(requests, [])
+        self.assertEqual(client._client.store, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# Copyright 2013-2016 Allan Johns.
+#
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
@@ -2,7 +2,7 @@
 test package iteration, serialization etc
 """
 from rez.packages_ import iter_package_families, iter_packages, get_package, \
-    create_package, get_developer_package
+    create_package, get_developer_package, iter_package_versions
 from rez.package_py_utils import expand_requirement
 from rez.package_repository import create_memory_package_repository
 from rez.package_resources_ import package_release_keys
@@ -471,6 +471,103 @@ class TestPackages(TestBase, TempdirMixin):
         _test(fam_orderer, "timestamped", expected_timestamp_result)
         _test(fam_orderer, "pymum", ["1", "2", "3"])
 
+    def test_10(self):
+        """package version iteration."""
+        for fam_name in ALL_FAMILIES:
+            expected = dict((x.version, x) for x in iter_packages(fam_name))
+
+            result = {}
+            for version, get_package_ in iter_package_versions(fam_name):
+                self.assertFalse(version in result)
+                result[version] = get_package_()
+
+            self.assertEqual(result, expected)
+
+        # an invalid package does not hide a valid one later in the path
+        paths = [os.path.join(self.root, "invalid_versions_%d" % i)
+                 for i in range(2)]
+        for path in paths:
+            os.makedirs(os.path.join(path, "foo", "1.0"))
+            with open(os.path.join(path, "foo", "1.0", "package.py"), 'w') as f:
+                f.write("name = 'foo'\nversion = '1.0'\n")
+
+        self.update_settings(dict(
+            plugins=dict(package_repository=dict(filesystem=dict(
+                check_package_definition_files=True)))))
+
+        # the first copy becomes invalid after the versions are listed
+        versions = list(iter_package_versions("foo", paths=paths))
+        os.remove(os.path.join(paths[0], "foo", "1.0", "package.py"))
+
+        self.assertEqual(len(versions), 1)
+        version, get_package_ = versions[0]
+        package = get_package_()
+        self.assertEqual(str(version), "1.0")
+        self.assertEqual(package.repository.location, paths[1])
+
+    def test_11(self):
+        """test package family index files."""
+        from rez.package_repository import package_repository_manager
+        from rez.config import config
+
+        repo_path = os.path.join(self.root, "indexed_packages")
+        os.makedirs(repo_path)
+        config.override("plugins.package_repository.filesystem.family_index_dir",
+                        ".index")
+
+        # installing variants writes the family's index
+        for name in ("developer", "developer_novar"):
+            path = os.path.join(self.packages_base_path, name)
+            package = get_developer_package(path)
+            for variant in package.iter_variants():
+                variant.install(repo_path)
+
+        repo = package_repository_manager.get_repository(repo_path)
+        family_path = os.path.join(repo_path, "foo")
+        index_filepath = os.path.join(repo_path, ".index", "foo.json")
+        self.assertTrue(os.path.isfile(index_filepath))
+        self.assertNotEqual(repo.get_family_index(family_path), None)
+
+        # the index directory is not a package family
+        families = set(x.name for x in repo.iter_package_families())
+        self.assertEqual(families, set(["foo", "blah"]))
+
+        def _qnames():
+            repo.clear_caches()
+            return _to_qnames(iter_packages("foo", paths=[repo_path]))
+
+        self.assertEqual(_qnames(), set(["foo-3.0.1"]))
+
+        # a stale index is ignored. Here a new version is added without
+        # updating the index
+        version_path = os.path.join(family_path, "9.0.0")
+        os.makedirs(version_path)
+        with open(os.path.join(version_path, "package.py"), 'w') as f:
+            f.write("name = 'foo'\nversion = '9.0.0'\n")
+
+        repo.clear_caches()
+        self.assertEqual(repo.get_family_index(family_path), None)
+        self.assertEqual(_qnames(), set(["foo-3.0.1", "foo-9.0.0"]))
+
+        # the index matches a directory scan once updated
+        repo.update_family_index("foo")
+        repo.clear_caches()
+        self.assertNotEqual(repo.get_family_index(family_path), None)
+        self.assertEqual(_qnames(), set(["foo-3.0.1", "foo-9.0.0"]))
+
+        # the entry of a changed version directory is ignored. Here a package
+        # file is converted to another format
+        os.remove(os.path.join(version_path, "package.py"))
+        with open(os.path.join(version_path, "package.yaml"), 'w') as f:
+            f.write("name: foo\nversion: 9.0.0\n")
+        st = os.stat(version_path)
+        os.utime(version_path, (st.st_atime, st.st_mtime + 10))
+
+        repo.clear_caches()
+        self.assertNotEqual(repo.get_family_index(family_path), None)
+        package = get_package("foo", "9.0.0", paths=[repo_path])
+        self.assertEqual(os.path.basename(package.uri), "package.yaml")
+
 
 class TestMemoryPackages(TestBase):
     def test_1_memory_variant_parent(self):
@@ -484,6 +581,77 @@ class TestMemoryPackages(TestBase):
         self.assertEqual(package.description, desc)
 
 
+class TestPackedPackages(TestBase, TempdirMixin):
+    @classmethod
+    def setUpClass(cls):
+        TempdirMixin.setUpClass()
+
+        path = os.path.realpath(os.path.dirname(__file__))
+        cls.solver_packages_path = os.path.join(path, "data", "solver", "packages")
+        cls.py_packages_path = os.path.join(path, "data", "packages", "py_packages")
+
+        cls.settings = dict(
+            packages_path=[cls.solver_packages_path],
+            package_filter=None)
+
+    @classmethod
+    def tearDownClass(cls):
+        TempdirMixin.tearDownClass()
+
+    def test_1(self):
+        """test that a packed repository matches its source repository."""
+        from rezplugins.package_repository.packed import write_pack_file
+
+        for source in (self.solver_packages_path, self.py_packages_path):
+            filepath = os.path.join(self.root, "test_1_%s.pack"
+                                    % os.path.basename(source))
+            write_pack_file(filepath, source)
+            packed_path = "packed@" + filepath
+
+            families = _to_names(iter_package_families(paths=[source]))
+            families_ = _to_names(iter_package_families(paths=[packed_path]))
+            self.assertEqual(families, families_)
+
+            for name in families:
+                packages = dict((x.version, x) for x in
+                                iter_packages(name, paths=[source]))
+                packages_ = dict((x.version, x) for x in
+                                 iter_packages(name, paths=[packed_path]))
+
+                # packages that fail to load are not packed
+                if name == "versioned":
+                    del packages[Version("2.0")]
+
+                self.assertEqual(set(packages), set(packages_))
+
+                for version, package in packages.items():
+                    package_ = packages_[version]
+                    self.assertEqual(package.validated_data(),
+                                     package_.validated_data())
+
+                    # payloads stay in the source repository
+                    roots = [x.root for x in package.iter_variants()]
+                    roots_ = [x.root for x in package_.iter_variants()]
+                    self.assertEqual(roots, roots_)
+
+    def test_2(self):
+        """test resolving from a packed repository."""
+        from rez.resolved_context import ResolvedContext
+        from rezplugins.package_repository.packed import write_pack_file
+
+        filepath = os.path.join(self.root, "test_2.pack")
+        write_pack_file(filepath, self.solver_packages_path)
+        packed_path = "packed@" + filepath
+
+        r = ResolvedContext(["pyfoo", "python-2.6"])
+        r_ = ResolvedContext(["pyfoo", "python-2.6"],
+                             package_paths=[packed_path])
+
+        names = [x.qualified_package_name for x in r.resolved_packages]
+        names_ = [x.qualified_package_name for x in r_.resolved_packages]
+        self.assertEqual(names, names_)
+
+
 if __name__ == '__main__':
     unittest.main()
 
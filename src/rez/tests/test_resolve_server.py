@@ -0,0 +1,166 @@
+"""
+test forwarding resolves to a resolve server
+"""
+from rez.tests.util import TestBase, TempdirMixin
+from rez.resolve_server import ResolveServer
+from rez import resolve_server
+from rez.resolved_context import ResolvedContext
+import threading
+import unittest
+import socket
+import time
+import os.path
+import os
+
+
+@unittest.skipIf(not hasattr(socket, "AF_UNIX"), "unix sockets not supported")
+class TestResolveServer(TestBase, TempdirMixin):
+    @classmethod
+    def setUpClass(cls):
+        TempdirMixin.setUpClass()
+
+        cls.packages_path = os.path.join(cls.root, "packages")
+        os.makedirs(cls.packages_path)
+        cls._make_package("foo", "1.0")
+
+        cls.socket_path = os.path.join(cls.root, "resolve.sock")
+        cls.server = ResolveServer(cls.socket_path)
+
+        thread = threading.Thread(target=cls.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+        while not os.path.exists(cls.socket_path):
+            time.sleep(0.01)
+
+        cls.settings = dict(
+            packages_path=[cls.packages_path],
+            package_filter=None,
+            implicit_packages=[],
+            warn_untimestamped=False,
+            resolve_caching=False,
+            resolve_server_socket=cls.socket_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        TempdirMixin.tearDownClass()
+
+    @classmethod
+    def _make_package(cls, name, version, requires=None):
+        # note that packages made with rez.package_maker__ are read back from a
+        # local copy by this process, so changing them here would go unseen
+        path = os.path.join(cls.packages_path, name, version)
+        if not os.path.exists(path):
+            os.makedirs(path)
+
+        filepath = os.path.join(path, "package.py")
+        with open(filepath, 'w') as f:
+            f.write("name = %r\nversion = %r\nrequires = %r\n"
+                    % (name, version, requires or []))
+        return filepath
+
+    def _resolve(self, request, served=True):
+        num_resolves = self.server.num_resolves
+        r = ResolvedContext(request)
+        self.assertEqual(self.server.num_resolves,
+                         num_resolves + (1 if served else 0))
+        return [x.qualified_package_name for x in r.resolved_packages]
+
+    def test_1(self):
+        """Test resolves served before and after packages change."""
+        self.assertEqual(self._resolve(["foo"]), ["foo-1.0"])
+
+        # a new release
+        self._make_package("bar", "1.0")
+        self._make_package("foo", "2.0")
+        self.assertEqual(self._resolve(["foo"]), ["foo-2.0"])
+
+        # a package definition changed in place
+        filepath = self._make_package("foo", "2.0", requires=["bar"])
+        st = os.stat(filepath)
+        os.utime(filepath, (st.st_atime, st.st_mtime + 10))
+        self.assertEqual(self._resolve(["foo"]), ["bar-1.0", "foo-2.0"])
+
+        # resolves that report progress are performed in-process
+        ResolvedContext(["foo"], verbosity=1)
+        self.assertEqual(self._resolve(["foo-1"]), ["foo-1.0"])
+
+    def test_2(self):
+        """Test falling back to in-process resolves."""
+        socket_path = os.path.join(self.root, "missing.sock")
+        self.update_settings(dict(resolve_server_socket=socket_path))
+        self.assertEqual(self._resolve(["foo-1"], served=False), ["foo-1.0"])
+
+    def test_3(self):
+        """Test that a stalled client does not block the server."""
+        timeout = resolve_server.connection_timeout
+        resolve_server.connection_timeout = 0.1
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+        try:
+            sock.connect(self.socket_path)
+            self.assertEqual(self._resolve(["foo-1"]), ["foo-1.0"])
+        finally:
+            sock.close()
+            resolve_server.connection_timeout = timeout
+
+    def test_4(self):
+        """Test that a package changed during a solve is seen afterwards."""
+        from rez.resolver import Resolver
+
+        self._make_package("baz", "1.0")
+        self.assertEqual(self._resolve(["baz"]), ["baz-1.0"])
+
+        def _solve(resolver):
+            solver = solve(resolver)
+            filepath = self._make_package("baz", "1.0", requires=["bar"])
+            st = os.stat(filepath)
+            os.utime(filepath, (st.st_atime, st.st_mtime + 10))
+            return solver
+
+        solve = Resolver._solve
+        Resolver._solve = _solve
+        try:
+            self.assertEqual(self._resolve(["baz"]), ["baz-1.0"])
+        finally:
+            Resolver._solve = solve
+
+        self._make_package("bar", "1.0")
+        self.assertEqual(self._resolve(["baz"]), ["bar-1.0", "baz-1.0"])
+
+    def test_5(self):
+        """Test falling back to in-process resolves if the server hangs."""
+        socket_path = os.path.join(self.root, "hung.sock")
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(socket_path)
+        sock.listen(1)  # but never accepts
+
+        try:
+            self.update_settings(dict(resolve_server_socket=socket_path,
+                                      resolve_server_timeout=1))
+            t = time.time()
+            self.assertEqual(self._resolve(["foo-1"], served=False),
+                             ["foo-1.0"])
+            self.assertLess(time.time() - t, 5)
+        finally:
+            sock.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+# Copyright 2013-2016 Allan Johns.
+#
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
@@ -6,8 +6,12 @@ from rez.utils.resources import Resource, ResourcePool, ResourceHandle, \
     ResourceWrapper
 from rez.package_repository import PackageRepository
 from rez.utils.schema import Required
+from rez.utils.cache_stats import get_cache_stats
+from rez.utils.memory_budget import MemoryBudget, memory_bounded_cache
 from rez.exceptions import ResourceError
 import unittest
+import pickle
+import sys
 from rez.vendor.schema.schema import Schema, Use, And, Optional
 from rez.vendor.six import six
 
@@ -300,6 +304,99 @@ class TestResources_(TestBase):
                                       age=0.6,
                                       owner="joe.bloggs"))
 
+    def test_4(self):
+        """resource pool cache statistics."""
+        def _stats():
+            return get_cache_stats()["resource_pool"]
+
+        pool = PetPool(cache_size=2)
+        pool.register_resource(ResourceA)
+        stats = _stats()
+
+        pool.get_resource("resource.a", dict(name="a"))
+        pool.get_resource("resource.a", dict(name="a"))
+        pool.get_resource("resource.a", dict(name="b"))
+        pool.get_resource("resource.a", dict(name="c"))
+
+        stats_ = _stats()
+        self.assertEqual(stats_["hits"] - stats["hits"], 1)
+        self.assertEqual(stats_["misses"] - stats["misses"], 3)
+        self.assertEqual(stats_["evictions"] - stats["evictions"], 1)
+        self.assertEqual(stats_["entries"] - stats["entries"], 2)
+
+        pool.clear_caches()
+        self.assertEqual(_stats()["entries"], stats["entries"])
+
+    def test_5(self):
+        """caches bounded by a shared memory budget."""
+        budget = MemoryBudget()
+        data = dict((str(i), "x" * 1000) for i in range(10))
+        calls = []
+
+        @memory_bounded_cache(budget)
+        def _get_data(name):
+            calls.append(name)
+            return dict(data)
+
+        @memory_bounded_cache(budget)
+        def _get_names(name):
+            calls.append(name)
+            return list(data.keys())
+
+        _get_data("a")
+        _get_names("b")
+        _get_data("a")
+        self.assertEqual(calls, ["a", "b"])
+        self.assertEqual(len(budget.entries), 2)
+
+        # the least recently used entry, of either cache, is evicted
+        budget.max_bytes = budget.size + 1
+        _get_names("c")
+        self.assertEqual(len(budget.entries), 2)
+        _get_data("a")
+        _get_names("b")
+        self.assertEqual(calls, ["a", "b", "c", "b"])
+
+        # values can be charged more once cached
+        budget.max_bytes = budget.size * 2
+        value = _get_names("b")
+        budget.charge(value, budget.max_bytes)
+        self.assertEqual(len(budget.entries), 1)
+
+        _get_names.cache_clear()
+        self.assertEqual(len(budget.entries), 0)
+        self.assertEqual(budget.size, 0)
+
+    def test_6(self):
+        """resource handles."""
+        pool = PetPool(cache_size=None)
+        pool.register_resource(ResourceA)
+
+        variables = dict(name="".join(["o", "bi"]), age=3)
+        handle = ResourceHandle("resource.a", variables)
+        handle_ = ResourceHandle("resource.a", dict(name="obi", age=3))
+        self.assertEqual(handle, handle_)
+        self.assertEqual(hash(handle), hash(handle_))
+        self.assertFalse(hasattr(handle, "__dict__"))
+
+        # string values are shared between handles
+        self.assertTrue(handle.variables["name"] is handle_.variables["name"])
+
+        # but are not kept alive once no handle refers to them
+        value = "".join(["un", "shared"])
+        refcount = sys.getrefcount(value)
+        handle_ = ResourceHandle("resource.a", dict(name=value))
+        self.assertTrue(handle_.variables["name"] is value)
+        del handle_
+        self.assertEqual(sys.getrefcount(value), refcount)
+
+        # resources share the handle they were created from
+        resource = pool.get_resource_from_handle(handle)
+        self.assertTrue(resource.handle is handle)
+
+        handle_ = pickle.loads(pickle.dumps(handle))
+        self.assertEqual(handle, handle_)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -11,8 +11,12 @@ import unittest
 from rez.vendor.version.version import Version
 from rez.tests.util import TestBase
 from rez.utils.backcompat import convert_old_commands
+from rez.utils.sourcecode import SourceCode, compile_source
+from rez.utils.cache_stats import get_cache_stats
 import inspect
 import textwrap
+import tempfile
+import shutil
 import os
 
 
@@ -407,6 +411,43 @@ class TestRex(TestBase):
                                             annotate=False)
         self.assertEqual(rez_commands, expected)
 
+    def test_compiled_code(self):
+        """Test caching of compiled code."""
+        def _stats(name):
+            stats = get_cache_stats()[name]
+            return stats["hits"], stats["misses"]
+
+        source = "x = value * 2\nreturn x"
+        compile_source.cache_clear()
+        hits, misses = _stats("compiled_code")
+
+        # code is compiled once per process
+        self.assertEqual(SourceCode(source).exec_({"value": 1}), 2)
+        self.assertEqual(_stats("compiled_code"), (hits, misses + 1))
+        self.assertEqual(SourceCode(source).exec_({"value": 2}), 4)
+        self.assertEqual(_stats("compiled_code"), (hits + 1, misses + 1))
+
+        # and is shared between processes, via the package file cache
+        cache_path = tempfile.mkdtemp(prefix="rez_test_")
+        try:
+            self.update_settings(dict(package_file_cache_path=cache_path))
+            compile_source.cache_clear()
+            hits, misses = _stats("disk_cache")
+
+            code = SourceCode(source).evaluated_code
+            compile_source(code, "<string>")
+            self.assertEqual(_stats("disk_cache"), (hits, misses + 1))
+
+            compile_source.cache_clear()
+            pyc = compile_source(code, "<string>")
+            self.assertEqual(_stats("disk_cache"), (hits + 1, misses + 1))
+
+            globals_ = {"value": 3}
+            exec(pyc, globals_)
+            self.assertEqual(globals_["_result"], 6)
+        finally:
+            shutil.rmtree(cache_path)
+
 
 if __name__ == '__main__':
     unittest.main()
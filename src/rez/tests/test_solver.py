@@ -4,10 +4,13 @@ test dependency resolving algorithm
 from __future__ import print_function
 
 from rez.vendor.version.requirement import Requirement
-from rez.solver import Solver, Cycle, SolverStatus
+from rez.solver import Solver, Cycle, SolverStatus, SharedPackageVariantCache, \
+    SolverProfiler
 from rez.config import config
+from rez.exceptions import PackageFamilyNotFoundError
 import unittest
 from rez.tests.util import TestBase
+from rez.vendor.six.six import StringIO
 import itertools
 import os.path
 
@@ -223,6 +226,286 @@ class TestSolver(TestBase):
                      "test_variant_split_mid2-2.0[0]",
                      "test_variant_split_start-1.0[1]"])
 
+    def test_12_version_sort_keys(self):
+        config.override("solver_version_sort_keys", True)
+        self._solve(["pyvariants", "python"],
+                    ["python-2.7.0[]", "pyvariants-2[0]"])
+        self._solve(["test_variant_split_start"],
+                    ["test_variant_split_end-1.0[1]",
+                     "test_variant_split_mid2-2.0[0]",
+                     "test_variant_split_start-1.0[1]"])
+        self._fail("pyfoo-3.1", "python-2.7+")
+
+    def test_13_speculative_solve(self):
+        """Test that speculative solving matches serial solving."""
+        from rez.package_repository import package_repository_manager
+
+        # a repository that forces deep backtracking: each foo version pulls
+        # in a chain of unique families, and only the last of these conflicts
+        # with the requested base version
+        data = {"base": {}, "foo": {}}
+
+        for i in range(1, 6):
+            ver_fam = "ver_%d" % i
+            data["base"][str(i)] = {"name": "base", "version": str(i)}
+            data["foo"][str(i)] = {"name": "foo", "version": str(i),
+                                   "requires": [ver_fam]}
+            data[ver_fam] = {}
+
+            for j in range(1, 4):
+                leaf_fam = "leaf_%d_%d" % (i, j)
+                data[ver_fam][str(j)] = {"name": ver_fam, "version": str(j),
+                                         "requires": [leaf_fam]}
+                data[leaf_fam] = {"1": {"name": leaf_fam, "version": "1",
+                                        "requires": ["base-%d" % i]}}
+
+        path = "memory@test_speculative_solve"
+        repo = package_repository_manager.get_repository(path)
+        repo.data = data
+
+        requests = [["foo", "base-1"],
+                    ["foo", "base-1", "!foo-1"],
+                    ["base-2", "foo"],
+                    ["python", "bahish", "pybah"],
+                    ["test_variant_split_start"],
+                    ["bahish", "pybah<5"]]
+
+        def _solve(request, processes):
+            config.override("solver_speculative_processes", processes)
+            s = Solver([Requirement(x) for x in request],
+                       self.packages_path + [path])
+            s.solve()
+
+            failure = None
+            if s.status == SolverStatus.failed:
+                failure = str(s.failure_reason())
+            return s.status, s.resolved_packages, failure, s.num_fails
+
+        for request in requests:
+            serial = _solve(request, 0)
+            speculative = _solve(request, 3)
+            self.assertEqual(serial[:3], speculative[:3])
+            self.assertTrue(serial[3] >= speculative[3])
+
+    def test_14_learn_nogoods(self):
+        """Test that learning nogoods matches a normal solve."""
+        from rez.package_repository import package_repository_manager
+
+        # every bar version conflicts with the requested base version, but
+        # foo is split first, so without learning, the solver rediscovers the
+        # bar conflicts for every foo version
+        data = {
+            "foo": {}, "util": {}, "bar": {},
+            "base": {"1": {"name": "base", "version": "1"},
+                     "2": {"name": "base", "version": "2"}}
+        }
+
+        for i in range(1, 6):
+            data["util"][str(i)] = {"name": "util", "version": str(i)}
+            data["foo"][str(i)] = {"name": "foo", "version": str(i),
+                                   "requires": ["util-%d" % i]}
+
+        for i in range(1, 5):
+            leaf_fam = "leaf_%d" % i
+            data["bar"][str(i)] = {"name": "bar", "version": str(i),
+                                   "requires": [leaf_fam]}
+            data[leaf_fam] = {"1": {"name": leaf_fam, "version": "1",
+                                    "requires": ["base-2"]}}
+
+        path = "memory@test_learn_nogoods"
+        repo = package_repository_manager.get_repository(path)
+        repo.data = data
+
+        requests = [["foo", "bar", "base-1"],
+                    ["foo", "bar", "base"],
+                    ["foo", "bar-3", "base-1|2", "!util-5"],
+                    ["python", "bahish", "pybah"],
+                    ["test_variant_split_start"],
+                    ["bahish", "pybah<5"]]
+
+        def _solve(request, learn):
+            config.override("solver_learn_nogoods", learn)
+            s = Solver([Requirement(x) for x in request],
+                       self.packages_path + [path])
+            s.solve()
+
+            failure = None
+            if s.status == SolverStatus.failed:
+                failure = str(s.failure_reason())
+                s.get_fail_graph(-1)
+            return s.status, s.resolved_packages, failure, s.num_fails
+
+        for request in requests:
+            result = _solve(request, False)
+            result_ = _solve(request, True)
+            self.assertEqual(result[:3], result_[:3])
+            self.assertTrue(result[3] >= result_[3])
+
+        # the bar conflicts are learned once, rather than once per foo version
+        result = _solve(["foo", "bar", "base-1"], False)
+        result_ = _solve(["foo", "bar", "base-1"], True)
+        self.assertEqual(result[3], 20)
+        self.assertTrue(result_[3] < 10)
+
+    def test_15_preferred_variants(self):
+        """Test that preferred variants are tried first, when given."""
+        def _solve(request, preferred_request=None):
+            preferred_variants = None
+            if preferred_request:
+                s = Solver([Requirement(x) for x in preferred_request],
+                           self.packages_path)
+                s.solve()
+                preferred_variants = s.resolved_packages
+
+            s = Solver([Requirement(x) for x in request],
+                       self.packages_path,
+                       preferred_variants=preferred_variants)
+            s.solve()
+            self.assertEqual(s.status, SolverStatus.solved)
+            # the order of independent packages is not significant here
+            return sorted(str(x) for x in s.resolved_packages)
+
+        # without preferences, the latest packages win
+        self.assertEqual(_solve(["python"]), ["python-2.7.0[]"])
+        self.assertEqual(_solve(["pyvariants"]),
+                         ["python-2.7.0[]", "pyvariants-2[0]"])
+
+        # preferences are opt-in, and change the result of an open request
+        self.assertEqual(_solve(["python"], ["python-2.6.0"]),
+                         ["python-2.6.0[]"])
+        self.assertEqual(_solve(["python-2.7"], ["python-2.6.0"]),
+                         ["python-2.7.0[]"])
+
+        # a preferred variant index
+        self.assertEqual(_solve(["pyvariants"], ["pyvariants", "python-2.6"]),
+                         ["nada[]", "python-2.6.8[]", "pyvariants-2[1]"])
+
+        # preferences that conflict with the request are passed over
+        self.assertEqual(_solve(["pyfoo-3.1", "python"], ["python-2.5"]),
+                         ["pyfoo-3.1.0[]", "python-2.6.8[]"])
+
+    def test_16_shared_variant_cache(self):
+        """Test solves that share loaded packages."""
+        variant_cache = SharedPackageVariantCache()
+
+        def _solve(request, shared=True):
+            s = Solver([Requirement(x) for x in request],
+                       self.packages_path,
+                       variant_cache=(variant_cache if shared else None))
+            s.solve()
+            return s, sorted(str(x) for x in s.resolved_packages or [])
+
+        requests = [["pyvariants", "python-2.6"],
+                    ["pyfoo", "python"],
+                    ["bahish", "pybah"],
+                    ["pyvariants"],
+                    ["python-2.5", "pyfoo"]]
+
+        for request in requests:
+            _, expected = _solve(request, shared=False)
+            _, resolve = _solve(request)
+            self.assertEqual(resolve, expected)
+
+        # variant lists are reused by later solves
+        variant_lists = variant_cache.get_variant_lists(Solver([], self.packages_path))
+        variant_list = variant_lists["python"]
+        s, _ = _solve(["python"])
+        self.assertTrue(variant_lists["python"] is variant_list)
+        self.assertTrue(variant_list.solver is s)
+
+        # but not if they are context dependent
+        variant_list.context_dependent = True
+        s, resolve = _solve(["python"])
+        self.assertFalse(variant_lists["python"] is variant_list)
+        self.assertEqual(resolve, ["python-2.7.0[]"])
+
+        # not shared with solves in a different build mode
+        s = Solver([Requirement("python")], self.packages_path, building=True,
+                   variant_cache=variant_cache)
+        self.assertFalse(variant_cache.get_variant_lists(s)["python"]
+                         is variant_lists["python"])
+
+    def test_17_profiler(self):
+        """Test profiling of solve operations."""
+        request = ["pyfoo", "pybah"]
+        s = Solver([Requirement(x) for x in request], self.packages_path)
+        s.solve()
+        expected = [str(x) for x in s.resolved_packages]
+
+        # profiling doesn't change the resolve
+        profiler = SolverProfiler()
+        s = Solver([Requirement(x) for x in request], self.packages_path,
+                   profiler=profiler)
+        s.solve()
+        self.assertEqual([str(x) for x in s.resolved_packages], expected)
+
+        stats = profiler.get_family_stats()
+        self.assertEqual(set(stats.keys()), set(["pyfoo", "pybah", "python"]))
+        for name in ("pyfoo", "pybah", "python"):
+            self.assertTrue(stats[name]["load"]["count"] >= 1)
+        self.assertTrue(stats["pyfoo"]["extract"]["count"] >= 1)
+        self.assertTrue(stats["python"]["intersect"]["count"] >= 1)
+
+        # requested families are loaded when the initial phase is created
+        step_stats = profiler.get_step_stats()
+        self.assertEqual(set(step_stats[0].keys()), set(["load"]))
+        self.assertEqual(max(step_stats.keys()), s.num_solves)
+
+        # splits are attributed to the family that was split
+        profiler = SolverProfiler()
+        s = Solver([Requirement("pyvariants")], self.packages_path,
+                   profiler=profiler)
+        s.solve()
+        self.assertTrue("split" in profiler.get_family_stats()["pyvariants"])
+
+        # every stack is rooted at 'solve'
+        buf = StringIO()
+        profiler.write_folded(buf)
+        lines = buf.getvalue().strip().split('\n')
+        for line in lines:
+            stack, usecs = line.rsplit(' ', 1)
+            self.assertTrue(stack.startswith("solve;"))
+            self.assertTrue(int(usecs) > 0)
+
+    def test_18_reduction_summaries(self):
+        """Test reductions decided from requirement summaries."""
+        s = self._solve(["pyfoo", "python-2.6"],
+                        ["python-2.6.8[]", "pyfoo-3.1.0[]"])
+        self.assertTrue(
+            s.solve_stats["reductions"]["num_reduction_summary_tests"] > 0)
+
+        # reductions that remove every variant are reported as normal
+        self._fail("pyfoo-3.1", "python-2.5")
+
+    def test_19_prefetch(self):
+        """Test that prefetching package families matches a normal solve."""
+        requests = [["pyvariants", "python-2.6"],
+                    ["pyfoo", "python"],
+                    ["bahish", "pybah"],
+                    ["python-2.5", "pyfoo"],
+                    ["pyfoo-3.1", "python-2.5"],
+                    ["test_variant_split_start"],
+                    ["nada", "!python"],
+                    ["python", "missing_family"]]
+
+        def _solve(request, threads):
+            config.override("solver_prefetch_threads", threads)
+
+            try:
+                s = Solver([Requirement(x) for x in request], self.packages_path)
+                s.solve()
+            except PackageFamilyNotFoundError as e:
+                return str(e)
+
+            failure = None
+            if s.status == SolverStatus.failed:
+                failure = str(s.failure_reason())
+            return (s.status, s.resolved_packages, failure, s.num_solves,
+                    s.num_fails)
+
+        for request in requests:
+            self.assertEqual(_solve(request, 0), _solve(request, 3))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -121,9 +121,13 @@ def find_last_sublist(list_, sublist):
 
 @atexit.register
 def _atexit():
+    # there are no context tmpdirs to clear if no context was used
+    module = sys.modules.get("rez.resolved_context")
+    if module is None:
+        return
+
     try:
-        from rez.resolved_context import ResolvedContext
-        ResolvedContext.tmpdir_manager.clear()
+        module.ResolvedContext.tmpdir_manager.clear()
     except RezError:
         pass
 
@@ -0,0 +1,157 @@
+"""
+Hit, miss and eviction counts of the caches in rez.
+
+Each cache that reports statistics owns a `CacheStats` object, which it gets
+from `get_cache_stats_counter`, and updates as it is used. Caches of the same
+kind (for example, the package caches of every filesystem repository) share a
+counter. Statistics are per process, and can be read with `get_cache_stats`:
+
+    >>> from rez.utils.cache_stats import get_cache_stats
+    >>> get_cache_stats()["resource_pool"]
+    {'hits': 3, 'misses': 21, 'hit_ratio': 0.125, 'evictions': 0, ...}
+
+They are also printed along with the solver statistics (see 'rez-env --stats'),
+and are useful when tuning settings such as *resource_caching_maxsize* and
+*memcached_local_cache_size*.
+"""
+from threading import Lock
+
+
+class CacheStats(object):
+    """Statistics of a cache.
+
+    Counts are updated directly by the cache, without locking. Under heavy
+    concurrent use they may be slightly low, but they are never inconsistent
+    enough to matter for reporting.
+
+    Attributes:
+        hits (int): Number of lookups that were found in the cache. This is
+            None for caches whose hits cannot be counted.
+        misses (int): Number of lookups that were not.
+        evictions (int): Number of entries discarded to make space for others.
+        entries (int): Current number of entries, if known.
+        size (int): Current total size of the entries in bytes, if known.
+    """
+    __slots__ = ("name", "counts_hits", "hits", "misses", "evictions",
+                 "entries", "size")
+
+    def __init__(self, name, counts_hits=True):
+        self.name = name
+        self.counts_hits = counts_hits
+        self.entries = 0
+        self.size = 0
+        self.reset()
+
+    def reset(self):
+        """Reset the hit, miss and eviction counts."""
+        self.hits = 0 if self.counts_hits else None
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_ratio(self):
+        """Ratio of hits to lookups, or None if there have been no lookups
+        or hits are not counted."""
+        if not self.counts_hits:
+            return None
+
+        lookups = self.hits + self.misses
+        return (float(self.hits) / lookups) if lookups else None
+
+    def to_dict(self):
+        return dict(hits=self.hits,
+                    misses=self.misses,
+                    hit_ratio=self.hit_ratio,
+                    evictions=self.evictions,
+                    entries=self.entries,
+                    size=self.size)
+
+    def __repr__(self):
+        return "%s(%r, %r)" % (self.__class__.__name__, self.name,
+                               self.to_dict())
+
+
+_counters = {}
+_lock = Lock()
+
+
+def get_cache_stats_counter(name, counts_hits=True):
+    """Get the statistics counter of a cache, creating it if necessary.
+
+    Args:
+        name (str): Name of the cache, eg 'resource_pool'.
+        counts_hits (bool): False if the cache cannot count its hits.
+
+    Returns:
+        `CacheStats`.
+    """
+    with _lock:
+        counter = _counters.get(name)
+        if counter is None:
+            counter = CacheStats(name, counts_hits=counts_hits)
+            _counters[name] = counter
+        return counter
+
+
+def get_cache_stats():
+    """Get the statistics of all caches in this process.
+
+    Returns:
+        dict: Cache name, mapped to a dict containing the keys 'hits',
+        'misses', 'hit_ratio', 'evictions', 'entries' and 'size'. Entries and
+        size are zero for caches that do not track them.
+    """
+    with _lock:
+        counters = list(_counters.values())
+    return dict((x.name, x.to_dict()) for x in counters)
+
+
+def reset_cache_stats():
+    """Reset the hit, miss and eviction counts of all caches."""
+    with _lock:
+        for counter in _counters.values():
+            counter.reset()
+
+
+def format_cache_stats():
+    """Format the statistics of all caches as a table.
+
+    Returns:
+        List of str: Lines of the table.
+    """
+    from rez.utils.formatting import columnise, readable_memory_size
+
+    rows = [["CACHE", "HITS", "MISSES", "HIT RATIO", "EVICTIONS", "ENTRIES", "SIZE"],
+            ["-----", "----", "------", "---------", "---------", "-------", "----"]]
+
+    for name, stats in sorted(get_cache_stats().items()):
+        hits = stats["hits"]
+        hit_ratio = stats["hit_ratio"]
+        size = stats["size"]
+
+        row = (name,
+               "-" if hits is None else str(hits),
+               str(stats["misses"]),
+               "-" if hit_ratio is None else "%d%%" % int(hit_ratio * 100.0),
+               str(stats["evictions"]),
+               str(stats["entries"]),
+               readable_memory_size(size) if size else "-")
+
+        rows.append(row)
+    return columnise(rows)
+
+
+# Copyright 2013-2016 Allan Johns.
+#
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
@@ -3,6 +3,7 @@ Utilities related to managing data types.
 """
 from rez.vendor.schema.schema import Schema, Optional
 from rez.exceptions import RexError
+from rez.utils.cache_stats import get_cache_stats_counter
 from threading import Lock
 from rez.vendor.six import six
 
@@ -162,6 +163,12 @@ def get_dict_diff_str(d1, d2, title):
     return '\n'.join(lines)
 
 
+# values computed by `cached_property`. Later accesses are ordinary attribute
+# lookups, so there are no hits to count
+_cached_property_stats = get_cache_stats_counter("cached_property",
+                                                 counts_hits=False)
+
+
 class cached_property(object):
     """Simple property caching descriptor.
 
@@ -188,6 +195,7 @@ class cached_property(object):
         if instance is None:
             return self
 
+        _cached_property_stats.misses += 1
         result = self.func(instance)
         try:
             setattr(instance, self.name, result)
@@ -0,0 +1,263 @@
+"""
+A local, size-bounded, persistent cache, stored in an SQLite database.
+"""
+from rez.config import config
+from rez.utils._version import _rez_version
+from rez.utils.cache_stats import get_cache_stats_counter
+from rez.vendor.six import six
+from contextlib import contextmanager
+import os
+import os.path
+import sys
+import time
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+
+# this version should be changed if and when the caching interface changes
+cache_interface_version = 1
+
+
+class DiskCache(object):
+    """A persistent cache with least-recently-used eviction.
+
+    The interface mirrors that of `rez.utils.memcached.Client`, so the two can
+    be used interchangeably. Entries are pickled and stored in a single SQLite
+    database file, which may be shared by concurrent processes. Any error
+    accessing the database is treated as a cache miss, so a broken or
+    unwritable cache never causes the calling code to fail.
+    """
+    class _Miss(object):
+        def __nonzero__(self):
+            return False
+        __bool__ = __nonzero__  # py3 compat
+
+    miss = _Miss()
+
+    filename = "cache.db"
+
+    logger = config.debug_printer("memcache")
+
+    # shared by all disk caches in this process
+    stats = get_cache_stats_counter("disk_cache")
+
+    def __init__(self, path, max_size=0, atime_resolution=0):
+        """Create a disk cache.
+
+        Args:
+            path (str): Directory containing the cache database. It is created
+                if it does not exist.
+            max_size (int): Maximum total size of cached values, in bytes. If
+                zero, the size is unbounded.
+            atime_resolution (int): An entry's access time is only updated on
+                a hit if it is older than this many seconds. Nonzero values
+                avoid a database write on most hits, at the cost of a coarser
+                least recently used order.
+        """
+        self.path = path
+        self.max_size = max_size
+        self.atime_resolution = atime_resolution
+        self._conn = None
+
+    def __nonzero__(self):
+        return bool(self.path)
+
+    __bool__ = __nonzero__  # py3 compat
+
+    @property
+    def filepath(self):
+        return os.path.join(self.path, self.filename)
+
+    def set(self, key, val):
+        """Store an entry, evicting the least recently used entries if the
+        cache becomes larger than `max_size`."""
+        key = self._qualified_key(key)
+
+        try:
+            value = pickle.dumps(val, pickle.HIGHEST_PROTOCOL)
+            with self._transaction() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, size, atime) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, _blob(value), len(value), time.time()))
+                self._evict(conn)
+        except Exception as e:
+            self.logger("SET FAILED: %s (%s)", key, e)
+            return
+
+        self.logger("SET: %s", key)
+
+    def get(self, key):
+        """Get an entry.
+
+        Returns:
+            object: A value if cached, else `self.miss`.
+        """
+        key = self._qualified_key(key)
+
+        try:
+            with self._transaction() as conn:
+                row = conn.execute(
+                    "SELECT value, atime FROM entries WHERE key = ?",
+                    (key,)).fetchone()
+                now = time.time()
+                if row is not None and now - row[1] >= self.atime_resolution:
+                    conn.execute("UPDATE entries SET atime = ? WHERE key = ?",
+                                 (now, key))
+            if row is not None:
+                result = pickle.loads(bytes(row[0]))
+                self.logger("HIT: %s", key)
+                self.stats.hits += 1
+                return result
+        except Exception as e:
+            self.logger("GET FAILED: %s (%s)", key, e)
+
+        self.logger("MISS: %s", key)
+        self.stats.misses += 1
+        return self.miss
+
+    def delete(self, key):
+        """Delete an entry, if it exists."""
+        key = self._qualified_key(key)
+
+        try:
+            with self._transaction() as conn:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        except Exception as e:
+            self.logger("DELETE FAILED: %s (%s)", key, e)
+
+    def flush(self):
+        """Delete all entries."""
+        try:
+            with self._transaction() as conn:
+                conn.execute("DELETE FROM entries")
+        except Exception as e:
+            self.logger("FLUSH FAILED: %s", e)
+
+    def get_stats(self):
+        """Get cache statistics.
+
+        Returns:
+            dict: Contains the keys 'entries' and 'size' (in bytes).
+        """
+        try:
+            with self._transaction() as conn:
+                entries, size = conn.execute(
+                    "SELECT COUNT(*), TOTAL(size) FROM entries").fetchone()
+        except Exception as e:
+            self.logger("STATS FAILED: %s", e)
+            entries, size = 0, 0
+
+        return dict(entries=entries, size=int(size))
+
+    def close(self):
+        """Close the database connection, if open."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _evict(self, conn):
+        if not self.max_size:
+            return
+
+        total, = conn.execute("SELECT TOTAL(size) FROM entries").fetchone()
+        if total <= self.max_size:
+            return
+
+        rows = conn.execute(
+            "SELECT key, size FROM entries ORDER BY atime").fetchall()
+        keys = []
+        for key, size in rows:
+            if total <= self.max_size:
+                break
+            keys.append((key,))
+            total -= size
+
+        conn.executemany("DELETE FROM entries WHERE key = ?", keys)
+        self.stats.evictions += len(keys)
+        self.logger("EVICTED: %d entries", len(keys))
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        try:
+            yield conn
+            conn.commit()
+        except:
+            conn.rollback()
+            raise
+
+    def _connection(self):
+        if self._conn is None:
+            import sqlite3
+
+            if not os.path.isdir(self.path):
+                os.makedirs(self.path)
+
+            conn = sqlite3.connect(self.filepath, timeout=10)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value BLOB, size INTEGER, atime REAL)")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS entries_atime ON entries (atime)")
+            conn.commit()
+            self._conn = conn
+
+        return self._conn
+
+    def _qualified_key(self, key):
+        """
+        Qualify cache key so that changes to rez, the caching interface, or the
+        python version (and hence pickle compatibility) don't break entries
+        written by other processes sharing the cache.
+        """
+        return "%s:%s:%d:%s" % (
+            _rez_version,
+            cache_interface_version,
+            sys.version_info[0],
+            key
+        )
+
+
+def _blob(value):
+    if six.PY2:
+        import sqlite3
+        return sqlite3.Binary(value)
+    return value
+
+
+@contextmanager
+def disk_cache_client(path, max_size=0):
+    """Get a disk cache instance, closing it on exit.
+
+    Args:
+        path (str): Cache directory.
+        max_size (int): Maximum cache size in bytes, zero for unbounded.
+
+    Returns:
+        `DiskCache`: Cache instance.
+    """
+    client = DiskCache(path, max_size=max_size)
+    try:
+        yield client
+    finally:
+        client.close()
+
+
+# Copyright 2013-2016 Allan Johns.
+#
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
@@ -1,10 +1,10 @@
 from __future__ import print_function
 
 from rez.config import config
-from rez.vendor.memcache.memcache import Client as Client_, \
-    SERVER_MAX_KEY_LENGTH, __version__ as memcache_client_version
 from rez.utils import py23
-from threading import local
+from rez.utils.cache_stats import get_cache_stats_counter
+from threading import local, Lock
+from collections import OrderedDict
 from contextlib import contextmanager
 from functools import update_wrapper
 from inspect import isgeneratorfunction
@@ -12,6 +12,11 @@ from hashlib import md5
 from uuid import uuid4
 from rez.vendor.six import six
 
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
 basestring = six.string_types[0]
 
 
@@ -25,7 +30,9 @@ class Client(object):
     Adds the features:
     - unlimited key length;
     - hard/soft flushing;
-    - ability to cache None.
+    - ability to cache None;
+    - prefetching of many entries in a single request (see `prefetch`);
+    - coalescing of writes into a single request (see `set`).
     """
     class _Miss(object):
         def __nonzero__(self):
@@ -34,8 +41,13 @@ class Client(object):
 
     miss = _Miss()
 
+    _not_prefetched = object()
+
     logger = config.debug_printer("memcache")
 
+    # the number of pending writes at which they are sent to the server(s)
+    max_pending_sets = 100
+
     def __init__(self, servers, debug=False):
         """Create a memcached client.
 
@@ -51,6 +63,13 @@ class Client(object):
         self.debug = debug
         self.current = ''
 
+        # {key: value or self.miss}, see `prefetch`
+        self._prefetched = {}
+
+        # {(time, min_compress_len): {key: value}}, see `set`
+        self._pending_sets = {}
+        self._num_pending_sets = 0
+
     def __nonzero__(self):
         return bool(self.servers)
 
@@ -64,6 +83,7 @@ class Client(object):
             `memcache.Client` instance.
         """
         if self._client is None:
+            from rez.vendor.memcache.memcache import Client as Client_
             self._client = Client_(self.servers)
         return self._client
 
@@ -73,6 +93,8 @@ class Client(object):
         Returns:
             set: URIs of servers that are responding.
         """
+        from rez.vendor.memcache.memcache import Client as Client_
+
         responders = set()
         for server in self.servers:
             client = Client_([server])
@@ -83,19 +105,53 @@ class Client(object):
         return responders
 
     def set(self, key, val, time=0, min_compress_len=0):
-        """See memcache.Client."""
+        """See memcache.Client.
+
+        Note that writes are not sent to the server(s) straight away. They are
+        sent together, in a single request, once `max_pending_sets` writes are
+        pending, when `flush_sets` is called, or when the client disconnects.
+        """
         if not self.servers:
             return
 
-        key = self._qualified_key(key)
-        hashed_key = self.key_hasher(key)
-        val = (key, val)
+        self._discard_pending_set(key)
+        pending_sets = self._pending_sets.setdefault((time, min_compress_len), {})
+        pending_sets[key] = val
+        self._num_pending_sets += 1
+        self._prefetched.pop(key, None)
+
+        if self._num_pending_sets >= self.max_pending_sets:
+            self.flush_sets()
 
-        self.client.set(key=hashed_key,
-                        val=val,
-                        time=time,
-                        min_compress_len=min_compress_len)
-        self.logger("SET: %s", key)
+    def set_multi(self, mapping, time=0, min_compress_len=0):
+        """Store several entries, in a single request.
+
+        Args:
+            mapping (dict): Values to store, keyed by cache key.
+        """
+        if not self.servers or not mapping:
+            return
+
+        entries = {}
+        for key, val in mapping.items():
+            key = self._qualified_key(key)
+            entries[self.key_hasher(key)] = (key, val)
+
+        self.client.set_multi(entries,
+                              time=time,
+                              min_compress_len=min_compress_len)
+
+        for key, _ in entries.values():
+            self.logger("SET: %s", key)
+
+    def flush_sets(self):
+        """Send pending writes to the server(s)."""
+        pending_sets = self._pending_sets
+        self._pending_sets = {}
+        self._num_pending_sets = 0
+
+        for (time, min_compress_len), mapping in pending_sets.items():
+            self.set_multi(mapping, time=time, min_compress_len=min_compress_len)
 
     def get(self, key):
         """See memcache.Client.
@@ -108,6 +164,14 @@ class Client(object):
         if not self.servers:
             return self.miss
 
+        for pending_sets in self._pending_sets.values():
+            if key in pending_sets:
+                return pending_sets[key]
+
+        result = self._prefetched.pop(key, self._not_prefetched)
+        if result is not self._not_prefetched:
+            return result
+
         key = self._qualified_key(key)
         hashed_key = self.key_hasher(key)
         entry = self.client.get(hashed_key)
@@ -121,9 +185,64 @@ class Client(object):
         self.logger("MISS: %s", key)
         return self.miss
 
+    def get_multi(self, keys):
+        """Get several entries, in a single request.
+
+        Returns:
+            dict: Values of the keys that are cached. Keys that are not cached
+            are not present.
+        """
+        if not self.servers or not keys:
+            return {}
+
+        qualified_keys = dict((x, self._qualified_key(x)) for x in keys)
+        hashed_keys = dict((x, self.key_hasher(qualified_keys[x])) for x in keys)
+        entries = self.client.get_multi(list(hashed_keys.values()))
+        result = {}
+
+        for key, hashed_key in hashed_keys.items():
+            qualified_key = qualified_keys[key]
+            entry = entries.get(hashed_key)
+
+            if isinstance(entry, tuple) and len(entry) == 2:
+                key_, value = entry
+                if key_ == qualified_key:
+                    self.logger("HIT: %s", qualified_key)
+                    result[key] = value
+                    continue
+
+            self.logger("MISS: %s", qualified_key)
+
+        return result
+
+    def prefetch(self, keys):
+        """Get several entries, in a single request, ahead of their use.
+
+        Subsequent calls to `get` for these keys - including misses - are
+        answered without a request to the server(s). Each prefetched entry is
+        only used once.
+        """
+        if not self.servers:
+            return
+
+        keys = [x for x in keys if x not in self._prefetched
+                and local_cache.key(self.servers, self.debug, x) not in local_cache]
+        if not keys:
+            return
+
+        entries = self.get_multi(keys)
+        for key in keys:
+            self._prefetched[key] = entries.get(key, self.miss)
+
     def delete(self, key):
-        """See memcache.Client."""
+        """See memcache.Client.
+
+        Note that a pending write of the key (see `set`) is discarded too.
+        """
         if self.servers:
+            self._discard_pending_set(key)
+            self._prefetched.pop(key, None)
+
             key = self._qualified_key(key)
             hashed_key = self.key_hasher(key)
             self.client.delete(hashed_key)
@@ -138,6 +257,11 @@ class Client(object):
         """
         if not self.servers:
             return
+
+        self._prefetched = {}
+        self._pending_sets = {}
+        self._num_pending_sets = 0
+
         if hard:
             self.client.flush_all()
             self.reset_stats()
@@ -162,10 +286,20 @@ class Client(object):
 
     def disconnect(self):
         """Disconnect from server(s). Behaviour is undefined after this call."""
+        if self.servers:
+            self.flush_sets()
+            self._prefetched = {}
+
         if self.servers and self._client:
             self._client.disconnect_all()
         # print("Disconnected memcached client %s" % str(self))
 
+    def _discard_pending_set(self, key):
+        for pending_sets in self._pending_sets.values():
+            if key in pending_sets:
+                del pending_sets[key]
+                self._num_pending_sets -= 1
+
     def _qualified_key(self, key):
         """
         Qualify cache key so that:
@@ -173,6 +307,9 @@ class Client(object):
         * we're shielded from potential compatibility bugs in newer versions of
           python-memcached
         """
+        from rez.vendor.memcache.memcache import \
+            __version__ as memcache_client_version
+
         return "%s:%s:%s:%s" % (
             memcache_client_version,
             cache_interface_version,
@@ -190,6 +327,8 @@ class Client(object):
     @classmethod
     def _debug_key_hash(cls, key):
         import re
+        from rez.vendor.memcache.memcache import SERVER_MAX_KEY_LENGTH
+
         h = cls._key_hash(key)[:16]
         value = "%s:%s" % (h, key)
         value = value[:SERVER_MAX_KEY_LENGTH]
@@ -226,6 +365,21 @@ class _ScopedInstanceManager(local):
 scoped_instance_manager = _ScopedInstanceManager()
 
 
+def get_scoped_memcached_client(servers=config.memcached_uri,
+                                debug=config.debug_memcache):
+    """Get the memcached instance shared by the current scope, if any.
+
+    See `memcached_client`. This is useful for operations that are only
+    worthwhile if the instance outlives them, such as `Client.prefetch`.
+
+    Returns:
+        `Client`: Memcached instance, or None if not within a scope.
+    """
+    key = (tuple(servers or []), debug)
+    entry = scoped_instance_manager.clients.get(key)
+    return entry[0] if entry else None
+
+
 @contextmanager
 def memcached_client(servers=config.memcached_uri, debug=config.debug_memcache):
     """Get a shared memcached instance.
@@ -268,8 +422,109 @@ def pool_memcached_connections(func):
     return update_wrapper(wrapper, func)
 
 
+class LocalCache(object):
+    """An in-process cache, in front of memcached.
+
+    This holds entries of `memcached` decorated functions whose values never
+    change for a given key - typically because the key encodes a file's
+    modification time - so that repeated lookups within a process avoid a
+    request to memcached. Entries are stored pickled, so that callers get their
+    own copy of a value, just as they would from memcached.
+
+    The cache is bounded by the *memcached_local_cache_size* and
+    *memcached_local_cache_max_bytes* settings, and discards least recently
+    used entries first. It is shared by all threads. Its statistics are
+    reported as 'memcached_local' (see `rez.utils.cache_stats`).
+    """
+    class _Miss(object):
+        def __nonzero__(self):
+            return False
+        __bool__ = __nonzero__  # py3 compat
+
+    miss = _Miss()
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = Lock()
+        self.stats = get_cache_stats_counter("memcached_local")
+
+    @classmethod
+    def key(cls, servers, debug, cache_key):
+        """Get the key of a memcached entry in this cache."""
+        if isinstance(servers, basestring):
+            servers = [servers]
+        return (tuple(servers), debug, cache_key)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        """Get an entry.
+
+        Returns:
+            object: A value if cached, else `self.miss`.
+        """
+        with self.lock:
+            data = self.entries.pop(key, None)
+            if data is None:
+                self.stats.misses += 1
+                return self.miss
+
+            self.entries[key] = data  # most recently used
+            self.stats.hits += 1
+
+        return pickle.loads(data)
+
+    def set(self, key, val):
+        """Store an entry."""
+        max_entries = config.memcached_local_cache_size
+
+        max_bytes = config.memcached_local_cache_max_bytes
+        try:
+            data = pickle.dumps(val, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return  # just not cached
+
+        if max_bytes and len(data) > max_bytes:
+            return
+
+        with self.lock:
+            data_ = self.entries.pop(key, None)
+            if data_ is not None:
+                self.size -= len(data_)
+
+            self.entries[key] = data
+            self.size += len(data)
+
+            while len(self.entries) > max_entries \
+                    or (max_bytes and self.size > max_bytes):
+                _, data_ = self.entries.popitem(last=False)
+                self.size -= len(data_)
+                self.stats.evictions += 1
+
+            self._update_stats()
+
+    def clear(self):
+        """Drop all entries."""
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+            self._update_stats()
+
+    def _update_stats(self):
+        self.stats.entries = len(self.entries)
+        self.stats.size = self.size
+
+
+local_cache = LocalCache()
+
+# lookups made to memcached by `memcached` decorated functions
+_memcached_stats = get_cache_stats_counter("memcached")
+
+
 def memcached(servers, key=None, from_cache=None, to_cache=None, time=0,
-              min_compress_len=0, debug=False):
+              min_compress_len=0, debug=False, immutable=False):
     """memcached memoization function decorator.
 
     The wrapped function is expected to return a value that is stored to a
@@ -317,6 +572,9 @@ def memcached(servers, key=None, from_cache=None, to_cache=None, time=0,
             read them if running a foreground memcached proc with 'memcached -vv'.
             However this increases chances of key clashes so should not be left
             turned on.
+        immutable (bool): If True, the value for a given key never changes
+            (for example, because the key includes a file's modification time).
+            Such entries are also kept in the in-process `local_cache`.
     """
     def default_key(func, *nargs, **kwargs):
         parts = [func.__module__]
@@ -351,18 +609,30 @@ def memcached(servers, key=None, from_cache=None, to_cache=None, time=0,
     def decorator(func):
         if servers:
             def wrapper(*nargs, **kwargs):
-                with memcached_client(servers, debug=debug) as client:
-                    if key:
-                        cache_key = key(*nargs, **kwargs)
-                    else:
-                        cache_key = default_key(func, *nargs, **kwargs)
+                if key:
+                    cache_key = key(*nargs, **kwargs)
+                else:
+                    cache_key = default_key(func, *nargs, **kwargs)
+
+                # get, from the in-process cache first
+                local_key = local_cache.key(servers, debug, cache_key)
+                local = immutable and config.memcached_local_cache_size > 0
+
+                if local:
+                    result = local_cache.get(local_key)
+                    if result is not local_cache.miss:
+                        return from_cache(result, *nargs, **kwargs)
 
-                    # get
+                with memcached_client(servers, debug=debug) as client:
                     result = client.get(cache_key)
                     if result is not client.miss:
+                        _memcached_stats.hits += 1
+                        if local:
+                            local_cache.set(local_key, result)
                         return from_cache(result, *nargs, **kwargs)
 
                     # cache miss - run target function
+                    _memcached_stats.misses += 1
                     result = func(*nargs, **kwargs)
                     if isinstance(result, DoNotCache):
                         return result.result
@@ -373,6 +643,9 @@ def memcached(servers, key=None, from_cache=None, to_cache=None, time=0,
                                val=cache_result,
                                time=time,
                                min_compress_len=min_compress_len)
+
+                    if local:
+                        local_cache.set(local_key, cache_result)
                     return result
         else:
             def wrapper(*nargs, **kwargs):
@@ -389,6 +662,9 @@ def memcached(servers, key=None, from_cache=None, to_cache=None, time=0,
             that entries set by the current process will no longer be seen during
             this process.
             """
+            if immutable:
+                local_cache.clear()
+
             with memcached_client(servers, debug=debug) as client:
                 client.flush()
 
@@ -0,0 +1,222 @@
+"""
+Caches bounded by a shared memory budget.
+
+Several caches can share one `MemoryBudget`. Each cache entry is charged the
+estimated size of its value; when the total goes over the budget, the least
+recently used entries - of whichever cache - are evicted. A value that grows
+after it is cached (for example a resource whose data is loaded lazily) can be
+charged more with `MemoryBudget.charge`.
+"""
+from collections import OrderedDict
+from functools import update_wrapper
+from threading import RLock
+import sys
+
+
+_container_types = (dict, list, tuple, set, frozenset)
+
+
+def estimate_size(obj):
+    """Estimate the memory used by an object, in bytes.
+
+    Containers are measured recursively, as are the attributes of `obj`
+    itself. Other objects found within `obj` are measured shallowly - they
+    are typically shared, or are cached (and measured) separately.
+
+    Args:
+        obj: Object to measure.
+
+    Returns:
+        int: Estimated size in bytes.
+    """
+    seen = set()
+    getsizeof = sys.getsizeof
+
+    def _size(obj_, deep):
+        id_ = id(obj_)
+        if id_ in seen:
+            return 0
+        seen.add(id_)
+
+        size = getsizeof(obj_, 0)
+
+        if isinstance(obj_, dict):
+            for k, v in obj_.items():
+                size += _size(k, False) + _size(v, False)
+        elif isinstance(obj_, _container_types):
+            for v in obj_:
+                size += _size(v, False)
+        elif deep:
+            attrs = getattr(obj_, "__dict__", None)
+            if attrs is not None:
+                size += _size(attrs, False)
+
+        return size
+
+    return _size(obj, True)
+
+
+class MemoryBudget(object):
+    """A memory ceiling, shared by several caches.
+
+    Entries are kept in least recently used order across all the caches using
+    the budget. Entries are added by `memory_bounded_cache` wrappers.
+    """
+    def __init__(self, max_bytes=0):
+        """Create a memory budget.
+
+        Args:
+            max_bytes (int): Maximum total estimated size of cached values. If
+                zero, the size is unbounded.
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.lock = RLock()
+
+        # (cache id, key) -> [cache, key, value id, size, stats]
+        self.entries = OrderedDict()
+
+        # value id -> (cache id, key), so that values can be charged more
+        self.owners = {}
+
+    def add(self, cache, key, value, stats=None):
+        """Add an entry to the budget, evicting entries if necessary.
+
+        The value must already be stored in `cache` under `key`.
+        """
+        size = estimate_size(value)
+        value_id = id(value)
+        entry_key = (id(cache), key)
+
+        with self.lock:
+            self.entries[entry_key] = [cache, key, value_id, size, stats]
+            self.owners.setdefault(value_id, entry_key)
+            self.size += size
+
+            if stats is not None:
+                stats.entries += 1
+                stats.size += size
+            self._evict()
+
+    def touch(self, cache, key):
+        """Mark an entry as most recently used."""
+        entry_key = (id(cache), key)
+        with self.lock:
+            entry = self.entries.pop(entry_key, None)
+            if entry is not None:
+                self.entries[entry_key] = entry
+
+    def charge(self, value, size):
+        """Charge an extra `size` bytes to the entry holding `value`, if any.
+        """
+        with self.lock:
+            entry_key = self.owners.get(id(value))
+            if entry_key is None:
+                return
+
+            entry = self.entries[entry_key]
+            entry[3] += size
+            self.size += size
+
+            stats = entry[4]
+            if stats is not None:
+                stats.size += size
+            self._evict()
+
+    def discard(self, cache):
+        """Remove all the entries of a cache, and clear it."""
+        cache_id = id(cache)
+        with self.lock:
+            for key in list(cache.keys()):
+                self._remove((cache_id, key))
+            cache.clear()
+
+    def _remove(self, entry_key):
+        cache, key, value_id, size, stats = self.entries.pop(entry_key)
+        self.size -= size
+
+        if self.owners.get(value_id) == entry_key:
+            del self.owners[value_id]
+
+        if stats is not None:
+            stats.entries -= 1
+            stats.size -= size
+        return cache, key, stats
+
+    def _evict(self):
+        if not self.max_bytes:
+            return
+
+        # the most recently added entry is kept, even if it alone is over budget
+        while self.size > self.max_bytes and len(self.entries) > 1:
+            entry_key = next(iter(self.entries))
+            cache, key, stats = self._remove(entry_key)
+            del cache[key]
+
+            if stats is not None:
+                stats.evictions += 1
+
+
+def memory_bounded_cache(budget, stats=None):
+    """Cache decorator, bounded by a `MemoryBudget`.
+
+    This is used like `rez.backport.lru_cache.lru_cache`, and the wrapped
+    function likewise has a `cache_clear` function.
+
+    Args:
+        budget (`MemoryBudget`): Budget shared with other caches.
+        stats (`rez.utils.cache_stats.CacheStats`): If provided, hits, misses,
+            evictions, entries and estimated size are counted in it.
+    """
+    def decorating_function(user_function):
+        cache = {}
+        sentinel = object()
+        lock = budget.lock
+
+        def wrapper(*args, **kwds):
+            key = (args, frozenset(kwds.items()))
+
+            with lock:
+                result = cache.get(key, sentinel)
+                if result is not sentinel:
+                    budget.touch(cache, key)
+                    if stats is not None:
+                        stats.hits += 1
+                    return result
+
+            if stats is not None:
+                stats.misses += 1
+            result = user_function(*args, **kwds)
+
+            with lock:
+                # the same key may have been added while the lock was released
+                if key not in cache:
+                    cache[key] = result
+                    budget.add(cache, key, result, stats)
+            return result
+
+        def cache_clear():
+            """Clear the cache"""
+            budget.discard(cache)
+
+        wrapper.__wrapped__ = user_function
+        wrapper.cache_clear = cache_clear
+        return update_wrapper(wrapper, user_function)
+
+    return decorating_function
+
+
+# Copyright 2013-2016 Allan Johns.
+#
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
@@ -34,6 +34,9 @@ from rez.utils.data_utils import cached_property, AttributeForwardMeta, \
 from rez.config import config
 from rez.exceptions import ResourceError
 from rez.backport.lru_cache import lru_cache
+from rez.utils.cache_stats import get_cache_stats_counter
+from rez.utils.memory_budget import MemoryBudget, memory_bounded_cache, \
+    estimate_size
 from rez.utils.logging_ import print_debug
 from rez.vendor.six import six
 
@@ -97,6 +100,10 @@ class Resource(six.with_metaclass(LazyAttributeMeta, object)):
         data = self._load()
         if config.debug("resources"):
             print_debug("Loaded resource: %s" % str(self))
+
+        # the resource is usually already cached, before its data is loaded
+        if _memory_budget is not None and _memory_budget.max_bytes:
+            _memory_budget.charge(self, estimate_size(data))
         return data
 
     def get(self, key, default=None):
@@ -131,15 +138,33 @@ class Resource(six.with_metaclass(LazyAttributeMeta, object)):
         raise NotImplementedError
 
 
+def _intern_variables(variables):
+    # Many handles share the same variable values (repository locations,
+    # family names, version strings read from separate directory listings).
+    # Only native strings are interned - other values may compare equal across
+    # types. Interned strings are freed once no handle refers to them.
+    for key, value in variables.items():
+        if type(value) is str:
+            variables[key] = six.moves.intern(value)
+    return variables
+
+
 class ResourceHandle(object):
     """A `Resource` handle.
 
     A handle uniquely identifies a resource. A handle can be stored and used
     with a `ResourcePool` to retrieve the same resource at a later date.
+
+    Handles are created in large numbers, so they have no instance dict, and
+    their string variable values are interned. The variables of a handle
+    should not be changed.
     """
+    __slots__ = ("key", "variables", "_hash")
+
     def __init__(self, key, variables=None):
         self.key = key
-        self.variables = variables or {}
+        self.variables = _intern_variables(variables) if variables else {}
+        self._hash = None
 
     def get(self, key, default=None):
         """Get the value of a resource variable."""
@@ -171,7 +196,35 @@ class ResourceHandle(object):
         return (self.key == other.key) and (self.variables == other.variables)
 
     def __hash__(self):
-        return hash((self.key, frozenset(self.variables.items())))
+        if self._hash is None:
+            self._hash = hash((self.key, frozenset(self.variables.items())))
+        return self._hash
+
+    def __reduce__(self):
+        return (self.__class__, (self.key, self.variables))
+
+
+_memory_budget = None
+
+
+def get_resource_memory_budget():
+    """Get the memory budget shared by resource and package repository caches.
+
+    Returns:
+        `MemoryBudget`, or None if the *resource_caching_max_memory* setting
+        is zero.
+    """
+    global _memory_budget
+
+    max_bytes = config.resource_caching_max_memory * 1024 * 1024
+    if not max_bytes:
+        return None
+
+    if _memory_budget is None:
+        _memory_budget = MemoryBudget(max_bytes)
+    else:
+        _memory_budget.max_bytes = max_bytes
+    return _memory_budget
 
 
 class ResourcePool(object):
@@ -182,9 +235,21 @@ class ResourcePool(object):
     resources are created via some factory class, which first checks for the
     existence of the resource before creating one from a pool.
     """
-    def __init__(self, cache_size=None):
+    def __init__(self, cache_size=None, budget=None):
+        """Create a resource pool.
+
+        Args:
+            cache_size (int): Maximum number of cached resources, or None for
+                no limit.
+            budget (`MemoryBudget`): If provided, cached resources are bounded
+                by this memory budget instead of by `cache_size`.
+        """
         self.resource_classes = {}
-        cache = lru_cache(maxsize=cache_size)
+        stats = get_cache_stats_counter("resource_pool")
+        if budget is None:
+            cache = lru_cache(maxsize=cache_size, stats=stats)
+        else:
+            cache = memory_bounded_cache(budget, stats=stats)
         self.cached_get_resource = cache(self._get_resource)
 
     def register_resource(self, resource_class):
@@ -220,7 +285,12 @@ class ResourcePool(object):
 
     def _get_resource(self, resource_handle):
         resource_class = self.get_resource_class(resource_handle.key)
-        return resource_class(resource_handle.variables)
+        resource = resource_class(resource_handle.variables)
+
+        # share the handle, rather than the resource creating an equal one
+        if resource.variables is resource_handle.variables:
+            resource.handle = resource_handle
+        return resource
 
 
 class ResourceWrapper(six.with_metaclass(AttributeForwardMeta, object)):
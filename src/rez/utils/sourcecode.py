@@ -1,12 +1,17 @@
 from rez.utils.formatting import indent
 from rez.utils.data_utils import cached_property
 from rez.utils.logging_ import print_debug
+from rez.utils.cache_stats import get_cache_stats_counter
 from rez.utils import py23
+from rez.backport.lru_cache import lru_cache
 from inspect import getsourcelines
 from textwrap import dedent
 from glob import glob
 import traceback
+import hashlib
+import marshal
 import os.path
+import sys
 
 
 def early():
@@ -69,6 +74,44 @@ def _add_decorator(fn, name, **kwargs):
     fn._decorators.append(kwargs)
 
 
+@lru_cache(maxsize=1000, stats=get_cache_stats_counter("compiled_code"))
+def compile_source(source, filename, flags=0):
+    """Compile python source code, caching the code object.
+
+    Code objects are cached in-process, and also in the local package file
+    cache (see 'package_file_cache_path'), if it is enabled. This saves
+    compiling the same package commands every time a context is applied.
+
+    Args:
+        source (str): Python source code.
+        filename (str): Filename to associate with the code.
+        flags (int): Future statement flags, as passed to `compile`.
+
+    Returns:
+        Code object.
+    """
+    from rez.serialise import _get_package_file_cache  # circular import
+
+    cache = _get_package_file_cache()
+    if not cache:
+        return compile(source, filename, 'exec', flags)
+
+    # marshalled code is specific to the python build
+    key = repr((sys.version, filename, flags, source)).encode("utf-8")
+    key = "compiled_code:" + hashlib.sha1(key).hexdigest()
+
+    data = cache.get(key)
+    if data is not cache.miss:
+        try:
+            return marshal.loads(data)
+        except Exception:
+            pass
+
+    pyc = compile(source, filename, 'exec', flags)
+    cache.set(key, marshal.dumps(pyc))
+    return pyc
+
+
 class SourceCodeError(Exception):
     def __init__(self, msg, short_msg):
         super(SourceCodeError, self).__init__(msg)
@@ -188,7 +231,7 @@ class SourceCode(object):
     @cached_property
     def compiled(self):
         try:
-            pyc = compile(self.evaluated_code, self.sourcename, 'exec')
+            pyc = compile_source(self.evaluated_code, self.sourcename)
         except Exception as e:
             stack = traceback.format_exc()
             raise SourceCodeCompileError(
@@ -218,6 +218,7 @@ class ResolveDialog(QtWidgets.QDialog, StoreSizeMixin):
         verbosity = 0
         show_package_loads = True
         timestamp = None
+        prefer_current = app.config.get("resolve/prefer_current")
         if self.advanced:
             verbosity = app.config.get("resolve/verbosity")
             show_package_loads = app.config.get("resolve/show_package_loads")
@@ -231,6 +232,7 @@ class ResolveDialog(QtWidgets.QDialog, StoreSizeMixin):
             max_fails=max_fails,
             timestamp=timestamp,
             show_package_loads=show_package_loads,
+            prefer_current=prefer_current,
             buf=self.edit)
 
         if config.gui_threads:
@@ -173,16 +173,24 @@ class ContextModel(QtCore.QObject):
             self._changed(self.LOCKS_CHANGED)
 
     def resolve_context(self, verbosity=0, max_fails=-1, timestamp=None,
-                        callback=None, buf=None, package_load_callback=None):
+                        callback=None, buf=None, package_load_callback=None,
+                        prefer_current=False):
         """Update the current context by performing a re-resolve.
 
         The newly resolved context is only applied if it is a successful solve.
+        If `prefer_current` is True, the packages in the current context are
+        tried first, where they still fit the request, rather than the latest
+        packages.
 
         Returns:
             `ResolvedContext` object, which may be a successful or failed solve.
         """
         package_filter = PackageFilterList.from_pod(self.package_filter)
 
+        preferred_variants = None
+        if prefer_current and self._context and self._context.success:
+            preferred_variants = self._context.resolved_packages
+
         context = ResolvedContext(
             self.request,
             package_paths=self.packages_path,
@@ -193,7 +201,8 @@ class ContextModel(QtCore.QObject):
             buf=buf,
             callback=callback,
             package_load_callback=package_load_callback,
-            caching=self.caching)
+            caching=self.caching,
+            preferred_variants=preferred_variants)
 
         if context.success:
             if self._context and self._context.load_path:
@@ -9,7 +9,7 @@ class ResolveThread(QtCore.QObject):
     finished = QtCore.Signal()
 
     def __init__(self, context_model, verbosity=0, max_fails=-1, timestamp=None,
-                 show_package_loads=True, buf=None):
+                 show_package_loads=True, prefer_current=False, buf=None):
         super(ResolveThread, self).__init__()
         self.context_model = context_model
         self.context = None
@@ -17,6 +17,7 @@ class ResolveThread(QtCore.QObject):
         self.max_fails = max_fails
         self.timestamp = timestamp
         self.show_package_loads = show_package_loads
+        self.prefer_current = prefer_current
         self.buf = buf
         self.context = None
         self.stopped = False
@@ -33,7 +34,8 @@ class ResolveThread(QtCore.QObject):
                 timestamp=self.timestamp,
                 buf=self.buf,
                 callback=self._callback,
-                package_load_callback=package_load_callback)
+                package_load_callback=package_load_callback,
+                prefer_current=self.prefer_current)
         except RezError as e:
             self.error_message = str(e)
 
@@ -13,19 +13,25 @@ from rez.package_repository import PackageRepository
 from rez.package_resources_ import PackageFamilyResource, VariantResourceHelper, \
     PackageResourceHelper, package_pod_schema, \
     package_release_keys, package_build_only_keys
-from rez.serialise import clear_file_caches, open_file_for_write
+from rez.serialise import clear_file_caches, open_file_for_write, \
+    prefetch_files
 from rez.package_serialise import dump_package_data
 from rez.exceptions import PackageMetadataError, ResourceError, RezSystemError, \
     ConfigurationError, PackageRepositoryError
 from rez.utils.formatting import is_valid_package_name
-from rez.utils.resources import cached_property
+from rez.utils.resources import cached_property, get_resource_memory_budget
 from rez.utils.logging_ import print_warning
-from rez.utils.memcached import memcached, pool_memcached_connections
+from rez.utils.memcached import memcached, pool_memcached_connections, \
+    get_scoped_memcached_client
+from rez.utils import json
 from rez.utils.filesystem import make_path_writable, canonical_path
 from rez.utils.platform_ import platform_
 from rez.serialise import load_from_file, FileFormat
 from rez.config import config
 from rez.backport.lru_cache import lru_cache
+from rez.utils.cache_stats import get_cache_stats_counter
+from rez.utils.memory_budget import memory_bounded_cache
+from rez.vendor.atomicwrites import atomic_write
 from rez.vendor.schema.schema import Schema, Optional, And, Use, Or
 from rez.vendor.six import six
 from rez.vendor.version.version import Version, VersionRange
@@ -77,6 +83,68 @@ class PackageDefinitionFileMissing(PackageMetadataError):
     pass
 
 
+class _FamilyIndex(object):
+    """The contents of a package family directory, as read from its index.
+
+    See the 'family_index_dir' filesystem repository setting.
+    """
+    # this version should be changed if and when the index format changes
+    format_version = 2
+
+    def __init__(self, repository, path, versions, mtimes, building):
+        """
+        Args:
+            repository (`FileSystemPackageRepository`): Repository of the family.
+            path (str): Path of the family directory.
+            versions (dict): Package filename (or None if there is no package
+                file) of each version directory, keyed by version string.
+            mtimes (dict): Mtime of each version directory when it was indexed,
+                keyed by version string.
+            building (list of str): Versions with a 'building' tagfile.
+        """
+        self.repository = repository
+        self.path = path
+        self.versions = versions
+        self.mtimes = mtimes
+        self.building = set(building)
+
+    def get_version_dirs(self):
+        """Get the version directories, as `_get_version_dirs` would."""
+        if _settings.check_package_definition_files:
+            return [x for x in self.versions
+                    if self.repository._get_version_file(
+                        os.path.join(self.path, x))[0]]
+
+        # versions still being built are skipped, as in a directory scan
+        return [x for x, filename in self.versions.items()
+                if filename or x not in self.building]
+
+    def get_file(self, path, version_str):
+        """Get the package file of a version, as `_get_file` would.
+
+        Returns:
+            2-tuple: Filepath and `FileFormat`, or None if the version is not
+            in the index, or its directory has changed since it was indexed.
+        """
+        if version_str not in self.versions:
+            return None
+
+        # a package file added, removed or renamed changes the mtime of the
+        # version directory, but not of the family directory
+        try:
+            if os.path.getmtime(path) != self.mtimes.get(version_str):
+                return None
+        except OSError:
+            return None
+
+        filename = self.versions[version_str]
+        if filename is None:
+            return None, None
+
+        ext = os.path.splitext(filename)[-1][1:]
+        return os.path.join(path, filename), FileFormat[ext]
+
+
 # ------------------------------------------------------------------------------
 # resources
 # ------------------------------------------------------------------------------
@@ -116,7 +184,7 @@ class FileSystemPackageFamilyResource(PackageFamilyResource):
         for version_str in self._repository._get_version_dirs(self.path):
             if _settings.check_package_definition_files:
                 path = os.path.join(self.path, version_str)
-                if not self._repository._get_file(path)[0]:
+                if not self._repository._get_version_file(path)[0]:
                     continue
 
             package = self._repository.get_resource(
@@ -173,6 +241,8 @@ class FileSystemPackageResource(PackageResourceHelper):
 
     @cached_property
     def _filepath_and_format(self):
+        if self.get("version"):
+            return self._repository._get_version_file(self.path)
         return self._repository._get_file(self.path)
 
     def _load(self):
@@ -444,6 +514,8 @@ class FileSystemPackageRepository(PackageRepository):
     """
     schema_dict = {"file_lock_timeout": int,
                    "file_lock_dir": Or(None, str),
+                   "family_index_dir": Or(None, str),
+                   "change_journal": Or(None, str),
                    "package_filenames": [basestring]}
 
     building_prefix = ".building"
@@ -485,11 +557,20 @@ class FileSystemPackageRepository(PackageRepository):
         self.register_resource(FileSystemCombinedPackageResource)
         self.register_resource(FileSystemCombinedVariantResource)
 
-        self.get_families = lru_cache(maxsize=None)(self._get_families)
-        self.get_family = lru_cache(maxsize=None)(self._get_family)
-        self.get_packages = lru_cache(maxsize=None)(self._get_packages)
-        self.get_variants = lru_cache(maxsize=None)(self._get_variants)
-        self.get_file = lru_cache(maxsize=None)(self._get_file)
+        budget = get_resource_memory_budget()
+
+        def _cache(name):
+            stats = get_cache_stats_counter("filesystem." + name)
+            if budget is None:
+                return lru_cache(maxsize=None, stats=stats)
+            return memory_bounded_cache(budget, stats=stats)
+
+        self.get_families = _cache("families")(self._get_families)
+        self.get_family = _cache("family")(self._get_family)
+        self.get_packages = _cache("packages")(self._get_packages)
+        self.get_variants = _cache("variants")(self._get_variants)
+        self.get_file = _cache("file")(self._get_file)
+        self.get_family_index = _cache("family_index")(self._get_family_index)
 
     def _uid(self):
         t = ["filesystem", self.location]
@@ -511,6 +592,24 @@ class FileSystemPackageRepository(PackageRepository):
         for package in self.get_packages(package_family_resource):
             yield package
 
+    def get_package_versions(self, package_family_resource):
+        # a combined family is a single file, so gains nothing from an index
+        if not isinstance(package_family_resource, FileSystemPackageFamilyResource):
+            return None
+
+        # an unversioned package hides any versioned ones (see iter_packages)
+        if config.allow_unversioned_packages:
+            filepath, _ = self._get_file(package_family_resource.path)
+            if filepath:
+                return None
+
+        def _getter(version_str):
+            return lambda: self._get_package(package_family_resource, version_str)
+
+        version_strs = self._get_version_dirs(package_family_resource.path)
+        self._prefetch_package_files(package_family_resource.path, version_strs)
+        return [(Version(x), _getter(x)) for x in version_strs]
+
     def iter_variants(self, package_resource):
         for variant in self.get_variants(package_resource):
             yield variant
@@ -525,6 +624,34 @@ class FileSystemPackageRepository(PackageRepository):
         package_resource = variant_resource.parent
         return package_resource.state_handle
 
+    def get_state_key(self, family_names):
+        # uses the same keys that the listing caches are invalidated on, plus
+        # the current mtime of each package file. Every package file is
+        # included, whether it has been read or not, so that the key of a
+        # family does not change just because more of its packages are loaded
+        keys = [self._get_family_dirs__key()]
+
+        for name in family_names:
+            family = self.get_family(name)
+            if family is None:
+                keys.append(None)
+                continue
+
+            try:
+                if isinstance(family, FileSystemCombinedPackageFamilyResource):
+                    keys.append(self._get_version_dirs__key(family.filepath))
+                    continue
+
+                keys.append(self._get_version_dirs__key(family.path))
+
+                for package in self.get_packages(family):
+                    if package.filepath:
+                        keys.append(os.path.getmtime(package.filepath))
+            except OSError:
+                keys.append(None)
+
+        return tuple(keys)
+
     def get_last_release_time(self, package_family_resource):
         return package_family_resource.get_last_release_time()
 
@@ -547,6 +674,128 @@ class FileSystemPackageRepository(PackageRepository):
 
         return dirname
 
+    @cached_property
+    def family_index_dir(self):
+        dirname = _settings.family_index_dir
+        if not dirname:
+            return None
+
+        # sanity check
+        if os.path.isabs(dirname) or os.path.basename(dirname) != dirname:
+            raise ConfigurationError(
+                "filesystem package repository setting 'family_index_dir' must "
+                "be a single relative directory such as '.index'")
+
+        return dirname
+
+    def update_family_index(self, name):
+        """Write the index of a package family.
+
+        Indexes are written when variants are installed, so this only needs
+        to be called for families that were created or changed by other means.
+        Does nothing if the 'family_index_dir' setting is not set.
+
+        Args:
+            name (str): Name of the package family.
+        """
+        if not self.family_index_dir:
+            return
+
+        family_path = os.path.join(self.location, name)
+        path = os.path.join(self.location, self.family_index_dir)
+        filepath = os.path.join(path, "%s.json" % name)
+
+        try:
+            data = self._scan_family(family_path)
+
+            if not os.path.exists(path):
+                os.makedirs(path)
+
+            with atomic_write(filepath, overwrite=True) as f:
+                f.write(json.dumps(data))
+        except (IOError, OSError) as e:
+            # a missing or stale index is never an error, see `_get_family_index`
+            print_warning("Could not write package family index %s: %s"
+                          % (filepath, str(e)))
+
+    @cached_property
+    def change_journal(self):
+        filename = _settings.change_journal
+        if not filename:
+            return None
+
+        # sanity check
+        if os.path.isabs(filename) or os.path.basename(filename) != filename:
+            raise ConfigurationError(
+                "filesystem package repository setting 'change_journal' must "
+                "be a single relative filename such as '.journal'")
+
+        return os.path.join(self.location, filename)
+
+    def journal_change(self, name, version=None):
+        """Record a change to a package family in the change journal.
+
+        Installed variants are journaled, so this only needs to be called for
+        families that were changed by other means - for example, packages that
+        were edited or deleted by hand. Does nothing if the 'change_journal'
+        setting is not set.
+
+        Args:
+            name (str): Name of the package family.
+            version (`Version`): Version of the changed package, if any.
+        """
+        if not self.change_journal:
+            return
+
+        line = name if version is None else "%s %s" % (name, str(version))
+
+        try:
+            # small appends are atomic, so concurrent writers do not clash
+            with open(self.change_journal, "a") as f:
+                f.write(line + "\n")
+        except (IOError, OSError) as e:
+            print_warning("Could not write to change journal %s - cached "
+                          "resolves involving %r may be stale: %s"
+                          % (self.change_journal, name, str(e)))
+
+    def get_change_journal_position(self):
+        if not self.change_journal:
+            return None
+
+        try:
+            st = os.stat(self.change_journal)
+        except OSError:
+            return None
+        return (int(st.st_ino), st.st_size)
+
+    def get_changes_since(self, position):
+        if not self.change_journal or not position:
+            return None
+
+        ino, offset = position
+
+        try:
+            with open(self.change_journal, "rb") as f:
+                # the journal may have been replaced, or truncated
+                if int(os.fstat(f.fileno()).st_ino) != ino:
+                    return None
+
+                if offset:
+                    f.seek(offset - 1)
+                    if f.read(1) != b"\n":
+                        return None
+
+                data = f.read()
+        except (IOError, OSError):
+            return None
+
+        # an entry that is still being written
+        if data and not data.endswith(b"\n"):
+            return None
+
+        lines = data.decode("utf-8").splitlines()
+        return set(x.split()[0] for x in lines if x.strip())
+
     def pre_variant_install(self, variant_resource):
         if not variant_resource.version:
             return
@@ -663,6 +912,7 @@ class FileSystemPackageRepository(PackageRepository):
         self.get_packages.cache_clear()
         self.get_variants.cache_clear()
         self.get_file.cache_clear()
+        self.get_family_index.cache_clear()
         self._get_family_dirs.forget()
         self._get_version_dirs.forget()
         # unfortunately we need to clear file cache across the board
@@ -688,7 +938,8 @@ class FileSystemPackageRepository(PackageRepository):
     @memcached(servers=config.memcached_uri if config.cache_listdir else None,
                min_compress_len=config.memcached_listdir_min_compress_len,
                key=_get_family_dirs__key,
-               debug=config.debug_memcache)
+               debug=config.debug_memcache,
+               immutable=True)
     def _get_family_dirs(self):
         dirs = []
         if not os.path.isdir(self.location):
@@ -697,7 +948,8 @@ class FileSystemPackageRepository(PackageRepository):
         for name in os.listdir(self.location):
             path = os.path.join(self.location, name)
             if os.path.isdir(path):
-                if is_valid_package_name(name) and name != self.file_lock_dir:
+                excluded = (self.file_lock_dir, self.family_index_dir)
+                if is_valid_package_name(name) and name not in excluded:
                     dirs.append((name, None))
             else:
                 name_, ext_ = os.path.splitext(name)
@@ -713,8 +965,12 @@ class FileSystemPackageRepository(PackageRepository):
     @memcached(servers=config.memcached_uri if config.cache_listdir else None,
                min_compress_len=config.memcached_listdir_min_compress_len,
                key=_get_version_dirs__key,
-               debug=config.debug_memcache)
+               debug=config.debug_memcache,
+               immutable=True)
     def _get_version_dirs(self, root):
+        index = self.get_family_index(root)
+        if index is not None:
+            return index.get_version_dirs()
 
         # Ignore a version if there is a .ignore<version> file next to it
         def ignore_dir(name):
@@ -775,6 +1031,111 @@ class FileSystemPackageRepository(PackageRepository):
     def _is_valid_package_directory(self, path):
         return bool(self._get_file(path, "package")[0])
 
+    def _get_family_index(self, family_path):
+        # Returns a `_FamilyIndex`, or None if there is no index, or if the
+        # family directory has changed since the index was written. Like the
+        # memcached directory listings, this relies on the directory's mtime.
+        # The entry of a version directory that has changed since is ignored,
+        # see `_FamilyIndex.get_file`.
+        if not self.family_index_dir:
+            return None
+
+        name = os.path.basename(family_path)
+        filepath = os.path.join(self.location, self.family_index_dir,
+                                "%s.json" % name)
+
+        try:
+            with open(filepath) as f:
+                data = json.loads(f.read())
+            key = self._get_family_index_key(family_path)
+        except (IOError, OSError, ValueError):
+            return None
+
+        if data.get("format_version") != _FamilyIndex.format_version \
+                or data.get("key") != key:
+            debug_print("Ignoring stale or incompatible package family "
+                        "index %s", filepath)
+            return None
+
+        return _FamilyIndex(repository=self,
+                            path=family_path,
+                            versions=data["versions"],
+                            mtimes=data["mtimes"],
+                            building=data["building"])
+
+    def _get_family_index_key(self, family_path):
+        st = os.stat(family_path)
+        return [int(st.st_ino), st.st_mtime]
+
+    def _scan_family(self, family_path):
+        # scan a family directory, for its index
+        key = self._get_family_index_key(family_path)
+        names = os.listdir(family_path)
+        versions = {}
+        mtimes = {}
+        building = []
+
+        for name in names:
+            if name.startswith(self.building_prefix):
+                building.append(name[len(self.building_prefix):])
+                continue
+            elif name.startswith('.'):
+                continue
+
+            path = os.path.join(family_path, name)
+            ignore_path = os.path.join(family_path, self.ignore_prefix + name)
+
+            if os.path.isdir(path) and not os.path.isfile(ignore_path):
+                # taken first, so that a change during the probe is detected
+                mtimes[name] = os.path.getmtime(path)
+                filepath, _ = self._get_file(path)
+                versions[name] = os.path.basename(filepath) if filepath else None
+
+        # the directory must not have changed during the scan
+        if self._get_family_index_key(family_path) != key:
+            raise IOError("Package family directory %s changed while being "
+                          "indexed" % family_path)
+
+        return {
+            "format_version": _FamilyIndex.format_version,
+            "key": key,
+            "versions": versions,
+            "mtimes": mtimes,
+            "building": building
+        }
+
+    def _can_prefetch_package_files(self):
+        # only worthwhile if the memcached client outlives the prefetch
+        return bool(config.memcached_uri and config.cache_package_files
+                    and get_scoped_memcached_client())
+
+    def _prefetch_package_files(self, family_path, version_strs):
+        # see `_get_packages`
+        if not self._can_prefetch_package_files():
+            return
+
+        files = []
+        for version_str in version_strs:
+            path = os.path.join(family_path, version_str)
+            filepath, format_ = self._get_version_file(path)
+            if filepath:
+                files.append((filepath, format_))
+
+        prefetch_files(files)
+
+    def _get_version_file(self, path):
+        # the package file of a version directory, from the family's index
+        # where possible
+        family_path, version_str = os.path.split(path)
+        index = self.get_family_index(family_path)
+
+        if index is not None:
+            result = index.get_file(path, version_str)
+            if result is not None:
+                return result
+
+        return self._get_file(path)
+
     def _get_families(self):
         families = []
         for name, ext in self._get_family_dirs():
@@ -823,8 +1184,30 @@ class FileSystemPackageRepository(PackageRepository):
                 )
         return None
 
+    def _get_package(self, package_family_resource, version_str):
+        # the same checks as FileSystemPackageFamilyResource.iter_packages
+        if _settings.check_package_definition_files:
+            path = os.path.join(package_family_resource.path, version_str)
+            if not self._get_version_file(path)[0]:
+                return None
+
+        return self.get_resource(
+            FileSystemPackageResource.key,
+            location=self.location,
+            name=package_family_resource.name,
+            version=version_str)
+
     def _get_packages(self, package_family_resource):
-        return [x for x in package_family_resource.iter_packages()]
+        packages = [x for x in package_family_resource.iter_packages()]
+
+        # fetch cached package files from memcached in one request, rather
+        # than one request per package as each is loaded
+        if isinstance(package_family_resource, FileSystemPackageFamilyResource) \
+                and self._can_prefetch_package_files():
+            prefetch_files([(x.filepath, x.file_format) for x in packages
+                            if x.filepath])
+
+        return packages
 
     def _get_variants(self, package_resource):
         return [x for x in package_resource.iter_variants()]
@@ -1104,6 +1487,9 @@ class FileSystemPackageRepository(PackageRepository):
         # touch the family dir, this keeps memcached resolves updated properly
         os.utime(family_path, None)
 
+        self.update_family_index(variant_name)
+        self.journal_change(variant_name, variant_version)
+
         # load new variant
         new_variant = None
         self.clear_caches()
@@ -0,0 +1,400 @@
+"""
+Packed package repository - a read-only, single file snapshot of the package
+metadata in another repository.
+"""
+from rez.package_repository import PackageRepository, package_repository_manager
+from rez.package_resources_ import PackageFamilyResource, \
+    VariantResourceHelper, PackageResourceHelper, package_pod_schema
+from rez.exceptions import PackageRepositoryError
+from rez.utils.formatting import is_valid_package_name
+from rez.utils.logging_ import print_warning
+from rez.utils.resources import cached_property, get_resource_memory_budget
+from rez.backport.lru_cache import lru_cache
+from rez.utils.cache_stats import get_cache_stats_counter
+from rez.utils.memory_budget import memory_bounded_cache
+from rez.vendor.atomicwrites import atomic_write
+from rez.vendor.version.requirement import VersionedObject
+from rez.vendor.version.version import Version
+from rez.config import config
+import struct
+import mmap
+import os.path
+import os
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+
+# A packed repository is written from an existing repository (usually a
+# 'filesystem' repository containing released packages) by the rez-pack-repo
+# tool. It contains all family, package and variant metadata, so reading
+# packages from it does not require any package definition files to be opened
+# or evaluated. Payloads are not packed - variant roots still point into the
+# source repository.
+
+
+debug_print = config.debug_printer("resources")
+
+
+# ------------------------------------------------------------------------------
+# file format
+#
+# The file starts with a fixed size header: the magic bytes, the format version,
+# and the offset and length of the index. The index is a pickled dict, which
+# maps family names to the offset and length of each family's record, and to
+# the family's last release time. A family record is a pickled dict of
+# {version string: (base, package data)} for each of the family's packages.
+# Unversioned packages use the version string '_NO_VERSION'.
+#
+# The file is memory mapped, and a family's record is only unpickled when the
+# family is first accessed.
+# ------------------------------------------------------------------------------
+
+# this version should be changed if and when the file format changes
+format_version = 1
+
+_magic = b"REZPACK\n"
+_header = struct.Struct("<8sIQQ")
+
+# protocol 2 is readable by both python 2 and 3
+_pickle_protocol = 2
+
+
+#------------------------------------------------------------------------------
+# resource classes
+#------------------------------------------------------------------------------
+
+class PackedPackageFamilyResource(PackageFamilyResource):
+    key = "packed.family"
+    repository_type = "packed"
+
+    def _uri(self):
+        return "%s:%s" % (self.location, self.name)
+
+    def get_last_release_time(self):
+        return self._repository.pack.get_last_release_time(self.name)
+
+    def iter_packages(self):
+        packages = self._repository.pack.get_family(self.name)
+
+        # check for unversioned package
+        if "_NO_VERSION" in packages:
+            package = self._repository.get_resource(
+                PackedPackageResource.key,
+                location=self.location,
+                name=self.name)
+            yield package
+            return
+
+        # versioned packages
+        for version_str in packages.keys():
+            package = self._repository.get_resource(
+                PackedPackageResource.key,
+                location=self.location,
+                name=self.name,
+                version=version_str)
+            yield package
+
+
+class PackedPackageResource(PackageResourceHelper):
+    key = "packed.package"
+    variant_key = "packed.variant"
+    repository_type = "packed"
+    schema = package_pod_schema
+
+    def _uri(self):
+        obj = VersionedObject.construct(self.name, self.version)
+        return "%s:%s" % (self.location, str(obj))
+
+    @property
+    def base(self):
+        return self._packed[0]
+
+    @cached_property
+    def state_handle(self):
+        return self._repository.pack.mtime
+
+    @cached_property
+    def parent(self):
+        family = self._repository.get_resource(
+            PackedPackageFamilyResource.key,
+            location=self.location,
+            name=self.name)
+        return family
+
+    @cached_property
+    def _packed(self):
+        packages = self._repository.pack.get_family(self.name)
+        return packages[self.get("version") or "_NO_VERSION"]
+
+    def _load(self):
+        # copied, since the resource may change its data (see `Resource._data`)
+        return self._packed[1].copy()
+
+
+class PackedVariantResource(VariantResourceHelper):
+    key = "packed.variant"
+    repository_type = "packed"
+
+    @cached_property
+    def parent(self):
+        package = self._repository.get_resource(
+            PackedPackageResource.key,
+            location=self.location,
+            name=self.name,
+            version=self.get("version"))
+        return package
+
+
+#------------------------------------------------------------------------------
+# pack file
+#------------------------------------------------------------------------------
+
+class PackFile(object):
+    """A memory mapped pack file.
+    """
+    def __init__(self, filepath):
+        self.filepath = filepath
+
+        with open(filepath, "rb") as f:
+            st = os.fstat(f.fileno())
+            self.ino = int(st.st_ino)
+            self.mtime = st.st_mtime
+
+            try:
+                self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                self.mmap = None
+
+        if self.mmap is None or len(self.mmap) < _header.size:
+            raise PackageRepositoryError("Not a package pack file: %s" % filepath)
+
+        magic, version, offset, length = _header.unpack(self.mmap[:_header.size])
+
+        if magic != _magic:
+            raise PackageRepositoryError("Not a package pack file: %s" % filepath)
+
+        if version != format_version:
+            raise PackageRepositoryError(
+                "Package pack file %s has format version %d, expected %d. "
+                "Rewrite it with rez-pack-repo."
+                % (filepath, version, format_version))
+
+        self.index = self._unpickle(offset, length)
+        stats = get_cache_stats_counter("packed.family")
+        budget = get_resource_memory_budget()
+        if budget is None:
+            cache = lru_cache(maxsize=None, stats=stats)
+        else:
+            cache = memory_bounded_cache(budget, stats=stats)
+        self.get_family = cache(self._get_family)
+
+    def get_family_names(self):
+        return list(self.index.keys())
+
+    def get_last_release_time(self, name):
+        entry = self.index.get(name)
+        return entry[2] if entry else 0
+
+    def close(self):
+        self.mmap.close()
+
+    def _get_family(self, name):
+        entry = self.index.get(name)
+        if entry is None:
+            return {}
+
+        debug_print("Unpacking package family %s from %s", name, self.filepath)
+        offset, length, _ = entry
+        return self._unpickle(offset, length)
+
+    def _unpickle(self, offset, length):
+        return pickle.loads(self.mmap[offset:offset + length])
+
+
+def write_pack_file(filepath, source):
+    """Write a pack file of the packages in a repository.
+
+    Packages that cannot be loaded are skipped, with a warning.
+
+    Args:
+        filepath (str): Pack file to write.
+        source (str): Repository to pack, eg '/packages/released' or
+            'filesystem@/packages/released'.
+
+    Returns:
+        2-tuple: Number of families and packages written.
+    """
+    repo = package_repository_manager.get_repository(source)
+    index = {}
+    num_packages = 0
+
+    with atomic_write(filepath, mode="wb", overwrite=True) as f:
+        f.write(_header.pack(_magic, format_version, 0, 0))
+
+        for family in repo.iter_package_families():
+            packages = {}
+
+            for package in repo.iter_packages(family):
+                version_str = package.get("version") or "_NO_VERSION"
+                try:
+                    value = (package.base, dict(package._data))
+                    pickle.dumps(value, _pickle_protocol)
+                except Exception as e:
+                    print_warning("Skipping package %s: %s" % (package.uri, str(e)))
+                    continue
+
+                packages[version_str] = value
+
+            if not packages:
+                continue
+
+            data = pickle.dumps(packages, _pickle_protocol)
+            index[family.name] = (f.tell(), len(data),
+                                  repo.get_last_release_time(family))
+            f.write(data)
+            num_packages += len(packages)
+
+        data = pickle.dumps(index, _pickle_protocol)
+        offset = f.tell()
+        f.write(data)
+
+        f.seek(0)
+        f.write(_header.pack(_magic, format_version, offset, len(data)))
+
+    return len(index), num_packages
+
+
+#------------------------------------------------------------------------------
+# repository
+#------------------------------------------------------------------------------
+
+class PackedPackageRepository(PackageRepository):
+    """A read-only package repository, stored in a single pack file.
+
+    The repository location is the path of the pack file, for example
+    'packed@/packages/released.pack'. Pack files are written by the
+    rez-pack-repo tool (see `write_pack_file`), and are a snapshot of another
+    repository - they do not change when new packages are released to that
+    repository, but have to be rewritten.
+    """
+    @classmethod
+    def name(cls):
+        return "packed"
+
+    def __init__(self, location, resource_pool):
+        """Create a packed package repository.
+
+        Args:
+            location (str): Path of the pack file.
+        """
+        super(PackedPackageRepository, self).__init__(location, resource_pool)
+        self.register_resource(PackedPackageFamilyResource)
+        self.register_resource(PackedPackageResource)
+        self.register_resource(PackedVariantResource)
+
+    @cached_property
+    def pack(self):
+        return PackFile(self.location)
+
+    def _uid(self):
+        t = ["packed", self.location]
+        if os.path.exists(self.location):
+            st = os.stat(self.location)
+            t.append(int(st.st_ino))
+        return tuple(t)
+
+    def clear_caches(self):
+        super(PackedPackageRepository, self).clear_caches()
+
+        # the pack file may have been rewritten
+        pack = self.__dict__.pop("pack", None)
+        if pack is not None:
+            pack.close()
+
+    def get_package_family(self, name):
+        is_valid_package_name(name, raise_error=True)
+        if name in self.pack.index:
+            family = self.get_resource(
+                PackedPackageFamilyResource.key,
+                location=self.location,
+                name=name)
+            return family
+        return None
+
+    def iter_package_families(self):
+        for name in self.pack.get_family_names():
+            family = self.get_package_family(name)
+            yield family
+
+    def iter_packages(self, package_family_resource):
+        for package in package_family_resource.iter_packages():
+            yield package
+
+    def get_package_versions(self, package_family_resource):
+        packages = self.pack.get_family(package_family_resource.name)
+
+        # an unversioned package hides any versioned ones (see iter_packages)
+        if "_NO_VERSION" in packages:
+            return None
+
+        def _getter(version_str):
+            return lambda: self.get_resource(
+                PackedPackageResource.key,
+                location=self.location,
+                name=package_family_resource.name,
+                version=version_str)
+
+        return [(Version(x), _getter(x)) for x in packages.keys()]
+
+    def iter_variants(self, package_resource):
+        for variant in package_resource.iter_variants():
+            yield variant
+
+    def get_parent_package_family(self, package_resource):
+        return package_resource.parent
+
+    def get_parent_package(self, variant_resource):
+        return variant_resource.parent
+
+    def get_variant_state_handle(self, variant_resource):
+        package_resource = variant_resource.parent
+        return package_resource.state_handle
+
+    def get_state_key(self, family_names):
+        try:
+            st = os.stat(self.location)
+        except OSError:
+            return None
+        return (int(st.st_ino), st.st_mtime)
+
+    def get_last_release_time(self, package_family_resource):
+        return package_family_resource.get_last_release_time()
+
+    def install_variant(self, variant_resource, dry_run=False, overrides=None):
+        raise PackageRepositoryError(
+            "Cannot install to a packed package repository (%s). Install to "
+            "the source repository, and rewrite the pack file with "
+            "rez-pack-repo." % self.location)
+
+
+def register_plugin():
+    return PackedPackageRepository
+
+
+# Copyright 2013-2016 Allan Johns.
+#
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.
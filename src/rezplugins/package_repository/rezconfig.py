@@ -0,0 +1,83 @@
+filesystem = {
+    # The timeout to use when creating file locks. This is done when a variant is
+    # installed into an existing package, to prevent multiple file writes at
+    # once (which could result in a variant install getting lost). The timeout
+    # value is in seconds. A value of zero indicates no timeout.
+    "file_lock_timeout": 10,
+
+    # The relative directory, under the repository location, where file locks
+    # are created. You might need to use this option when file permissions are
+    # locked down so that only certain users can release certain packages. In
+    # this scenario, package releases may fail because a user with limited
+    # permissions will fail to create the lockfile in the repository root. By
+    # providing a subdirectory, you can open up the permissions on this
+    # directory only. If None, lockfiles are left created in the root.
+    #
+    # Note: The directory can have any name, but we suggest '.lock' as the
+    # standard convention.
+    "file_lock_dir": None,
+
+    # The relative directory, under the repository location, where an index of
+    # each package family is kept. An index lists a family's versions and their
+    # package definition files, so that they can be found without listing and
+    # stat'ing the family's directories - which can be slow on network
+    # filesystems. Indexes are written when variants are installed. An index is
+    # ignored (and the family directory scanned as usual) if it is missing, or
+    # if the family directory has changed since it was written. Likewise, the
+    # entry of a version directory that has changed since is ignored. If None,
+    # indexes are neither used nor written.
+    #
+    # Note: We suggest '.index' as the standard convention.
+    "family_index_dir": None,
+
+    # The name of a file, under the repository location, that is used as a
+    # journal of the package families changed in the repository. Each installed
+    # variant appends a line to it. A cached resolve then only needs its
+    # packages checked for changes (see 'resolve_caching') if their families
+    # appear in the journal since the resolve was cached - otherwise every
+    # package in the resolve is stat'ed. The journal is created by the first
+    # install, or can be created as an empty file. If None, no journal is kept.
+    #
+    # Note: Changes made without rez, such as packages that are edited or
+    # deleted by hand, are not journaled, and cached resolves will not notice
+    # them. Only set this for repositories that are changed by rez alone, or by
+    # tools that call the repository's 'journal_change' method. We suggest
+    # '.journal' as the standard convention.
+    "change_journal": None,
+
+    # If True, verify that a potential package directory contains a package.py /
+    # package.yaml file before treating it as a package. There *shouldn't* be
+    # non-packages in these directories, and the solver is faster if this value
+    # is False, because a lot of file stats are avoided.
+    "check_package_definition_files": False,
+
+    # A list of filenames that are expected to contain Rez definitions.
+    # The list will be checked in top to bottom order, and the first filename
+    # that contains a valid package definition will be used. You might need to
+    # use this option if the name 'package.[py/yaml]' is being used by a different
+    # packaging system.
+    #
+    # Please note: The first filename in this list is used as the installed /
+    # released package filename, regardless of the definition filename present
+    # in the source.
+    #
+    "package_filenames": [
+        "package",
+    ],
+}
+
+
+# Copyright 2013-2016 Allan Johns.
+#
+# This library is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library.  If not, see <http://www.gnu.org/licenses/>.